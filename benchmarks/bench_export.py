@@ -0,0 +1,77 @@
+"""
+Time and file size of exporting the meq table: `DataFrame.to_excel` (the former export), the streamed
+`write_excel`, `write_csv` plain and gzip-compressed, and `write_parquet`, plus the time to read the CSV and
+Parquet files back. The Parquet file is checked to reload with the same column types.
+
+    python benchmarks/bench_export.py --sizes 100000 1000000
+"""
+
+import argparse
+import os
+import tempfile
+
+import pandas as pd
+
+import synthetic
+from common import best_time
+from hydrogeology_app.analitic_data import calculate_meq_table
+from hydrogeology_app.data_layout import compact_labels
+from hydrogeology_app.exporters import write_csv, write_excel, write_parquet
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument(
+        "--to-excel-max-rows",
+        type=int,
+        default=20_000,
+        help="Larger meq tables skip DataFrame.to_excel, which takes minutes.",
+    )
+    args = parser.parse_args()
+    print(f"{'samples':>9} {'export':18} {'write':>9} {'read':>9} {'MB':>8}")
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in args.sizes:
+            data = compact_labels(synthetic.generate_rows(rows))
+            meq = calculate_meq_table(
+                data,
+                synthetic.parameter_rename(),
+                synthetic.COLUMN_PARAMETER,
+                synthetic.COLUMN_VALUE,
+            )
+            exports = [
+                ("write_excel", "meq.xlsx", write_excel, None),
+                ("write_csv", "meq.csv", write_csv, pd.read_csv),
+                ("write_csv gzip", "meq.csv.gz", write_csv, pd.read_csv),
+                ("write_parquet", "meq.parquet", write_parquet, pd.read_parquet),
+            ]
+            if len(meq) <= args.to_excel_max_rows:
+                exports.insert(
+                    0,
+                    (
+                        "to_excel",
+                        "meq_pandas.xlsx",
+                        lambda df, path: df.to_excel(path, index=False),
+                        None,
+                    ),
+                )
+            for name, file_name, write, read in exports:
+                path = os.path.join(folder, file_name)
+                seconds, _ = best_time(write, meq, path, repeat=args.repeat)
+                read_seconds = ""
+                if read is not None:
+                    read_time, reloaded = best_time(read, path, repeat=args.repeat)
+                    read_seconds = f"{read_time:8.3f}s"
+                    if read is pd.read_parquet:
+                        assert reloaded.dtypes.equals(meq.dtypes), "types changed"
+                size = os.path.getsize(path) / 1024**2
+                print(
+                    f"{len(meq):>9} {name:18} {seconds:8.3f}s {read_seconds:>9} {size:8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark and equivalence check of the coordinate kernels against the previous column-by-column pandas
+transforms, which added helper columns to the caller's DataFrame.
+
+Usage:
+    python benchmarks/bench_figure_kernels.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import math
+
+import numpy as np
+import pandas as pd
+
+from common import best_time
+from hydrogeology_app.figure_kernels import (
+    gibbs_coordinates,
+    mifflin_coordinates,
+    piper_coordinates,
+)
+
+MEQ_COLUMNS = [
+    "Sulfatos (meq/L)",
+    "Bicarbonato (meq/L)",
+    "Carbonato (meq/L)",
+    "Cloruros (meq/L)",
+    "Magnesio (meq/L)",
+    "Calcio (meq/L)",
+    "Potasio (meq/L)",
+    "Sodio (meq/L)",
+]
+MG_COLUMNS = ["Sodio (mg/L)", "Calcio (mg/L)", "Cloruros (mg/L)", "Bicarbonato (mg/L)"]
+
+
+def build_data(rows, seed=0):
+    random = np.random.default_rng(seed)
+    columns = MEQ_COLUMNS + MG_COLUMNS
+    return pd.DataFrame({column: random.gamma(2.0, 1.0, rows) for column in columns})
+
+
+def legacy_transforms(df):
+    """
+    The helper columns previously added by mifflin_graphic, gibbs_graphic and piper_graphic.
+    """
+    df = df.copy()
+    df["Na + K (meq/L)"] = df["Sodio (meq/L)"] + df["Potasio (meq/L)"]
+    df["Cl + SO4 (meq/L)"] = df["Cloruros (meq/L)"] + df["Sulfatos (meq/L)"]
+    df["Cl + SO4 (meq/L)"] = df["Cl + SO4 (meq/L)"].apply(abs)
+    df["Na/(Na + Ca)"] = df["Sodio (mg/L)"] / (df["Sodio (mg/L)"] + df["Calcio (mg/L)"])
+    df["Cl/(Cl + HCO3)"] = df["Cloruros (mg/L)"] / (
+        df["Cloruros (mg/L)"] + df["Bicarbonato (mg/L)"]
+    )
+    df["Total dissolved salts (mg/L)"] = (
+        df["Sodio (mg/L)"]
+        + df["Calcio (mg/L)"]
+        + df["Cloruros (mg/L)"]
+        + df["Bicarbonato (mg/L)"]
+    )
+    df["total_anion"] = (
+        df["Sulfatos (meq/L)"]
+        + df["Bicarbonato (meq/L)"]
+        + df["Carbonato (meq/L)"]
+        + df["Cloruros (meq/L)"]
+    )
+    df["total_cation"] = (
+        df["Magnesio (meq/L)"]
+        + df["Calcio (meq/L)"]
+        + df["Potasio (meq/L)"]
+        + df["Sodio (meq/L)"]
+    )
+    df["SO4_norm"] = df["Sulfatos (meq/L)"] / df["total_anion"] * 100
+    df["Cl_norm"] = df["Cloruros (meq/L)"] / df["total_anion"] * 100
+    df["Mg_norm"] = df["Magnesio (meq/L)"] / df["total_cation"] * 100
+    df["Ca_norm"] = df["Calcio (meq/L)"] / df["total_cation"] * 100
+    df["xcation"] = 40 + 360 - (df["Ca_norm"] + df["Mg_norm"] / 2) * 3.6
+    df["ycation"] = 40 + (math.sqrt(3) * df["Mg_norm"] / 2) * 3.6
+    df["xanion"] = 40 + 360 + 100 + (df["Cl_norm"] + df["SO4_norm"] / 2) * 3.6
+    df["yanion"] = 40 + (df["SO4_norm"] * math.sqrt(3) / 2) * 3.6
+    df["xdiam"] = 0.5 * (
+        df["xcation"] + df["xanion"] + (df["yanion"] - df["ycation"]) / math.sqrt(3)
+    )
+    df["ydiam"] = 0.5 * (
+        df["yanion"] + df["ycation"] + math.sqrt(3) * (df["xanion"] - df["xcation"])
+    )
+    return df
+
+
+def kernel_transforms(df):
+    mifflin = mifflin_coordinates(
+        df["Sodio (meq/L)"],
+        df["Potasio (meq/L)"],
+        df["Cloruros (meq/L)"],
+        df["Sulfatos (meq/L)"],
+    )
+    gibbs = gibbs_coordinates(
+        df["Sodio (mg/L)"],
+        df["Calcio (mg/L)"],
+        df["Cloruros (mg/L)"],
+        df["Bicarbonato (mg/L)"],
+    )
+    piper = piper_coordinates(
+        df["Calcio (meq/L)"],
+        df["Magnesio (meq/L)"],
+        df["Sodio (meq/L)"],
+        df["Potasio (meq/L)"],
+        df["Bicarbonato (meq/L)"],
+        df["Carbonato (meq/L)"],
+        df["Cloruros (meq/L)"],
+        df["Sulfatos (meq/L)"],
+    )
+    return mifflin, gibbs, piper
+
+
+def check(legacy, kernels):
+    mifflin, gibbs, piper = kernels
+    expected = {
+        "Cl + SO4 (meq/L)": mifflin[0],
+        "Na + K (meq/L)": mifflin[1],
+        "Na/(Na + Ca)": gibbs[0],
+        "Cl/(Cl + HCO3)": gibbs[1],
+        "Total dissolved salts (mg/L)": gibbs[2],
+        **piper._asdict(),
+    }
+    for column, values in expected.items():
+        np.testing.assert_allclose(legacy[column].to_numpy(), values, rtol=1e-12)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(f"{'rows':>10} {'kernels':>10} {'pandas':>10} {'speedup':>8}")
+    for size in args.sizes:
+        data = build_data(size)
+        new_time, kernels = best_time(kernel_transforms, data, repeat=args.repeat)
+        old_time, legacy = best_time(legacy_transforms, data, repeat=args.repeat)
+        check(legacy, kernels)
+        print(
+            f"{size:>10} {new_time:>9.3f}s {old_time:>9.3f}s {old_time / new_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
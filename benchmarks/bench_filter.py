@@ -0,0 +1,98 @@
+"""
+Benchmark of the calculator filter: vectorized `FilterExpression` against the previous per-row `eval` path.
+
+Usage:
+    python benchmarks/bench_filter.py --rows 200000
+"""
+
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+from common import best_time
+from hydrogeology_app.filter_engine import compile_expression
+
+EXPRESSIONS = [
+    '[$"Calcio (meq/L)"] > 2',
+    '([$"Error %"] <= 10) & ([$"punto"] != "P-0003")',
+    '([$"punto"] in ["P-0001", "P-0002"]) | ([$"Sodio (meq/L)"] >= 4.5)',
+    'not ([$"campana"] == "2021-1")',
+]
+
+
+def legacy_evaluate(data, expression):
+    """
+    The per-row evaluation used by `HydrogeologyCalculator.evaluate_expression` before the filter engine.
+    """
+    index = 0
+    indices = []
+    for _, row in data.iterrows():
+        try:
+            columns = re.findall(r'\[\$"(.*?)"\]', expression)
+            row_expression = expression
+            for column in columns:
+                if column not in row:
+                    raise KeyError(f"Column '{column}' not found in the dataset.")
+                value = row[column]
+                if isinstance(value, (int, float)):
+                    row_expression = row_expression.replace(
+                        f'[$"{column}"]', str(value)
+                    )
+                else:
+                    row_expression = row_expression.replace(
+                        f'[$"{column}"]', f'"{str(value)}"'
+                    )
+            if eval(row_expression):
+                indices.append(int(index))
+        except (KeyError, SyntaxError, TypeError, ValueError):
+            pass
+        index += 1
+    return indices
+
+
+def build_data(rows, seed=0):
+    random = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "punto": [f"P-{i:04d}" for i in random.integers(0, 500, rows)],
+            "campana": random.choice(["2020-1", "2020-2", "2021-1", "2021-2"], rows),
+            "Calcio (meq/L)": random.gamma(2.0, 1.5, rows),
+            "Sodio (meq/L)": random.gamma(2.0, 2.0, rows),
+            "Error %": random.uniform(0, 30, rows),
+        }
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument(
+        "--legacy-rows",
+        type=int,
+        default=20_000,
+        help="Rows used for the per-row path, which is extrapolated to --rows.",
+    )
+    args = parser.parse_args()
+    data = build_data(args.rows)
+    legacy_data = data.iloc[: args.legacy_rows]
+    print(f"{'expression':70} {'vectorized':>12} {'per-row':>12} {'speedup':>9}")
+    for expression in EXPRESSIONS:
+        vector_time, positions = best_time(
+            lambda: compile_expression(expression).positions(data)
+        )
+        legacy_time, legacy_positions = best_time(
+            legacy_evaluate, legacy_data, expression, repeat=1
+        )
+        expected = [p for p in positions if p < args.legacy_rows]
+        assert expected == legacy_positions, f"Different rows selected for {expression}"
+        legacy_time *= args.rows / len(legacy_data)
+        print(
+            f"{expression:70} {vector_time:11.4f}s {legacy_time:11.2f}s "
+            f"{legacy_time / vector_time:8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
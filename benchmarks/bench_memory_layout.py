@@ -0,0 +1,58 @@
+"""
+Memory of the lab and meq tables with the default layout (one Python string per label, float64 values) and
+with the compact layout of `data_layout`: labels stored as categoricals and, optionally, float32 values.
+
+    python benchmarks/bench_memory_layout.py --sizes 100000 1000000
+"""
+
+import argparse
+
+import synthetic
+from common import best_time
+from hydrogeology_app.analitic_data import calculate_meq_table
+from hydrogeology_app.data_layout import compact_labels, memory_mb
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+LABEL_COLUMNS = [
+    synthetic.COLUMN_POINT,
+    synthetic.COLUMN_GROUP,
+    synthetic.COLUMN_PARAMETER,
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    meq_args = (
+        synthetic.parameter_rename(),
+        synthetic.COLUMN_PARAMETER,
+        synthetic.COLUMN_VALUE,
+    )
+    print(
+        f"{'rows':>9} {'lab MB':>8} {'compact':>8} {'meq MB':>8} {'compact':>8} "
+        f"{'float32':>8} {'meq time':>9} {'compact':>8}"
+    )
+    for rows in args.sizes:
+        data = synthetic.generate_rows(rows)
+        # Labels as read by pandas.read_excel: one Python string per row.
+        for column in LABEL_COLUMNS:
+            data[column] = data[column].astype(object)
+        compact = compact_labels(data.copy())
+        seconds, meq = best_time(
+            calculate_meq_table, data, *meq_args, repeat=args.repeat
+        )
+        compact_seconds, compact_meq = best_time(
+            calculate_meq_table, compact, *meq_args, repeat=args.repeat
+        )
+        single_meq = calculate_meq_table(compact, *meq_args, float32=True)
+        print(
+            f"{len(data):>9} {memory_mb(data):8.1f} {memory_mb(compact):8.1f} "
+            f"{memory_mb(meq):8.1f} {memory_mb(compact_meq):8.1f} "
+            f"{memory_mb(single_meq):8.1f} {seconds:8.3f}s {compact_seconds:7.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
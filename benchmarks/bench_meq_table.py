@@ -0,0 +1,145 @@
+"""
+Benchmark of `calculate_meq_table` against the previous pivot_table implementation, which
+tests/test_meq_table.py also uses to check that both build the same table.
+
+Usage:
+    python benchmarks/bench_meq_table.py --sizes 10000 100000 1000000 5000000
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from common import best_time
+from hydrogeology_app.analitic_data import EQUIVALENT_WEIGHTS_DICT, calculate_meq_table
+
+PARAMETERS = {
+    "Sulfatos (mg/L SO4-2)": "Sulfatos (mg/L)",
+    "Sodio (mg/L)": "Sodio (mg/L)",
+    "Potasio (mg/L)": "Potasio (mg/L)",
+    "Nitratos (mg/L N-NO3)": "Nitratos (mg/L)",
+    "Magnesio (mg/L)": "Magnesio (mg/L)",
+    "Cloruros (mg/L Cl-)": "Cloruros (mg/L)",
+    "null_carbonato": "Carbonato (mg/L)",
+    "Calcio (mg/L)": "Calcio (mg/L)",
+    "Bicarbonato (mg/L)": "Bicarbonato (mg/L)",
+    "Conductividad (µS/cm)": "Conductividad (µS/cm)",
+}
+EXTRA_PARAMETERS = ["pH", "Temperatura (°C)", "Hierro (mg/L)"]
+
+
+def legacy_calculate_meq_table(data, dict_rename, column_parameter, column_value):
+    """
+    The pivot_table implementation of `calculate_meq_table` before the vectorized rewrite.
+    """
+    df_analysis = data.copy()
+    df_analysis[column_parameter] = df_analysis[column_parameter].replace(dict_rename)
+    index_ = df_analysis.columns.tolist()
+    index_.remove(column_parameter)
+    index_.remove(column_value)
+    df_analysis[index_] = df_analysis[index_].fillna("--")
+    df_pivot = pd.pivot_table(
+        data=df_analysis,
+        values=column_value,
+        columns=column_parameter,
+        index=index_,
+        aggfunc="mean",
+    ).reset_index()
+    for pivot_column in df_pivot.drop(columns=index_).columns:
+        if pivot_column not in dict_rename.values():
+            df_pivot.drop(columns=pivot_column, inplace=True)
+    for column_param in dict_rename.values():
+        if not column_param in df_pivot.columns:
+            df_pivot[column_param] = 0
+    for key_rename, column_name in dict_rename.items():
+        if "null_" in key_rename:
+            df_pivot[column_name] = 0
+    for key_rename, column_name in dict_rename.items():
+        df_pivot[column_name] = df_pivot[column_name].fillna(0)
+    for col_param, weight in EQUIVALENT_WEIGHTS_DICT.items():
+        df_pivot[col_param.replace("mg/L", "meq/L")] = df_pivot[col_param].apply(
+            lambda x: 0 if pd.isna(x) else x * weight
+        )
+    df_pivot["Total Cationes (meq/L)"] = (
+        df_pivot["Calcio (meq/L)"]
+        + df_pivot["Magnesio (meq/L)"]
+        + df_pivot["Sodio (meq/L)"]
+        + df_pivot["Potasio (meq/L)"]
+    )
+    df_pivot["Total Aniones (meq/L)"] = (
+        df_pivot["Cloruros (meq/L)"]
+        + df_pivot["Sulfatos (meq/L)"]
+        + df_pivot["Carbonato (meq/L)"]
+        + df_pivot["Bicarbonato (meq/L)"]
+        + df_pivot["Nitratos (meq/L)"]
+    )
+    df_pivot["Error %"] = (
+        (df_pivot["Total Cationes (meq/L)"] + df_pivot["Total Aniones (meq/L)"])
+        * 100
+        / (df_pivot["Total Cationes (meq/L)"] - df_pivot["Total Aniones (meq/L)"])
+    )
+    df_pivot["Error %"] = df_pivot["Error %"].apply(abs)
+    return df_pivot
+
+
+def build_long_data(rows, seed=0):
+    """
+    Build a long-format lab table with missing labels, missing values and unmapped parameters.
+    """
+    random = np.random.default_rng(seed)
+    parameters = [key for key in PARAMETERS if not key.startswith("null_")]
+    parameters += EXTRA_PARAMETERS
+    samples = max(1, rows // len(parameters))
+    points = np.array([f"P-{i:05d}" for i in range(max(1, samples // 12))])
+    dates = pd.date_range("2015-01-01", periods=12, freq="90D")
+    campaign = np.array(["Seca", "Lluvias", None], dtype=object)
+    sample_point = random.integers(0, len(points), samples)
+    sample_date = random.integers(0, len(dates), samples)
+    sample_rows = np.repeat(np.arange(samples), len(parameters))[:rows]
+    data = pd.DataFrame(
+        {
+            "punto": points[sample_point][sample_rows],
+            "fecha": dates[sample_date][sample_rows],
+            "campaña": campaign[random.integers(0, 3, samples)][sample_rows],
+            "parametro": np.tile(parameters, samples)[:rows],
+            "valores": random.gamma(2.0, 20.0, len(sample_rows)),
+        }
+    )
+    data.loc[random.random(len(data)) < 0.02, "valores"] = np.nan
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000, 5_000_000]
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    print(f"{'rows':>10} {'vectorized':>12} {'pivot_table':>12} {'speedup':>8}")
+    for size in args.sizes:
+        data = build_long_data(size)
+        new_time, _ = best_time(
+            calculate_meq_table,
+            data,
+            PARAMETERS,
+            "parametro",
+            "valores",
+            repeat=args.repeat,
+        )
+        old_time, _ = best_time(
+            legacy_calculate_meq_table,
+            data,
+            PARAMETERS,
+            "parametro",
+            "valores",
+            repeat=1,
+        )
+        print(
+            f"{size:>10} {new_time:11.3f}s {old_time:11.3f}s {old_time / new_time:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""
+Benchmark of every stage of the application on synthetic lab datasets (see `synthetic.py`), from reading
+the workbook to rendering the figures, with the results saved as JSON and compared against a baseline.
+
+Stages:
+    excel_read            pd.read_excel of the generated workbook (up to --excel-max-rows rows)
+    excel_read_cached     the same worksheet read again through the sheet cache
+    validation            the date and value conversion and the parameter list, before selecting the
+                          parameters
+    calculate_meq_table   the meq table of the dataset
+    treeview_format       the conversion of the displayed rows into Treeview values
+    treeview_insert       the insertion of those rows in a Treeview (only with a display)
+    evaluate_expression   the calculator filters of FILTER_EXPRESSIONS on the meq table
+    export_excel          the streamed Excel export of the meq table with the control sheets
+    mifflin, gibbs, piper the figure functions, including the PNG rendering
+    stiff                 the Stiff diagrams of the first --stiff-points points, rendered to PNG
+
+Usage:
+    python benchmarks/bench_pipeline.py --sizes 1000 10000 100000 1000000 --output results.json
+    python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json
+
+With --baseline the run exits with status 1 when a stage is slower than the baseline by more than
+--tolerance (e.g. 1.5 = 50 % slower). Stages shorter than --min-seconds in the baseline are not compared,
+as their timing is mostly noise.
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import synthetic
+from common import SRC_DIR, best_time
+from hydrogeology_app.analitic_data import calculate_meq_table
+from hydrogeology_app.data_layout import compact_labels
+from hydrogeology_app.exporters import write_excel
+from hydrogeology_app.filter_engine import compile_expression
+from hydrogeology_app.funciones_figuras import (
+    gibbs_graphic,
+    iter_stiff_figures,
+    mifflin_graphic,
+    piper_graphic,
+    piper_template,
+)
+from hydrogeology_app.sheet_cache import SheetCache
+from hydrogeology_app.table_management import (
+    VIRTUAL_TABLE_BUFFER,
+    VIRTUAL_TABLE_THRESHOLD,
+    format_rows as table_rows,
+)
+from hydrogeology_app.validation import validate_lab_data
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+FILTER_EXPRESSIONS = [
+    '[$"Error %"] <= 10',
+    '([$"campaña"] == "Seca") & ([$"Calcio (meq/L)"] > 2)',
+    '[$"punto"] Like "P-000%"',
+]
+TREEVIEW_HEIGHT = 10
+
+
+def read_excel(path):
+    return pd.read_excel(path, sheet_name="Datos")
+
+
+def read_cached(cache, path):
+    return cache.read_excel(path, "Datos")
+
+
+def validate(data):
+    """
+    The checks of `HydrogeologyApp.select_parameter_labels`: the date and value columns converted by
+    `validate_lab_data` and the sorted unique parameters offered in the parameter comboboxes.
+    """
+    # A shallow copy, so each repetition converts the raw columns again.
+    data = data.copy(deep=False)
+    validate_lab_data(data, synthetic.COLUMN_DATE, synthetic.COLUMN_VALUE)
+    parameters = (
+        data[[synthetic.COLUMN_PARAMETER]]
+        .sort_values(by=synthetic.COLUMN_PARAMETER)[synthetic.COLUMN_PARAMETER]
+        .unique()
+        .tolist()
+    )
+    return data, parameters
+
+
+def displayed_rows(meq):
+    """
+    Return the rows the table materializes: every row, or the first window in virtual mode.
+    """
+    if len(meq) > VIRTUAL_TABLE_THRESHOLD:
+        return meq.iloc[: TREEVIEW_HEIGHT + VIRTUAL_TABLE_BUFFER]
+    return meq
+
+
+def format_rows(meq):
+    return table_rows(displayed_rows(meq))
+
+
+def insert_rows(treeview, rows):
+    treeview.delete(*treeview.get_children())
+    for row in rows:
+        treeview.insert("", "end", values=row)
+
+
+def filter_rows(meq):
+    return [
+        compile_expression(expression).positions(meq)
+        for expression in FILTER_EXPRESSIONS
+    ]
+
+
+def render(fig):
+    fig.savefig(io.BytesIO(), format="png")
+
+
+def mifflin(meq):
+    fig = mifflin_graphic(meq, col_color=synthetic.COLUMN_GROUP)
+    render(fig)
+    plt.close(fig)
+
+
+def gibbs(meq):
+    fig = gibbs_graphic(meq, col_color=synthetic.COLUMN_GROUP)
+    render(fig)
+    plt.close(fig)
+
+
+def piper(meq):
+    template = piper_template()
+    render(piper_graphic(meq, col_color=synthetic.COLUMN_GROUP, template=template))
+    template.clear()
+
+
+def stiff(meq, points):
+    first_points = meq[synthetic.COLUMN_POINT].drop_duplicates().iloc[:points]
+    subset = meq[meq[synthetic.COLUMN_POINT].isin(first_points)]
+    for _, fig in iter_stiff_figures(
+        subset, synthetic.COLUMN_POINT, synthetic.COLUMN_DATE
+    ):
+        render(fig)
+
+
+def open_treeview():
+    """
+    Create a hidden Treeview, or return None when no display is available.
+    """
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+
+        root = tk.Tk()
+    except Exception:
+        return None
+    root.withdraw()
+    treeview = ttk.Treeview(root, height=TREEVIEW_HEIGHT)
+    treeview.pack()
+    return treeview
+
+
+def run_size(rows, args, folder, treeview):
+    """
+    Time every stage on a dataset of about `rows` records.
+
+    Returns:
+    --------
+    dict
+        The best time in seconds of each stage that was run, and the sizes of the dataset.
+    """
+    data = synthetic.generate_rows(
+        rows, missing_ions=args.missing_ions, duplicates=args.duplicates
+    )
+    dict_rename = synthetic.parameter_rename()
+    result = {"rows": len(data)}
+    timings = {}
+    if len(data) <= args.excel_max_rows:
+        path = os.path.join(folder, f"lab_{rows}.xlsx")
+        data.to_excel(path, sheet_name="Datos", index=False)
+        timings["excel_read"], data_read = best_time(read_excel, path, repeat=1)
+        cache = SheetCache(os.path.join(folder, "cache"))
+        cache.read_excel(path, "Datos")
+        timings["excel_read_cached"], _ = best_time(
+            read_cached, cache, path, repeat=args.repeat
+        )
+        data = data_read
+    # The application stores the repeated labels of the sheet as categoricals as soon as it is read.
+    compact_labels(data)
+    timings["validation"], (data, _) = best_time(validate, data, repeat=args.repeat)
+    timings["calculate_meq_table"], meq = best_time(
+        calculate_meq_table,
+        data,
+        dict_rename,
+        synthetic.COLUMN_PARAMETER,
+        synthetic.COLUMN_VALUE,
+        repeat=args.repeat,
+    )
+    result["meq_rows"] = len(meq)
+    timings["treeview_format"], rows_values = best_time(
+        format_rows, meq, repeat=args.repeat
+    )
+    if treeview is not None:
+        timings["treeview_insert"], _ = best_time(
+            insert_rows, treeview, rows_values, repeat=args.repeat
+        )
+    timings["evaluate_expression"], _ = best_time(filter_rows, meq, repeat=args.repeat)
+    timings["export_excel"], _ = best_time(
+        write_excel,
+        meq,
+        os.path.join(folder, f"meq_{rows}.xlsx"),
+        charge_balance=True,
+        group_column=synthetic.COLUMN_GROUP,
+        repeat=1,
+    )
+    for name, function in (("mifflin", mifflin), ("gibbs", gibbs), ("piper", piper)):
+        timings[name], _ = best_time(function, meq, repeat=args.repeat)
+    if args.stiff_points > 0:
+        timings["stiff"], _ = best_time(stiff, meq, args.stiff_points, repeat=1)
+    result["seconds"] = timings
+    return result
+
+
+def environment():
+    """
+    Describe the machine and library versions of a run, stored next to its results.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=SRC_DIR,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+    }
+
+
+def compare(results, baseline, tolerance, min_seconds):
+    """
+    Print the ratio of each stage to the baseline and return the stages slower than `tolerance`.
+    """
+    regressions = []
+    for size, result in results["sizes"].items():
+        reference = baseline["sizes"].get(size)
+        if reference is None:
+            continue
+        for stage, seconds in result["seconds"].items():
+            base = reference["seconds"].get(stage)
+            if base is None:
+                continue
+            ratio = seconds / base
+            flag = ""
+            if base >= min_seconds and ratio > tolerance:
+                flag = "  REGRESSION"
+                regressions.append(f"{stage} @ {size} rows: {ratio:.2f}x")
+            print(
+                f"{size:>9} {stage:22} {base:10.4f}s {seconds:10.4f}s {ratio:6.2f}x{flag}"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--missing-ions", type=float, default=0.05)
+    parser.add_argument("--duplicates", type=float, default=0.01)
+    parser.add_argument(
+        "--excel-max-rows",
+        type=int,
+        default=200_000,
+        help="Larger datasets skip the Excel stages, as writing the workbook takes minutes.",
+    )
+    parser.add_argument("--stiff-points", type=int, default=10)
+    parser.add_argument("--output", help="JSON file where the results are written")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--min-seconds", type=float, default=0.01)
+    args = parser.parse_args()
+    treeview = open_treeview()
+    results = {"environment": environment(), "sizes": {}}
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in args.sizes:
+            result = run_size(rows, args, folder, treeview)
+            results["sizes"][str(rows)] = result
+            print(
+                f"{rows:>9} rows ({result['rows']} records, {result['meq_rows']} samples)"
+            )
+            for stage, seconds in result["seconds"].items():
+                print(f"{'':>9} {stage:22} {seconds:10.4f}s")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        print(
+            f"\n{'rows':>9} {'stage':22} {'baseline':>11} {'current':>11} {'ratio':>7}"
+        )
+        regressions = compare(results, baseline, args.tolerance, args.min_seconds)
+        if regressions:
+            print("\nRegressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Repeated Piper renders: decoding the background on every call (previous behaviour) against the cached
+background and the reusable Piper template. Also checks that the three produce the same image.
+
+Usage:
+    python benchmarks/bench_piper.py --renders 20 --samples 500
+"""
+
+import argparse
+import io
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import imageio
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from common import best_time
+from hydrogeology_app.funciones_figuras import (
+    PIPER_BACKGROUND,
+    _draw_piper,
+    data_path,
+    piper_graphic,
+    piper_template,
+)
+
+MEQ_COLUMNS = [
+    "Sulfatos (meq/L)",
+    "Bicarbonato (meq/L)",
+    "Carbonato (meq/L)",
+    "Cloruros (meq/L)",
+    "Magnesio (meq/L)",
+    "Calcio (meq/L)",
+    "Potasio (meq/L)",
+    "Sodio (meq/L)",
+]
+
+
+def build_data(samples, seed=0):
+    random = np.random.default_rng(seed)
+    data = pd.DataFrame(
+        {column: random.gamma(2.0, 1.0, samples) for column in MEQ_COLUMNS}
+    )
+    data["campaña"] = np.array(["Seca", "Lluvias"])[random.integers(0, 2, samples)]
+    return data
+
+
+def legacy_piper_graphic(df, col_style=None, col_color=None):
+    """
+    The figure set-up of the previous implementation: decode and flip the background on every call.
+    """
+    img = imageio.imread(data_path(PIPER_BACKGROUND))
+    df_fig = piper_graphic(df.copy(), col_style, col_color, template=_Capture())
+    fig, ax = plt.subplots()
+    plt.imshow(np.flipud(img), zorder=0)
+    _draw_piper(fig, ax, df_fig, col_style, col_color)
+    return fig
+
+
+class _Capture:
+    """
+    A stand-in template returning the coordinates computed by `piper_graphic` instead of drawing them.
+    """
+
+    def draw(self, df_fig, col_style, col_color):
+        return df_fig
+
+
+def render(mode, data, dpi):
+    buffer = io.BytesIO()
+    if mode == "legacy":
+        fig = legacy_piper_graphic(data.copy(), col_color="campaña")
+    elif mode == "cached":
+        fig = piper_graphic(data.copy(), col_color="campaña")
+    else:
+        fig = piper_graphic(data.copy(), col_color="campaña", template=piper_template())
+    fig.savefig(buffer, format="png", dpi=dpi)
+    if mode == "template":
+        piper_template().clear()
+    else:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def render_many(mode, data, renders, dpi):
+    for _ in range(renders):
+        image = render(mode, data, dpi)
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    data = build_data(args.samples)
+    images = {}
+    times = {}
+    for mode in ("legacy", "cached", "template"):
+        times[mode], png = best_time(
+            render_many, mode, data, args.renders, args.dpi, repeat=args.repeat
+        )
+        images[mode] = plt.imread(io.BytesIO(png))
+    for mode in ("cached", "template"):
+        assert np.array_equal(images["legacy"], images[mode]), f"{mode} image differs"
+    for mode, seconds in times.items():
+        print(
+            f"{mode:>9}: {seconds / args.renders * 1000:8.1f} ms per render "
+            f"({times['legacy'] / seconds:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
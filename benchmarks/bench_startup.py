@@ -0,0 +1,93 @@
+"""
+Start-up time of the application, measured in a fresh interpreter for every run: the import of the
+interface module and, when a display is available, the time until the main window is mapped and until the
+(deferred) table area is ready. Also lists the heavy libraries already loaded at start-up, which should be
+none of the plotting or Excel stack.
+
+The results can be written as JSON to keep track of the start-up time between releases.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --output startup.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from common import SRC_DIR
+
+HEAVY_MODULES = ("pandas", "numpy", "matplotlib", "seaborn", "imageio", "openpyxl")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import tkinter as tk
+from hydrogeology_app.interface import HydrogeologyApp
+result = {"import_s": time.perf_counter() - start}
+result["loaded"] = [name for name in %(heavy)r if name in sys.modules]
+if %(window)r:
+    root = tk.Tk()
+    app = None
+
+    def on_map(event):
+        result.setdefault("window_s", time.perf_counter() - start)
+
+    def wait_table():
+        if getattr(app, "table_mannagement", None) is None:
+            root.after(10, wait_table)
+            return
+        result["table_s"] = time.perf_counter() - start
+        root.destroy()
+
+    root.bind("<Map>", on_map, add="+")
+    root.after(10, wait_table)
+    app = HydrogeologyApp.__new__(HydrogeologyApp)
+    HydrogeologyApp.__init__(app, root)
+print(json.dumps(result))
+"""
+
+
+def run_probe(window):
+    """
+    Start the application in a new interpreter and return the timings it reports.
+    """
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE % {"heavy": HEAVY_MODULES, "window": window}],
+        cwd=SRC_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="JSON file where the results are written")
+    args = parser.parse_args()
+    window = bool(os.environ.get("DISPLAY")) or sys.platform in ("win32", "darwin")
+    runs = [run_probe(window) for _ in range(args.runs)]
+    summary = {"python": sys.version.split()[0], "runs": args.runs}
+    for key in ("import_s", "window_s", "table_s"):
+        values = [run[key] for run in runs if key in run]
+        if values:
+            summary[key] = {"median": statistics.median(values), "min": min(values)}
+            print(
+                f"{key[:-2]:>7}: {summary[key]['median'] * 1000:8.1f} ms median, "
+                f"{summary[key]['min'] * 1000:8.1f} ms best"
+            )
+    if not window:
+        print("no display: only the import is measured")
+    summary["loaded_at_startup"] = runs[-1]["loaded"]
+    print("loaded at start-up:", ", ".join(summary["loaded_at_startup"]) or "-")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(summary, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Peak memory and time of the Stiff export: every figure kept in the dictionary of `stiff_graphic`, the
+figures streamed (saved and closed one at a time) by `iter_stiff_figures`, and the multi-page PDF written by
+`export_stiff_atlas`.
+
+Each mode runs in its own interpreter, because the peak resident size of a process never goes down.
+
+    python benchmarks/bench_stiff_memory.py --points 100 400
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import common  # noqa: F401  (adds src/ to sys.path)
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+from hydrogeology_app.funciones_figuras import (
+    export_stiff_atlas,
+    iter_stiff_figures,
+    stiff_graphic,
+)
+
+MEQ_COLUMNS = [
+    "Sodio (meq/L)",
+    "Potasio (meq/L)",
+    "Cloruros (meq/L)",
+    "Calcio (meq/L)",
+    "Bicarbonato (meq/L)",
+    "Carbonato (meq/L)",
+    "Magnesio (meq/L)",
+    "Sulfatos (meq/L)",
+    "Nitratos (meq/L)",
+]
+
+
+MODES = ("dict", "stream", "atlas")
+
+
+def build_meq_data(points, dates=3, seed=0):
+    """
+    Build a meq table with one sample per point and date.
+    """
+    random = np.random.default_rng(seed)
+    data = pd.DataFrame(
+        {
+            "punto": np.repeat([f"P-{i:05d}" for i in range(points)], dates),
+            "fecha": np.tile(
+                pd.date_range("2020-01-01", periods=dates, freq="90D"), points
+            ),
+        }
+    )
+    for column in MEQ_COLUMNS:
+        data[column] = random.gamma(2.0, 1.0, len(data))
+    return data
+
+
+def run_mode(mode, points):
+    data = build_meq_data(points)
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as folder:
+        if mode == "dict":
+            figures = stiff_graphic(data, "punto", "fecha")
+            for point_id, fig in figures.items():
+                fig.savefig(os.path.join(folder, f"fig_stiff{point_id}.jpg"))
+        elif mode == "atlas":
+            export_stiff_atlas(
+                data, os.path.join(folder, "atlas_stiff.pdf"), "punto", "fecha"
+            )
+        else:
+            for point_id, fig in iter_stiff_figures(data, "punto", "fecha"):
+                fig.savefig(os.path.join(folder, f"fig_stiff{point_id}.jpg"))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": time.perf_counter() - start, "peak_mb": peak}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 400])
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args.points[0])
+        return
+    print(
+        f"{'points':>8}"
+        + "".join(f" {mode + ' MB':>10} {mode + ' s':>9}" for mode in MODES)
+    )
+    for points in args.points:
+        line = f"{points:>8}"
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--points", str(points)],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            line += f" {result['peak_mb']:>10.0f} {result['seconds']:>9.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
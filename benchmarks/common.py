@@ -0,0 +1,41 @@
+"""
+Helpers shared by the benchmark scripts.
+
+The scripts are run from the repository root, e.g. `python benchmarks/bench_filter.py`, and import the
+application package from `src/`.
+"""
+
+import os
+import sys
+import time
+
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"
+)
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+
+def best_time(function, *args, repeat=3, **kwargs):
+    """
+    Run a function several times and return the fastest wall time together with the last result.
+
+    Parameters:
+    -----------
+    function : callable
+        The function to be timed.
+    repeat : int, optional
+        How many times the function is executed.
+
+    Returns:
+    --------
+    tuple
+        The best wall time in seconds and the value returned by the last call.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
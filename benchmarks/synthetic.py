@@ -0,0 +1,151 @@
+"""
+Generator of synthetic long-format lab datasets for the benchmarks.
+
+The tables look like the exports the application reads: one row per point, sampling date and parameter,
+with the parameter labels of the ion catalog, a few parameters that are not ions, a grouping column,
+ions missing from some samples and duplicated records.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+import common  # noqa: F401  (adds src/ to sys.path)
+from hydrogeology_app.ion_catalog import ION_CATALOG
+
+COLUMN_POINT = "punto"
+COLUMN_DATE = "fecha"
+COLUMN_GROUP = "campaña"
+COLUMN_PARAMETER = "parametro"
+COLUMN_VALUE = "valores"
+CONDUCTIVITY = "Conductividad (µS/cm)"
+OTHER_PARAMETERS = [CONDUCTIVITY, "pH", "Temperatura (°C)"]
+DEFAULT_PARAMETERS = [ion.label for ion in ION_CATALOG if ion.required]
+DEFAULT_PARAMETERS += OTHER_PARAMETERS
+DEFAULT_DATES = 12
+
+
+def parameter_rename(parameters=DEFAULT_PARAMETERS):
+    """
+    Build the `dict_rename` argument of `calculate_meq_table` for the given parameter labels, as the
+    interface does when every ion is selected by its label.
+
+    Parameters:
+    -----------
+    parameters : list, optional
+        The parameter labels of the dataset.
+
+    Returns:
+    --------
+    dict
+        The lab label of each parameter mapped to its column, with `null_<key>` placeholders for the
+        required ions that are not in `parameters`.
+    """
+    dict_rename = {}
+    for ion in ION_CATALOG:
+        if ion.label in parameters:
+            dict_rename[ion.label] = ion.mg_label
+        elif ion.required:
+            dict_rename[f"null_{ion.key}"] = ion.mg_label
+    dict_rename[CONDUCTIVITY if CONDUCTIVITY in parameters else "null_conductivity"] = (
+        CONDUCTIVITY
+    )
+    return dict_rename
+
+
+def generate_lab_data(
+    points,
+    dates=DEFAULT_DATES,
+    parameters=DEFAULT_PARAMETERS,
+    missing_ions=0.05,
+    duplicates=0.01,
+    seed=0,
+):
+    """
+    Generate a long-format lab table.
+
+    Parameters:
+    -----------
+    points : int
+        The number of monitoring points.
+    dates : int, optional
+        The number of sampling dates of each point.
+    parameters : list, optional
+        The parameter labels measured in each sample.
+    missing_ions : float, optional
+        The probability that a parameter is missing from a sample.
+    duplicates : float, optional
+        The fraction of records repeated with a slightly different value, e.g. lab replicates.
+    seed : int, optional
+        The seed of the random generator.
+
+    Returns:
+    --------
+    pd.DataFrame
+        The table, with the point, date, group, parameter and value columns.
+    """
+    random = np.random.default_rng(seed)
+    point_names = np.array([f"P-{i:05d}" for i in range(points)], dtype=object)
+    start_dates = pd.Timestamp("2010-01-01") + pd.to_timedelta(
+        random.integers(0, 365, points), unit="D"
+    )
+    samples = points * dates
+    sample_point = np.repeat(np.arange(points), dates)
+    sample_date = start_dates[sample_point] + pd.to_timedelta(
+        np.tile(np.arange(dates) * 91, points), unit="D"
+    )
+    campaign = np.where(sample_date.month.isin([12, 1, 2, 3]), "Seca", "Lluvias")
+    record_sample = np.repeat(np.arange(samples), len(parameters))
+    record_parameter = np.tile(np.arange(len(parameters)), samples)
+    keep = random.random(len(record_sample)) >= missing_ions
+    record_sample = record_sample[keep]
+    record_parameter = record_parameter[keep]
+    repeated = np.flatnonzero(random.random(len(record_sample)) < duplicates)
+    record_sample = np.concatenate([record_sample, record_sample[repeated]])
+    record_parameter = np.concatenate([record_parameter, record_parameter[repeated]])
+    scale = np.array([_typical_value(label) for label in parameters])[record_parameter]
+    data = pd.DataFrame(
+        {
+            COLUMN_POINT: point_names[sample_point][record_sample],
+            COLUMN_DATE: sample_date[record_sample],
+            COLUMN_GROUP: campaign[record_sample],
+            COLUMN_PARAMETER: np.asarray(parameters, dtype=object)[record_parameter],
+            COLUMN_VALUE: np.round(
+                random.gamma(4.0, 0.25, len(record_sample)) * scale, 3
+            ),
+        }
+    )
+    return data.sort_values(
+        [COLUMN_POINT, COLUMN_DATE], kind="stable", ignore_index=True
+    )
+
+
+def generate_rows(rows, dates=DEFAULT_DATES, parameters=DEFAULT_PARAMETERS, **kwargs):
+    """
+    Generate a long-format lab table of about `rows` records, choosing the number of points.
+
+    The keyword arguments are those of `generate_lab_data`.
+    """
+    missing_ions = kwargs.get("missing_ions", 0.05)
+    duplicates = kwargs.get("duplicates", 0.01)
+    per_point = dates * len(parameters) * (1 - missing_ions) * (1 + duplicates)
+    points = max(1, math.ceil(rows / per_point))
+    return generate_lab_data(points, dates, parameters, **kwargs)
+
+
+def _typical_value(label):
+    """
+    Return the usual magnitude of a parameter, so the generated values are of a realistic order.
+    """
+    if label == CONDUCTIVITY:
+        return 600.0
+    if label == "pH":
+        return 7.2
+    if label.startswith("Temperatura"):
+        return 18.0
+    if label.startswith(("Bicarbonato", "Sulfatos", "Cloruros", "Calcio", "Sodio")):
+        return 60.0
+    if label.startswith(("Magnesio", "Nitratos")):
+        return 15.0
+    return 4.0
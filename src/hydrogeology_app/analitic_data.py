@@ -1,21 +1,29 @@
+import numpy as np
 import pandas as pd
-from typing import Dict, Text
+from typing import Dict, Sequence, Text
+from hydrogeology_app.ion_catalog import (
+    ION_CATALOG,
+    Ion,
+    conversion_matrix,
+    selected_ions,
+)
+from hydrogeology_app.data_layout import is_label_column
+from hydrogeology_app.instrumentation import traced
 
 EQUIVALENT_WEIGHTS_DICT = {
-    "Sulfatos (mg/L)": -2 / 96.06,
-    "Sodio (mg/L)": 1 / 22.99,
-    "Potasio (mg/L)": 1 / 39.1,
-    "Nitratos (mg/L)": -1 / 62,
-    "Magnesio (mg/L)": 2 / 24.31,
-    "Cloruros (mg/L)": -1 / 35.45,
-    "Carbonato (mg/L)": -2 / 60.01,
-    "Calcio (mg/L)": 2 / 40.08,
-    "Bicarbonato (mg/L)": -1 / 61.01,
+    ion.mg_label: ion.weight for ion in ION_CATALOG if ion.required
 }
+MISSING_LABEL = "--"
 
 
+@traced()
 def calculate_meq_table(
-    data, dict_rename: Dict, column_parameter: Text, column_value: Text
+    data,
+    dict_rename: Dict,
+    column_parameter: Text,
+    column_value: Text,
+    ion_catalog: Sequence[Ion] = ION_CATALOG,
+    float32: bool = False,
 ) -> pd.DataFrame:
     """
     Calculate a table of milliequivalents (meq/L) from input data, applying renaming, 
@@ -34,6 +42,12 @@ def calculate_meq_table(
     column_value : str
         The name of the column in the DataFrame that contains the values corresponding 
         to the parameters in `column_parameter`.
+    ion_catalog : sequence of Ion, optional
+        The ions converted to meq/L. Required ions are always part of the table; optional ions
+        only when `dict_rename` maps a parameter to their mg/L column.
+    float32 : bool, optional
+        Whether the concentrations, totals and error are stored as float32 instead of float64. They are
+        calculated in float64 either way.
 
     Returns:
     --------
@@ -43,68 +57,134 @@ def calculate_meq_table(
         total anions, and the percentage error between them.
         
     The resulting DataFrame includes the following calculated columns:
-        - "Total Cationes (meq/L)": Sum of calcium, magnesium, sodium, and potassium.
-        - "Total Aniones (meq/L)": Sum of chlorides, sulfates, carbonate, bicarbonate, and nitrates.
+        - "Total Cationes (meq/L)": Sum of the cations of the catalog (calcium, magnesium, sodium,
+          potassium, ...).
+        - "Total Aniones (meq/L)": Sum of the anions of the catalog (chlorides, sulfates, carbonate,
+          bicarbonate, nitrates, ...).
         - "Error %": The percentage error between the total cations and total anions.
 
     Notes:
     ------
     - Parameters in `column_parameter` that are not present in `dict_rename` are removed 
       from the DataFrame.
+    - The other columns identify the samples. Text columns are returned as categoricals, with missing
+      labels shown as "--"; date and numeric columns keep their type, with missing values as NaT/NaN.
     - Missing columns after renaming are filled with zeros.
-    - The function assumes the existence of a global dictionary `EQUIVALENT_WEIGHTS_DICT` 
-      that provides conversion factors from mg/L to meq/L for each parameter.
+    - The conversion factors come from the molar mass and charge of each ion of `ion_catalog`.
+    - The pivot groups integer codes of the factorized (categorical) key columns instead of the string
+      values, and the meq/L values and the ionic totals are obtained from the mg/L block with a single
+      matrix product (see `conversion_matrix`).
     """
-    df_analysis = data.copy()
-    df_analysis[column_parameter] = df_analysis[column_parameter].replace(dict_rename)
-    index_ = df_analysis.columns.tolist()
-    index_.remove(column_parameter)
-    index_.remove(column_value)
-    df_analysis[index_] = df_analysis[index_].fillna("--")
-    df_pivot = pd.pivot_table(
-        data=df_analysis,
-        values=column_value,
-        columns=column_parameter,
-        index=index_,
-        aggfunc="mean",
-    ).reset_index()
+    index_ = [
+        column
+        for column in data.columns
+        if column != column_parameter and column != column_value
+    ]
+    key_codes = {}
+    key_uniques = []
+    for position, column in enumerate(index_):
+        codes, uniques = _factorize_key(data[column])
+        key_codes[position] = codes
+        key_uniques.append(uniques)
 
-    for pivot_column in df_pivot.drop(columns=index_).columns:
-        if pivot_column not in dict_rename.values():
-            df_pivot.drop(columns=pivot_column, inplace=True)
+    raw_codes, raw_parameters = pd.factorize(data[column_parameter])
+    renamed = pd.Series(np.asarray(raw_parameters, dtype=object)).replace(dict_rename)
+    renamed_codes, parameters = pd.factorize(renamed, sort=True)
+    parameter_codes = np.append(renamed_codes, -1)[raw_codes]
 
-    for column_param in dict_rename.values():
-        if not column_param in df_pivot.columns:
-            df_pivot[column_param] = 0
+    valid = parameter_codes >= 0
+    keys = list(key_codes)
+    df_long = pd.DataFrame(
+        {position: codes[valid] for position, codes in key_codes.items()}
+    )
+    df_long["parameter"] = parameter_codes[valid]
+    df_long["value"] = data[column_value].to_numpy()[valid]
+    means = df_long.groupby(keys + ["parameter"], sort=True)["value"].mean().dropna()
+    if pd.api.types.is_integer_dtype(data[column_value]) and np.array_equal(
+        means, np.floor(means)
+    ):
+        means = means.astype(data[column_value].dtype)
+    df_wide = means.unstack("parameter")
 
+    columns = {}
+    for position, column in enumerate(index_):
+        level_codes = (
+            df_wide.index.get_level_values(position)
+            if df_wide.index.nlevels > 1
+            else df_wide.index
+        )
+        if is_label_column(data[column]):
+            columns[column] = pd.Categorical.from_codes(
+                level_codes.to_numpy(), categories=key_uniques[position]
+            )
+        else:
+            columns[column] = key_uniques[position].take(level_codes.to_numpy())
+    mapped_names = set(dict_rename.values())
+    for code in df_wide.columns:
+        if parameters[code] in mapped_names:
+            columns[parameters[code]] = df_wide[code].to_numpy()
+    for column_param in dict_rename.values():
+        if column_param not in columns:
+            columns[column_param] = np.zeros(len(df_wide), dtype=np.int64)
     for key_rename, column_name in dict_rename.items():
         if "null_" in key_rename:
-            df_pivot[column_name] = 0
+            columns[column_name] = np.zeros(len(df_wide), dtype=np.int64)
+    for column_name in dict_rename.values():
+        if columns[column_name].dtype.kind == "f":
+            columns[column_name] = np.nan_to_num(columns[column_name], nan=0.0)
 
-    for key_rename, column_name in dict_rename.items():
-        df_pivot[column_name] = df_pivot[column_name].fillna(0)
-
-    for col_param, weight in EQUIVALENT_WEIGHTS_DICT.items():
-        df_pivot[col_param.replace("mg/L", "meq/L")] = df_pivot[col_param].apply(
-            lambda x: 0 if pd.isna(x) else x * weight
+    ions = selected_ions(ion_catalog, dict_rename.values())
+    mg_block = np.column_stack(
+        [columns[ion.mg_label] for ion in ions] or [np.zeros((len(df_wide), 0))]
+    ).astype(float)
+    meq_block = mg_block @ conversion_matrix(ions)
+    for position, ion in enumerate(ions):
+        columns[ion.meq_label] = meq_block[:, position]
+    total_cations = meq_block[:, len(ions)]
+    total_anions = meq_block[:, len(ions) + 1]
+    columns["Total Cationes (meq/L)"] = total_cations
+    columns["Total Aniones (meq/L)"] = total_anions
+    with np.errstate(divide="ignore", invalid="ignore"):
+        columns["Error %"] = np.abs(
+            (total_cations + total_anions) * 100 / (total_cations - total_anions)
         )
-    df_pivot["Total Cationes (meq/L)"] = (
-        df_pivot["Calcio (meq/L)"]
-        + df_pivot["Magnesio (meq/L)"]
-        + df_pivot["Sodio (meq/L)"]
-        + df_pivot["Potasio (meq/L)"]
-    )
-    df_pivot["Total Aniones (meq/L)"] = (
-        df_pivot["Cloruros (meq/L)"]
-        + df_pivot["Sulfatos (meq/L)"]
-        + df_pivot["Carbonato (meq/L)"]
-        + df_pivot["Bicarbonato (meq/L)"]
-        + df_pivot["Nitratos (meq/L)"]
-    )
-    df_pivot["Error %"] = (
-        (df_pivot["Total Cationes (meq/L)"] + df_pivot["Total Aniones (meq/L)"])
-        * 100
-        / (df_pivot["Total Cationes (meq/L)"] - df_pivot["Total Aniones (meq/L)"])
-    )
-    df_pivot["Error %"] = df_pivot["Error %"].apply(abs)
+    if float32:
+        value_columns = list(dict_rename.values()) + [ion.meq_label for ion in ions]
+        value_columns += ["Total Cationes (meq/L)", "Total Aniones (meq/L)", "Error %"]
+        for column in value_columns:
+            columns[column] = np.asarray(columns[column], dtype=np.float32)
+    df_pivot = pd.DataFrame(columns)
+    df_pivot.columns.name = column_parameter
     return df_pivot
+
+
+def _factorize_key(series: pd.Series):
+    """
+    Factorize a column identifying the samples, keeping the samples with a missing value as a group.
+
+    Label columns are filled with `MISSING_LABEL` and their distinct values returned as plain labels, to
+    build a categorical; other columns keep NaN/NaT as one more distinct value.
+
+    Returns:
+    --------
+    tuple
+        The code of every row and the sorted distinct values.
+    """
+    if is_label_column(series):
+        if series.isna().any():
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                if MISSING_LABEL not in series.cat.categories:
+                    # Sort the new label among the others, as it is in an object column.
+                    _, categories = pd.factorize(
+                        series.cat.categories.append(pd.Index([MISSING_LABEL])),
+                        sort=True,
+                    )
+                    series = series.cat.set_categories(categories)
+            series = series.fillna(MISSING_LABEL)
+        codes, uniques = pd.factorize(series, sort=True)
+        return codes, pd.Index(np.asarray(uniques, dtype=object))
+    codes, uniques = pd.factorize(series, sort=True)
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(uniques), codes)
+        uniques = uniques.append(pd.Index(series[series.isna()].iloc[:1]))
+    return codes, uniques
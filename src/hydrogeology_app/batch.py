@@ -0,0 +1,555 @@
+"""
+Headless processing of many workbooks from the command line.
+
+Each workbook goes through the same pipeline as the GUI (read the sheet, compute the meq table, export the
+figures) in a pool of worker processes using the non-interactive Agg backend, e.g.
+
+    python src/main.py campañas/ --mapping mapeo.json --output resultados --workers 4
+
+The mapping file is a JSON object:
+
+    {
+        "sheet": "Datos",
+        "columns": {"point": "punto", "date": "fecha", "parameter": "parametro", "value": "valores"},
+        "parameters": {"calcio": "Calcio (mg/L)", "conductividad": "Conductividad (µS/cm)", ...},
+        "group": null,
+        "color": null,
+        "ion_catalog": null
+    }
+
+`parameters` maps the keys of the ion catalog (plus `conductividad`) to the parameter labels of the lab
+data; required ions left out are treated as zero, as in the GUI. `sheet` defaults to the first worksheet
+and `ion_catalog` optionally points to a JSON catalog read with `load_ion_catalog`.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Sequence, Text, Tuple
+
+import matplotlib
+import pandas as pd
+
+matplotlib.use("Agg")
+
+from hydrogeology_app.analitic_data import calculate_meq_table
+from hydrogeology_app.data_layout import compact_labels
+from hydrogeology_app.excel_reader import list_sheets
+from hydrogeology_app.exporters import describe_mapping, write_excel
+from hydrogeology_app.funciones_figuras import export_figures
+from hydrogeology_app.instrumentation import call_traced, enabled, merge
+from hydrogeology_app.ion_catalog import ION_CATALOG, Ion, load_ion_catalog
+from hydrogeology_app.sheet_cache import SheetCache
+from hydrogeology_app.validation import validate_lab_data
+
+CONDUCTIVITY_KEY = "conductividad"
+CONDUCTIVITY_LABEL = "Conductividad (µS/cm)"
+REQUIRED_COLUMNS = ("point", "date", "parameter", "value")
+SUMMARY_FILE = "resumen.json"
+ISSUES_FILE = "problemas_datos.csv"
+MEQ_TABLE_FILE = "tabla_meq.xlsx"
+
+
+def load_mapping(path: Text) -> Dict:
+    """
+    Read and validate the column and parameter mapping file.
+
+    Parameters:
+    -----------
+    path : str
+        The path to the JSON mapping file.
+
+    Returns:
+    --------
+    dict
+        The mapping, with the optional entries filled with their defaults.
+
+    Raises:
+    -------
+    ValueError
+        If a required column is not mapped.
+    """
+    with open(path, encoding="utf-8") as mapping_file:
+        mapping = json.load(mapping_file)
+    columns = mapping.get("columns", {})
+    missing = [column for column in REQUIRED_COLUMNS if not columns.get(column)]
+    if missing:
+        raise ValueError(f"The mapping file does not define the columns {missing}.")
+    mapping.setdefault("sheet", None)
+    mapping.setdefault("parameters", {})
+    mapping.setdefault("group", None)
+    mapping.setdefault("color", None)
+    catalog_path = mapping.get("ion_catalog")
+    if catalog_path and not os.path.isabs(catalog_path):
+        catalog_path = os.path.join(
+            os.path.dirname(os.path.abspath(path)), catalog_path
+        )
+    mapping["ion_catalog"] = catalog_path
+    return mapping
+
+
+def parameter_rename(
+    parameters: Dict[Text, Text], ion_catalog: Sequence[Ion]
+) -> Dict[Text, Text]:
+    """
+    Build the rename dictionary expected by `calculate_meq_table` from the parameters of the mapping.
+
+    Parameters:
+    -----------
+    parameters : dict
+        The parameter label of each ion key (and of `conductividad`).
+    ion_catalog : sequence
+        The ions of the catalog.
+
+    Returns:
+    --------
+    dict
+        A dictionary mapping the parameter labels (or the `null_` placeholders of the unmapped required
+        ions) to the mg/L column names.
+
+    Raises:
+    -------
+    ValueError
+        If a key is not part of the catalog or two ions share the same parameter label.
+    """
+    keys = {ion.key for ion in ion_catalog} | {CONDUCTIVITY_KEY}
+    unknown = sorted(set(parameters) - keys)
+    if unknown:
+        raise ValueError(f"Unknown ions in the mapping file: {unknown}.")
+    selected_parameters = {}
+    for ion in ion_catalog:
+        if parameters.get(ion.key):
+            selected_parameters[ion.mg_label] = parameters[ion.key]
+        elif ion.required:
+            selected_parameters[ion.mg_label] = f"null_{ion.key}"
+    selected_parameters[CONDUCTIVITY_LABEL] = (
+        parameters.get(CONDUCTIVITY_KEY) or "null_conductivity"
+    )
+    labels = list(selected_parameters.values())
+    repeated = sorted({label for label in labels if labels.count(label) > 1})
+    if repeated:
+        raise ValueError(f"Two ions are mapped to the same parameter: {repeated}.")
+    return {
+        parameter: column_name for column_name, parameter in selected_parameters.items()
+    }
+
+
+def find_workbooks(inputs: Sequence[Text]) -> List[Text]:
+    """
+    Expand the folders and glob patterns given on the command line into a sorted list of workbooks.
+
+    Parameters:
+    -----------
+    inputs : sequence
+        Folders (every .xlsx file inside is used), glob patterns or workbook paths.
+
+    Returns:
+    --------
+    list
+        The paths of the workbooks, without duplicates and skipping Excel lock files (`~$...`).
+    """
+    workbooks = set()
+    for entry in inputs:
+        if os.path.isdir(entry):
+            paths = glob.glob(os.path.join(entry, "*.xlsx"))
+        else:
+            paths = glob.glob(entry)
+        workbooks.update(
+            os.path.abspath(path)
+            for path in paths
+            if os.path.isfile(path) and not os.path.basename(path).startswith("~$")
+        )
+    return sorted(workbooks)
+
+
+def output_folder(output_dir: Text, workbook: Text) -> Text:
+    """
+    Return the folder where the results of a workbook are written, named after the workbook.
+    """
+    return os.path.join(output_dir, os.path.splitext(os.path.basename(workbook))[0])
+
+
+def process_workbook(
+    workbook: Text,
+    mapping: Dict,
+    output_dir: Text,
+    use_cache: bool = True,
+    stiff_atlas: Tuple[int, int] = None,
+    float32: bool = False,
+    control_sheets: bool = False,
+) -> Dict:
+    """
+    Run the sheet → meq table → figures pipeline for one workbook.
+
+    Errors are caught and reported in the result, so one broken workbook does not stop the batch. Rows with
+    invalid dates or values are written to `ISSUES_FILE` in the output folder of the workbook.
+
+    Parameters:
+    -----------
+    workbook : str
+        The path to the workbook.
+    mapping : dict
+        The mapping returned by `load_mapping`.
+    output_dir : str
+        The folder holding one results folder per workbook.
+    use_cache : bool, optional
+        Whether worksheets are read through the sheet cache.
+    stiff_atlas : tuple, optional
+        The rows and columns per page to write the Stiff diagrams into a PDF atlas instead of one image per
+        point.
+    float32 : bool, optional
+        Whether the values of the meq table are stored in single precision.
+    control_sheets : bool, optional
+        Whether the charge-balance, group summary and mapping sheets are added to the meq table workbook.
+
+    Returns:
+    --------
+    dict
+        The workbook, its output folder, the status (`ok` or `error`), the time of each stage in seconds,
+        the number of samples and figures, the warnings raised while drawing and the error, if any.
+    """
+    result = {
+        "workbook": workbook,
+        "output": output_folder(output_dir, workbook),
+        "status": "ok",
+        "timings": {},
+        "samples": 0,
+        "figures": 0,
+        "warnings": [],
+        "error": None,
+    }
+    start = time.perf_counter()
+    stage_start = start
+    stage = "select_sheet"
+
+    def finish_stage(name):
+        nonlocal stage_start
+        now = time.perf_counter()
+        result["timings"][name] = round(now - stage_start, 4)
+        stage_start = now
+
+    try:
+        columns = mapping["columns"]
+        sheet_name = mapping["sheet"] or list_sheets(workbook)[0]
+        if use_cache:
+            data = SheetCache().read_excel(workbook, sheet_name)
+        else:
+            data = pd.read_excel(workbook, sheet_name=sheet_name)
+        compact_labels(data)
+        finish_stage(stage)
+
+        stage = "validate"
+        issues = validate_lab_data(data, columns["date"], columns["value"])
+        if len(issues) > 0:
+            os.makedirs(result["output"], exist_ok=True)
+            issues.to_csv(
+                os.path.join(result["output"], ISSUES_FILE),
+                index=False,
+                encoding="utf-8",
+            )
+            raise ValueError(
+                f"{len(issues)} filas con fechas o valores inválidos, ver {ISSUES_FILE}"
+            )
+        finish_stage(stage)
+
+        stage = "calculate_meq_table"
+        ion_catalog = (
+            load_ion_catalog(mapping["ion_catalog"])
+            if mapping["ion_catalog"]
+            else ION_CATALOG
+        )
+        dict_rename = parameter_rename(mapping["parameters"], ion_catalog)
+        df_data = calculate_meq_table(
+            data,
+            dict_rename,
+            columns["parameter"],
+            columns["value"],
+            ion_catalog,
+            float32=float32,
+        )
+        result["samples"] = len(df_data)
+        os.makedirs(result["output"], exist_ok=True)
+        write_excel(
+            df_data,
+            os.path.join(result["output"], MEQ_TABLE_FILE),
+            charge_balance=control_sheets,
+            group_column=mapping["group"],
+            mapping=(
+                describe_mapping(
+                    {
+                        "Pestaña": sheet_name,
+                        "Columna de puntos": columns["point"],
+                        "Columna de fechas": columns["date"],
+                        "Columna de parámetros": columns["parameter"],
+                        "Columna de valores": columns["value"],
+                        "Columna de agrupación": mapping["group"],
+                        "Columna de color": mapping["color"],
+                    },
+                    dict_rename,
+                )
+                if control_sheets
+                else None
+            ),
+        )
+        finish_stage(stage)
+
+        stage = "export_figures"
+        paths = export_figures(
+            df_data,
+            result["output"],
+            columns["point"],
+            columns["date"],
+            col_style=mapping["group"],
+            col_color=mapping["color"],
+            notify=lambda title, message: result["warnings"].append(message),
+            stiff_atlas=stiff_atlas,
+        )
+        result["figures"] = len(paths)
+        finish_stage(stage)
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{stage}: {type(e).__name__}: {e}"
+        result["traceback"] = traceback.format_exc()
+    result["timings"]["total"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def run_batch(
+    workbooks: Sequence[Text],
+    mapping: Dict,
+    output_dir: Text,
+    workers: int = None,
+    use_cache: bool = True,
+    progress=None,
+    stiff_atlas: Tuple[int, int] = None,
+    float32: bool = False,
+    control_sheets: bool = False,
+) -> List[Dict]:
+    """
+    Process the workbooks in a pool of worker processes.
+
+    Parameters:
+    -----------
+    workbooks : sequence
+        The paths to the workbooks.
+    mapping : dict
+        The mapping returned by `load_mapping`.
+    output_dir : str
+        The folder holding one results folder per workbook.
+    workers : int, optional
+        The number of worker processes. Defaults to the number of CPUs; 1 processes the workbooks in the
+        current process.
+    use_cache : bool, optional
+        Whether worksheets are read through the sheet cache.
+    progress : callable, optional
+        Called with each result as soon as its workbook is finished.
+    stiff_atlas : tuple, optional
+        The rows and columns per page of the Stiff PDF atlas, if one is written instead of images.
+    float32 : bool, optional
+        Whether the values of the meq tables are stored in single precision.
+    control_sheets : bool, optional
+        Whether the charge-balance, group summary and mapping sheets are added to the meq table workbooks.
+
+    Returns:
+    --------
+    list
+        The result of every workbook, in the order of `workbooks`.
+    """
+    results = {}
+    if workers == 1 or len(workbooks) <= 1:
+        for workbook in workbooks:
+            results[workbook] = process_workbook(
+                workbook,
+                mapping,
+                output_dir,
+                use_cache,
+                stiff_atlas,
+                float32,
+                control_sheets,
+            )
+            if progress is not None:
+                progress(results[workbook])
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    call_traced,
+                    enabled(),
+                    process_workbook,
+                    workbook,
+                    mapping,
+                    output_dir,
+                    use_cache,
+                    stiff_atlas,
+                    float32,
+                    control_sheets,
+                ): workbook
+                for workbook in workbooks
+            }
+            for future in as_completed(futures):
+                results[futures[future]], events = future.result()
+                merge(events)
+                if progress is not None:
+                    progress(results[futures[future]])
+    return [results[workbook] for workbook in workbooks]
+
+
+def summarize(results: Sequence[Dict], elapsed: float) -> Dict:
+    """
+    Build the summary report of a batch.
+
+    Parameters:
+    -----------
+    results : sequence
+        The results returned by `process_workbook`.
+    elapsed : float
+        The wall time of the whole batch in seconds.
+
+    Returns:
+    --------
+    dict
+        The totals of the batch, the time spent in each stage and the result of every workbook.
+    """
+    stages = {}
+    for result in results:
+        for stage, seconds in result["timings"].items():
+            if stage != "total":
+                stages[stage] = round(stages.get(stage, 0) + seconds, 4)
+    return {
+        "workbooks": len(results),
+        "succeeded": sum(result["status"] == "ok" for result in results),
+        "failed": sum(result["status"] == "error" for result in results),
+        "elapsed": round(elapsed, 4),
+        "stage_totals": stages,
+        "results": list(results),
+    }
+
+
+def format_result(result: Dict) -> Text:
+    name = os.path.basename(result["workbook"])
+    if result["status"] == "ok":
+        return (
+            f"[ok]    {name}: {result['samples']} muestras, {result['figures']} figuras, "
+            f"{result['timings']['total']:.1f} s"
+        )
+    return f"[error] {name}: {result['error']}"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="hydrogeograph",
+        description="Procesa libros de Excel sin interfaz gráfica: tabla meq y figuras por libro.",
+    )
+    parser.add_argument(
+        "inputs", nargs="+", help="Carpetas, patrones glob o libros .xlsx a procesar."
+    )
+    parser.add_argument(
+        "-m",
+        "--mapping",
+        required=True,
+        help="Archivo JSON con la pestaña, columnas y parámetros.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="resultados",
+        help="Carpeta de salida; se crea una subcarpeta por libro.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Número de procesos (por defecto, uno por CPU).",
+    )
+    parser.add_argument(
+        "--summary",
+        default=None,
+        help=f"Ruta del resumen JSON (por defecto, <output>/{SUMMARY_FILE}).",
+    )
+    parser.add_argument(
+        "--atlas",
+        nargs="?",
+        const="4x3",
+        default=None,
+        metavar="FILASxCOLUMNAS",
+        help="Escribe los diagramas de Stiff en un único PDF (atlas_stiff.pdf) con la grilla "
+        "indicada por página (por defecto 4x3) en lugar de una imagen por punto.",
+    )
+    parser.add_argument(
+        "--float32",
+        action="store_true",
+        help="Guarda los valores de la tabla meq en precisión simple, con la mitad de memoria.",
+    )
+    parser.add_argument(
+        "--control-sheets",
+        action="store_true",
+        help="Agrega a tabla_meq.xlsx las hojas de balance iónico, resumen por grupo y mapeo.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Lee las pestañas del Excel sin usar la caché.",
+    )
+    return parser
+
+
+def main(argv: Sequence[Text] = None) -> int:
+    """
+    Run the batch command line.
+
+    Parameters:
+    -----------
+    argv : sequence, optional
+        The command line arguments, without the program name. Defaults to `sys.argv[1:]`.
+
+    Returns:
+    --------
+    int
+        The exit code: 0 if every workbook was processed, 1 if any failed and 2 if there was nothing to do.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    stiff_atlas = None
+    if args.atlas:
+        try:
+            stiff_atlas = tuple(int(value) for value in args.atlas.lower().split("x"))
+        except ValueError:
+            stiff_atlas = ()
+        if len(stiff_atlas) != 2 or min(stiff_atlas) < 1:
+            parser.error(f"Grilla de atlas inválida: {args.atlas} (ejemplo: 4x3).")
+    mapping = load_mapping(args.mapping)
+    workbooks = find_workbooks(args.inputs)
+    if not workbooks:
+        print("No se encontraron libros .xlsx en las rutas indicadas.", file=sys.stderr)
+        return 2
+    os.makedirs(args.output, exist_ok=True)
+    print(f"Procesando {len(workbooks)} libros...")
+    start = time.perf_counter()
+    results = run_batch(
+        workbooks,
+        mapping,
+        args.output,
+        workers=args.workers,
+        use_cache=not args.no_cache,
+        progress=lambda result: print(format_result(result), flush=True),
+        stiff_atlas=stiff_atlas,
+        float32=args.float32,
+        control_sheets=args.control_sheets,
+    )
+    summary = summarize(results, time.perf_counter() - start)
+    summary_path = args.summary or os.path.join(args.output, SUMMARY_FILE)
+    with open(summary_path, "w", encoding="utf-8") as summary_file:
+        json.dump(summary, summary_file, indent=2, ensure_ascii=False)
+    print(
+        f"{summary['succeeded']} correctos, {summary['failed']} con errores "
+        f"en {summary['elapsed']:.1f} s. Resumen: {summary_path}"
+    )
+    for stage, seconds in summary["stage_totals"].items():
+        print(f"  {stage}: {seconds:.1f} s")
+    return 1 if summary["failed"] else 0
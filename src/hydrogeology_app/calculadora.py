@@ -1,6 +1,9 @@
 import tkinter as tk
-import re
+from hydrogeology_app.filter_engine import compile_expression
+from hydrogeology_app.instrumentation import stage
+from hydrogeology_app.value_index import expression_literal
 
+UNIQUE_VALUES_PAGE_SIZE = 200
 
 
 class HydrogeologyCalculator:
@@ -17,6 +20,13 @@ class HydrogeologyCalculator:
         A Listbox widget used for displaying and selecting fields.
     listbox_uniques : tk.Listbox
         A Listbox widget used for displaying unique values of the selected field.
+    entry_search : tk.Entry
+        An Entry widget used for filtering the unique values by prefix.
+    unique_field : str
+        The field whose unique values are displayed.
+    unique_items : list
+        The text inserted into the expression for each row of the unique values listbox, or None for the
+        values that cannot be inserted, such as missing values.
     entry_formula : tk.Entry
         An Entry widget used for inputting and displaying the expression to be evaluated.
     comparators : list
@@ -41,6 +51,9 @@ class HydrogeologyCalculator:
         self.app_table_mananegement = app_table_mananegement
         self.listbox_fields = None
         self.listbox_uniques = None
+        self.entry_search = None
+        self.unique_field = None
+        self.unique_items = []
         self.entry_formula = None
         self.comparators = ["=", "<>", ">", ">=", "<", "<=", "In", "Like", "Not"]
         self.grouping = "()"
@@ -51,19 +64,56 @@ class HydrogeologyCalculator:
         """
         Populate the listbox with unique values of the selected field.
 
-        This method retrieves the selected field from the fields listbox, finds its unique values in the
-        dataset managed by TableManagement, and displays those unique values in the unique values listbox.
+        This method retrieves the selected field from the fields listbox and displays the first page of its
+        unique values, with their counts, in the unique values listbox. The values come from the unique value
+        index kept by TableManagement, so the column is only scanned the first time it is requested.
         """
         selected_index = self.listbox_fields.curselection()
         selected_values = [self.listbox_fields.get(i) for i in selected_index]
         if len(selected_values) > 0:
-            self.listbox_uniques.delete(0, tk.END)
             field = selected_values[0]
-            field = field.replace('"', "")
-            values = self.app_table_mananegement.data_tree[field].unique().tolist()
+            self.unique_field = field.replace('"', "")
             self.listbox_uniques.config(state="normal")
-            for value in values:
-                self.listbox_uniques.insert(tk.END, f'"{value}"')
+            self.listbox_uniques.delete(0, tk.END)
+            self.unique_items = []
+            self.load_unique_page()
+
+    def load_unique_page(self):
+        """
+        Append the next page of unique values matching the search prefix to the unique values listbox.
+        """
+        if self.unique_field is None:
+            return
+        column_values = self.app_table_mananegement.unique_index.column(
+            self.app_table_mananegement.data_tree, self.unique_field
+        )
+        page = column_values.page(
+            self.entry_search.get(), len(self.unique_items), UNIQUE_VALUES_PAGE_SIZE
+        )
+        for value, label, count in page:
+            literal = expression_literal(value)
+            self.unique_items.append(literal)
+            self.listbox_uniques.insert(tk.END, f"{literal or label} ({count})")
+
+    def search_uniques(self, _):
+        """
+        Reload the unique values listbox with the values starting with the search prefix.
+
+        Triggered by a key release in the search entry.
+        """
+        if self.unique_field is not None:
+            self.listbox_uniques.delete(0, tk.END)
+            self.unique_items = []
+            self.load_unique_page()
+
+    def scroll_uniques(self, first, last):
+        """
+        Load the next page of unique values when the listbox is scrolled to its end.
+
+        Used as the yscrollcommand of the unique values listbox.
+        """
+        if float(last) >= 1.0 and len(self.unique_items) > 0:
+            self.load_unique_page()
 
     def clear_uniques(self, _):
         """
@@ -72,6 +122,8 @@ class HydrogeologyCalculator:
         This method clears the unique values listbox and disables it when no field is selected.
         Triggered by an event.
         """
+        self.unique_field = None
+        self.unique_items = []
         self.listbox_uniques.delete(0, tk.END)
         self.listbox_uniques.config(state="disabled")
 
@@ -83,7 +135,10 @@ class HydrogeologyCalculator:
         into the expression entry at the current cursor position.
         Triggered by a double-click event.
         """
-        text = self.listbox_uniques.get(self.listbox_uniques.curselection())
+        text = self.unique_items[self.listbox_uniques.curselection()[0]]
+        if text is None:
+            # Missing values are listed with their count but cannot be written in the expression.
+            return
         cursor_position = self.entry_formula.index(tk.INSERT)
         self.entry_formula.insert(cursor_position, text)
 
@@ -118,50 +173,37 @@ class HydrogeologyCalculator:
         """
         Evaluate the given expression against the dataset and select matching rows.
 
-        This method parses and evaluates the expression by replacing field placeholders with actual values
-        from the dataset. It then identifies the rows that satisfy the expression and selects them in the treeview.
+        This method parses the expression once and evaluates it against whole columns of the dataset
+        (see `FilterExpression`). It then identifies the rows that satisfy the expression and selects them
+        in the treeview.
 
         Parameters:
         -----------
         expression : str
             The expression to be evaluated against the dataset.
+
+        Returns:
+        --------
+        list
+            The positions of the rows that satisfy the expression.
         """
-        index = 0
         indices = []
-        for row in self.app_table_mananegement.treeview.selection():
-            self.app_table_mananegement.treeview.selection_remove(row)
-        
-        for _, row in self.app_table_mananegement.data_tree.iterrows():
-            try:
-                columns = re.findall(r'\[\$"(.*?)"\]', expression)
-                row_expression = expression
-                for column in columns:
-                    if column not in row:
-                        raise KeyError(f"Column '{column}' not found in the dataset.")
-                    
-                    value = row[column]
-                    if isinstance(value, (int, float)):
-                        row_expression = row_expression.replace(f'[$"{column}"]', str(value))
-                    else:
-                        row_expression = row_expression.replace(f'[$"{column}"]', f'"{str(value)}"')
-                if eval(row_expression):
-                    indices.append(int(index))
-
-            except KeyError as e:
-                print(f"KeyError: {e}")
-            except SyntaxError as e:
-                print(f"SyntaxError in the expression: {row_expression}. Error: {e}")
-            except (TypeError, ValueError) as e:
-                print(f"TypeError or ValueError: {e}")
-        
-            
-            index += 1
+        try:
+            data_tree = self.app_table_mananegement.data_tree
+            with stage("evaluate_expression", rows=len(data_tree)):
+                indices = compile_expression(expression).positions(data_tree)
+        except KeyError as e:
+            print(f"KeyError: {e}")
+        except SyntaxError as e:
+            print(f"SyntaxError in the expression: {expression}. Error: {e}")
+        except (TypeError, ValueError) as e:
+            print(f"TypeError or ValueError: {e}")
+
         if not indices:
             print("No matching rows found.")
 
-        if len(indices)>0:
-            for indice in indices:
-                self.app_table_mananegement.treeview.selection_add(self.app_table_mananegement.treeview.get_children()[int(indice)])
+        self.app_table_mananegement.select_positions(indices)
+        if len(indices) > 0:
             self.calculator_window.destroy()
 
         return indices
@@ -265,6 +307,7 @@ class HydrogeologyCalculator:
         self.listbox_uniques.place(rely=0.32, relx=0.4, relwidth=0.55, relheight=0.25)
         self.listbox_uniques.config(state="disabled")
         self.listbox_uniques.bind("<Double-Button-1>", self.add_unique_text)
+        self.listbox_uniques.config(yscrollcommand=self.scroll_uniques)
 
         button_unique = tk.Button(
             self.calculator_window,
@@ -272,6 +315,9 @@ class HydrogeologyCalculator:
             command=self.get_unique_values,
         )
         button_unique.place(relwidth=0.3, relx=0.4, rely=0.58)
+        self.entry_search = tk.Entry(self.calculator_window, justify="left")
+        self.entry_search.place(relwidth=0.23, relx=0.72, rely=0.58)
+        self.entry_search.bind("<KeyRelease>", self.search_uniques)
 
         self.entry_formula = tk.Entry(self.calculator_window, justify="left")
         self.entry_formula.place(rely=0.65, relheight=0.25, relx=0.05, relwidth=0.9)
@@ -0,0 +1,99 @@
+"""
+Compact in-memory layout of the lab and meq tables.
+
+Text columns with repeated values (points, parameters, campaigns...) are stored as categoricals: one
+integer code per row plus the distinct labels once, instead of one Python string per row. Numeric values can
+optionally be stored as float32, which halves their size at about seven significant digits, more than the
+precision of lab results.
+"""
+
+from typing import Iterable, Text
+
+import numpy as np
+import pandas as pd
+
+LABEL_MAX_UNIQUE_RATIO = 0.5
+
+
+def is_label_column(series: pd.Series) -> bool:
+    """
+    Whether a column holds labels (text or categories) rather than numbers, dates or booleans.
+    """
+    return not (
+        pd.api.types.is_numeric_dtype(series)
+        or pd.api.types.is_datetime64_any_dtype(series)
+        or pd.api.types.is_bool_dtype(series)
+        or pd.api.types.is_timedelta64_dtype(series)
+    )
+
+
+def compact_labels(
+    data: pd.DataFrame,
+    columns: Iterable[Text] = None,
+    max_unique_ratio: float = LABEL_MAX_UNIQUE_RATIO,
+) -> pd.DataFrame:
+    """
+    Store the label columns of a table as categoricals, in place.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        The table, modified in place.
+    columns : iterable, optional
+        The columns to be converted. Defaults to every label column with repeated values, i.e. with fewer
+        distinct values than `max_unique_ratio` times the number of rows (free-text columns such as
+        comments are left as they are).
+    max_unique_ratio : float, optional
+        The largest ratio of distinct values to rows of a column converted by default.
+
+    Returns:
+    --------
+    pd.DataFrame
+        The same table, for chaining.
+    """
+    if columns is None:
+        columns = [
+            column
+            for column in data.columns
+            if is_label_column(data[column])
+            and not isinstance(data[column].dtype, pd.CategoricalDtype)
+            and data[column].nunique() <= max_unique_ratio * len(data)
+        ]
+    for column in columns:
+        data[column] = data[column].astype("category")
+    return data
+
+
+def downcast_floats(data: pd.DataFrame, columns: Iterable[Text] = None) -> pd.DataFrame:
+    """
+    Store the numeric columns of a table as float32, in place.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        The table, modified in place.
+    columns : iterable, optional
+        The columns to be converted. Defaults to every numeric column.
+
+    Returns:
+    --------
+    pd.DataFrame
+        The same table, for chaining.
+    """
+    if columns is None:
+        columns = [
+            column
+            for column in data.columns
+            if pd.api.types.is_numeric_dtype(data[column])
+            and not pd.api.types.is_bool_dtype(data[column])
+        ]
+    for column in columns:
+        data[column] = data[column].astype(np.float32)
+    return data
+
+
+def memory_mb(data: pd.DataFrame) -> float:
+    """
+    Return the memory held by a table in MB, including the Python strings of object columns.
+    """
+    return data.memory_usage(index=True, deep=True).sum() / 1024**2
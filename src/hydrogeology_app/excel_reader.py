@@ -0,0 +1,200 @@
+import posixpath
+import re
+import zipfile
+from typing import Dict, List, NamedTuple, Optional, Text, Tuple
+from xml.etree.ElementTree import iterparse
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIP_NS = (
+    "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+)
+PACKAGE_RELATIONSHIP_NS = (
+    "{http://schemas.openxmlformats.org/package/2006/relationships}"
+)
+OFFICE_DOCUMENT_TYPE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+)
+SHARED_STRINGS_TYPE = (
+    "http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"
+)
+CELL_REFERENCE = re.compile(r"([A-Z]+)(\d+)")
+
+
+class SheetPreview(NamedTuple):
+    """
+    The header row and size of a worksheet, read from the workbook without loading its cell data.
+
+    Attributes:
+    -----------
+    name : str
+        The name of the worksheet.
+    header : list
+        The values of the first row of the worksheet.
+    n_rows : int or None
+        The number of data rows below the header, taken from the dimension declared by the worksheet, or
+        None when the worksheet does not declare it.
+    """
+
+    name: Text
+    header: List
+    n_rows: Optional[int]
+
+
+def list_sheets(path: Text) -> List[Text]:
+    """
+    Return the names of the worksheets of an .xlsx workbook reading only the workbook manifest.
+
+    Only `xl/workbook.xml` is parsed, so the time does not depend on the size of the worksheets or of the
+    shared strings table.
+
+    Parameters:
+    -----------
+    path : str
+        The path to the workbook.
+
+    Returns:
+    --------
+    list
+        The names of the worksheets in workbook order.
+    """
+    with zipfile.ZipFile(path) as archive:
+        return list(_workbook_parts(archive)[0].keys())
+
+
+def preview_sheet(path: Text, sheet_name: Text) -> SheetPreview:
+    """
+    Read the header row and the row count of a worksheet without loading its cell data.
+
+    The worksheet XML is streamed only until the end of its first row; the row count comes from the
+    `<dimension>` element written before the data. Shared strings are streamed only up to the highest
+    index used by the header.
+
+    Parameters:
+    -----------
+    path : str
+        The path to the workbook.
+    sheet_name : str
+        The name of the worksheet.
+
+    Returns:
+    --------
+    SheetPreview
+        The header and row count of the worksheet.
+    """
+    with zipfile.ZipFile(path) as archive:
+        sheets, shared_strings_target = _workbook_parts(archive)
+        target = sheets[sheet_name]
+        cells = {}
+        n_rows = None
+        with archive.open(target) as sheet_file:
+            for event, element in iterparse(sheet_file, events=("start", "end")):
+                if event == "start" and element.tag == f"{MAIN_NS}dimension":
+                    n_rows = _rows_in_dimension(element.get("ref", ""))
+                elif event == "end" and element.tag == f"{MAIN_NS}row":
+                    for position, cell in enumerate(element.iter(f"{MAIN_NS}c")):
+                        cells[_column_number(cell.get("r"), position)] = cell
+                    break
+        shared_indices = [
+            int(cell.findtext(f"{MAIN_NS}v"))
+            for cell in cells.values()
+            if cell.get("t") == "s"
+        ]
+        shared_strings = _read_shared_strings(
+            archive,
+            shared_strings_target,
+            max(shared_indices) if shared_indices else -1,
+        )
+    header = [None] * (max(cells) + 1 if cells else 0)
+    for number, cell in cells.items():
+        header[number] = _cell_value(cell, shared_strings)
+    return SheetPreview(sheet_name, header, n_rows)
+
+
+def _workbook_parts(
+    archive: zipfile.ZipFile,
+) -> Tuple[Dict[Text, Text], Optional[Text]]:
+    """
+    Return the archive path of each worksheet, by name, and of the shared strings table, if any, as
+    declared by the relationships of the workbook.
+    """
+    workbook_path = "xl/workbook.xml"
+    with archive.open("_rels/.rels") as rels_file:
+        for _, element in iterparse(rels_file):
+            if element.get("Type") == OFFICE_DOCUMENT_TYPE:
+                workbook_path = element.get("Target").lstrip("/")
+    folder, name = posixpath.split(workbook_path)
+    relationships = {}
+    shared_strings_target = None
+    with archive.open(posixpath.join(folder, "_rels", f"{name}.rels")) as rels_file:
+        for _, element in iterparse(rels_file):
+            if element.tag == f"{PACKAGE_RELATIONSHIP_NS}Relationship":
+                target = element.get("Target")
+                if target.startswith("/"):
+                    target = target.lstrip("/")
+                else:
+                    target = posixpath.normpath(posixpath.join(folder, target))
+                relationships[element.get("Id")] = target
+                if element.get("Type") == SHARED_STRINGS_TYPE:
+                    shared_strings_target = target
+    sheets = {}
+    with archive.open(workbook_path) as workbook_file:
+        for _, element in iterparse(workbook_file):
+            if element.tag == f"{MAIN_NS}sheet":
+                sheets[element.get("name")] = relationships[
+                    element.get(f"{RELATIONSHIP_NS}id")
+                ]
+            elif element.tag == f"{MAIN_NS}sheets":
+                break
+    return sheets, shared_strings_target
+
+
+def _rows_in_dimension(reference: Text) -> Optional[int]:
+    rows = [int(match[1]) for match in CELL_REFERENCE.findall(reference)]
+    if len(rows) < 2:
+        return None
+    return max(rows[1] - rows[0], 0)
+
+
+def _column_number(reference: Optional[Text], default: int) -> int:
+    if not reference:
+        return default
+    letters = CELL_REFERENCE.match(reference).group(1)
+    number = 0
+    for letter in letters:
+        number = number * 26 + ord(letter) - ord("A") + 1
+    return number - 1
+
+
+def _read_shared_strings(
+    archive: zipfile.ZipFile, target: Optional[Text], last_index: int
+) -> List[Text]:
+    strings = []
+    if last_index < 0 or target is None:
+        return strings
+    with archive.open(target) as strings_file:
+        for _, element in iterparse(strings_file):
+            if element.tag == f"{MAIN_NS}si":
+                strings.append(
+                    "".join(text.text or "" for text in element.iter(f"{MAIN_NS}t"))
+                )
+                element.clear()
+                if len(strings) > last_index:
+                    break
+    return strings
+
+
+def _cell_value(cell, shared_strings: List[Text]):
+    cell_type = cell.get("t")
+    if cell_type == "inlineStr":
+        return "".join(text.text or "" for text in cell.iter(f"{MAIN_NS}t"))
+    value = cell.findtext(f"{MAIN_NS}v")
+    if value is None:
+        return None
+    if cell_type == "s":
+        return shared_strings[int(value)]
+    if cell_type == "b":
+        return value == "1"
+    if cell_type in ("str", "e"):
+        return value
+    number = float(value)
+    return int(number) if number.is_integer() else number
@@ -0,0 +1,366 @@
+"""
+Export of the meq table to files.
+
+`write_excel` streams the table into a write-only openpyxl workbook: the rows are converted and written a
+chunk at a time and openpyxl keeps each worksheet in a temporary file, so the memory used does not grow
+with the number of rows. The optional quality-control, summary and mapping sheets are filled during the
+same pass over the rows.
+
+`write_csv` writes the table as CSV a chunk at a time, optionally compressed, and `write_parquet` as a
+Parquet file, which keeps the column types (categoricals, dates, float32) and is read back with
+`pd.read_parquet` without parsing any value.
+"""
+
+import bz2
+import gzip
+import lzma
+import os
+from typing import Callable, Dict, List, Text
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+from hydrogeology_app.analitic_data import MISSING_LABEL
+from hydrogeology_app.instrumentation import traced
+from hydrogeology_app.sheet_cache import MIXED_TYPES
+
+EXCEL_CHUNK_ROWS = 5000
+CSV_CHUNK_ROWS = 50000
+CSV_DATE_FORMAT = "%Y-%m-%d"
+CSV_COMPRESSIONS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+CHARGE_BALANCE_LIMIT = 10.0
+ERROR_COLUMN = "Error %"
+TOTAL_COLUMNS = ["Total Cationes (meq/L)", "Total Aniones (meq/L)"]
+SHEET_DATA = "Datos"
+SHEET_CHARGE_BALANCE = "Balance iónico"
+SHEET_SUMMARY = "Resumen por grupo"
+SHEET_MAPPING = "Mapeo"
+ALL_GROUPS = "Todos"
+MISSING_PARAMETER = "(sin parámetro, se toma 0)"
+
+
+def excel_rows(chunk: pd.DataFrame) -> List[List]:
+    """
+    Convert rows of a table into lists of values accepted by openpyxl.
+
+    Categories become their labels, dates `pd.Timestamp` (a `datetime`), and missing or infinite values
+    empty cells, as openpyxl would otherwise write NaN and infinity as numbers that Excel rejects.
+
+    Parameters:
+    -----------
+    chunk : pd.DataFrame
+        The rows to be converted.
+
+    Returns:
+    --------
+    list
+        One list of values per row.
+    """
+    filled = chunk.notna()
+    for column in chunk.columns:
+        if pd.api.types.is_float_dtype(chunk[column]):
+            filled[column] = np.isfinite(chunk[column].to_numpy())
+    return chunk.astype(object).where(filled, None).to_numpy().tolist()
+
+
+@traced()
+def write_excel(
+    data: pd.DataFrame,
+    path: Text,
+    charge_balance: bool = False,
+    group_column: Text = None,
+    mapping: Dict = None,
+    limit: float = CHARGE_BALANCE_LIMIT,
+    chunk_rows: int = EXCEL_CHUNK_ROWS,
+    progress: Callable = None,
+) -> int:
+    """
+    Write a table to an Excel workbook, streaming its rows in chunks.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        The table, written in the sheet "Datos".
+    path : str
+        The path of the .xlsx workbook.
+    charge_balance : bool, optional
+        Whether to add the sheet "Balance iónico", listing the samples whose "Error %" exceeds `limit`
+        or cannot be calculated, and the sheet "Resumen por grupo", with the number of samples, those
+        outside the limit and the mean, minimum and maximum of every numeric column of each group.
+    group_column : str, optional
+        The column whose values define the groups of the summary; all samples form one group if None.
+    mapping : dict, optional
+        The columns and parameters used to build the table, written as name and value rows in the sheet
+        "Mapeo".
+    limit : float, optional
+        The largest acceptable charge-balance error, in percent.
+    chunk_rows : int, optional
+        The number of rows converted and written at a time.
+    progress : callable, optional
+        Called with the number of rows written and the total after each chunk; it may raise to stop the
+        export, in which case no file is written.
+
+    Returns:
+    --------
+    int
+        The number of rows written in the sheet "Datos".
+    """
+    workbook = Workbook(write_only=True)
+    sheet_data = workbook.create_sheet(SHEET_DATA)
+    sheet_data.append([str(column) for column in data.columns])
+    identifiers = [
+        column
+        for column in data.columns
+        if not pd.api.types.is_numeric_dtype(data[column])
+    ]
+    numeric = [
+        column
+        for column in data.columns
+        if pd.api.types.is_numeric_dtype(data[column])
+        and not pd.api.types.is_bool_dtype(data[column])
+    ]
+    charge_balance = charge_balance and ERROR_COLUMN in data.columns
+    if charge_balance:
+        qa_columns = identifiers + [
+            column for column in TOTAL_COLUMNS + [ERROR_COLUMN] if column in data
+        ]
+        sheet_qa = workbook.create_sheet(SHEET_CHARGE_BALANCE)
+        sheet_qa.append(qa_columns)
+        totals = GroupTotals(numeric)
+    for start in range(0, len(data), chunk_rows):
+        chunk = data.iloc[start : start + chunk_rows]
+        for row in excel_rows(chunk):
+            sheet_data.append(row)
+        if charge_balance:
+            error = chunk[ERROR_COLUMN].to_numpy(dtype=float)
+            outside = ~(np.abs(error) <= limit)
+            for row in excel_rows(chunk.loc[outside, qa_columns]):
+                sheet_qa.append(row)
+            groups = (
+                chunk[group_column].astype(object).fillna(MISSING_LABEL).to_numpy()
+                if group_column is not None
+                else np.full(len(chunk), ALL_GROUPS, dtype=object)
+            )
+            totals.add(chunk, groups, outside)
+        if progress is not None:
+            progress(min(start + chunk_rows, len(data)), len(data))
+    if charge_balance:
+        sheet_summary = workbook.create_sheet(SHEET_SUMMARY)
+        for row in totals.rows(group_column or "Grupo", limit):
+            sheet_summary.append(row)
+    if mapping:
+        sheet_mapping = workbook.create_sheet(SHEET_MAPPING)
+        sheet_mapping.append(["Campo", "Valor"])
+        for name, value in mapping.items():
+            sheet_mapping.append([name, value])
+    workbook.save(path)
+    return len(data)
+
+
+def describe_mapping(columns: Dict[Text, Text], dict_rename: Dict[Text, Text]) -> Dict:
+    """
+    Describe the columns and parameters used to build a meq table, for the sheet "Mapeo".
+
+    Parameters:
+    -----------
+    columns : dict
+        The description and name of each column selected in the lab data.
+    dict_rename : dict
+        The `dict_rename` argument of `calculate_meq_table`.
+
+    Returns:
+    --------
+    dict
+        `columns`, followed by the lab parameter of each column of the table, or a note for the ions
+        without a parameter, which are taken as zero.
+    """
+    mapping = dict(columns)
+    for parameter, column in dict_rename.items():
+        mapping[column] = (
+            MISSING_PARAMETER if parameter.startswith("null_") else parameter
+        )
+    return mapping
+
+
+@traced()
+def write_csv(
+    data: pd.DataFrame,
+    path: Text,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    progress: Callable = None,
+) -> int:
+    """
+    Write a table to a CSV file a chunk of rows at a time.
+
+    The file is compressed when its name ends in ".gz", ".bz2" or ".xz". Dates are written as
+    `CSV_DATE_FORMAT`, categories as their labels and missing values as empty fields.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        The table.
+    path : str
+        The path of the CSV file.
+    chunk_rows : int, optional
+        The number of rows converted and written at a time.
+    progress : callable, optional
+        Called with the number of rows written and the total after each chunk; it may raise to stop the
+        export, leaving an incomplete file.
+
+    Returns:
+    --------
+    int
+        The number of rows written.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    open_file = CSV_COMPRESSIONS.get(extension, open)
+    with open_file(path, "wt", encoding="utf-8", newline="") as csv_file:
+        for start in range(0, max(len(data), 1), chunk_rows):
+            data.iloc[start : start + chunk_rows].to_csv(
+                csv_file,
+                header=start == 0,
+                index=False,
+                date_format=CSV_DATE_FORMAT,
+            )
+            if progress is not None:
+                progress(min(start + chunk_rows, len(data)), len(data))
+    return len(data)
+
+
+@traced()
+def write_parquet(data: pd.DataFrame, path: Text) -> int:
+    """
+    Write a table to a Parquet file with pyarrow, keeping the type of every column.
+
+    Columns or categories mixing numbers and text, which pyarrow cannot store as one type, are written as
+    text, as the sheet cache does.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        The table.
+    path : str
+        The path of the Parquet file.
+
+    Returns:
+    --------
+    int
+        The number of rows written.
+    """
+    mixed = {}
+    for column in data.columns:
+        values = data[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            if pd.api.types.infer_dtype(values.cat.categories) in MIXED_TYPES:
+                mixed[column] = as_text(values.astype(object)).astype("category")
+        elif (
+            values.dtype == object
+            and pd.api.types.infer_dtype(values, skipna=True) in MIXED_TYPES
+        ):
+            mixed[column] = as_text(values)
+    if mixed:
+        data = data.copy()
+        for column, values in mixed.items():
+            data[column] = values
+    data.to_parquet(path, engine="pyarrow", index=False)
+    return len(data)
+
+
+def as_text(values: pd.Series) -> pd.Series:
+    """
+    Convert the values of a column to text, keeping the missing values.
+    """
+    filled = values.notna()
+    return values.where(~filled, values[filled].astype(str))
+
+
+class GroupTotals:
+    """
+    The per-group count, sum, minimum and maximum of numeric columns, accumulated chunk by chunk.
+
+    Attributes:
+    -----------
+    columns : list
+        The numeric columns summarized.
+    groups : dict
+        For each group, the number of samples, the number outside the charge-balance limit and the
+        count, sum, minimum and maximum of each column as arrays aligned with `columns`.
+    """
+
+    def __init__(self, columns: List[Text]) -> None:
+        self.columns = columns
+        self.groups = {}
+
+    def add(self, chunk: pd.DataFrame, groups: np.ndarray, outside: np.ndarray) -> None:
+        """
+        Add the rows of a chunk.
+
+        Parameters:
+        -----------
+        chunk : pd.DataFrame
+            The rows, holding every column of `columns`.
+        groups : np.ndarray
+            The group of each row.
+        outside : np.ndarray
+            Whether the charge-balance error of each row is outside the limit.
+        """
+        values = chunk[self.columns].to_numpy(dtype=float)
+        values = np.where(np.isfinite(values), values, np.nan)
+        codes, names = pd.factorize(groups)
+        for code, name in enumerate(names):
+            rows = codes == code
+            block = values[rows]
+            finite = ~np.isnan(block)
+            total = self.groups.setdefault(
+                name,
+                {
+                    "samples": 0,
+                    "outside": 0,
+                    "count": np.zeros(len(self.columns), dtype=np.int64),
+                    "sum": np.zeros(len(self.columns)),
+                    "min": np.full(len(self.columns), np.inf),
+                    "max": np.full(len(self.columns), -np.inf),
+                },
+            )
+            total["samples"] += int(rows.sum())
+            total["outside"] += int(outside[rows].sum())
+            total["count"] += finite.sum(axis=0)
+            total["sum"] += np.where(finite, block, 0.0).sum(axis=0)
+            total["min"] = np.fmin(total["min"], np.fmin.reduce(block, axis=0))
+            total["max"] = np.fmax(total["max"], np.fmax.reduce(block, axis=0))
+
+    def rows(self, group_name: Text, limit: float) -> List[List]:
+        """
+        Return the summary as rows: a header, then one row per group and column.
+        """
+        rows = [
+            [
+                group_name,
+                "Muestras",
+                f"Fuera del límite de {limit:g} %",
+                "Columna",
+                "Valores",
+                "Media",
+                "Mínimo",
+                "Máximo",
+            ]
+        ]
+        for name in sorted(self.groups, key=str):
+            total = self.groups[name]
+            for position, column in enumerate(self.columns):
+                count = int(total["count"][position])
+                statistics = (
+                    [
+                        float(total["sum"][position] / count),
+                        float(total["min"][position]),
+                        float(total["max"][position]),
+                    ]
+                    if count > 0
+                    else [None, None, None]
+                )
+                rows.append(
+                    [name, total["samples"], total["outside"], column, count]
+                    + statistics
+                )
+        return rows
@@ -0,0 +1,138 @@
+"""
+Vectorized coordinate transforms of the hydrogeochemical diagrams.
+
+The kernels take the ion concentrations as arrays and return coordinate arrays, without touching any
+DataFrame, so the figure functions only plot and the transforms can be reused and benchmarked on their own.
+"""
+
+import math
+from typing import NamedTuple
+
+import numpy as np
+
+SQRT_3 = math.sqrt(3)
+PIPER_SCALE = 3.6
+PIPER_MARGIN = 40
+PIPER_TRIANGLE = 360
+PIPER_GAP = 100
+
+
+class PiperCoordinates(NamedTuple):
+    """
+    The positions of the samples in the three fields of the Piper background image.
+
+    Attributes:
+    -----------
+    xcation, ycation : np.ndarray
+        The positions in the cation triangle.
+    xanion, yanion : np.ndarray
+        The positions in the anion triangle.
+    xdiam, ydiam : np.ndarray
+        The positions in the central diamond.
+    """
+
+    xcation: np.ndarray
+    ycation: np.ndarray
+    xanion: np.ndarray
+    yanion: np.ndarray
+    xdiam: np.ndarray
+    ydiam: np.ndarray
+
+
+def _as_array(values) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def mifflin_coordinates(sodium, potassium, chlorides, sulfates):
+    """
+    Compute the axes of the Mifflin diagram.
+
+    Parameters:
+    -----------
+    sodium, potassium, chlorides, sulfates : array-like
+        The concentrations in meq/L (anions may be negative, as in the meq table).
+
+    Returns:
+    --------
+    tuple
+        The absolute Cl + SO4 and the Na + K values, in meq/L.
+    """
+    chlorides_sulfates = np.abs(_as_array(chlorides) + _as_array(sulfates))
+    sodium_potassium = _as_array(sodium) + _as_array(potassium)
+    return chlorides_sulfates, sodium_potassium
+
+
+def gibbs_coordinates(sodium, calcium, chlorides, bicarbonate):
+    """
+    Compute the axes of the Gibbs diagram.
+
+    Parameters:
+    -----------
+    sodium, calcium, chlorides, bicarbonate : array-like
+        The concentrations in mg/L.
+
+    Returns:
+    --------
+    tuple
+        The Na/(Na + Ca) ratio, the Cl/(Cl + HCO3) ratio and the total dissolved salts in mg/L.
+    """
+    sodium = _as_array(sodium)
+    calcium = _as_array(calcium)
+    chlorides = _as_array(chlorides)
+    bicarbonate = _as_array(bicarbonate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sodium_ratio = sodium / (sodium + calcium)
+        chlorides_ratio = chlorides / (chlorides + bicarbonate)
+    total_dissolved_salts = sodium + calcium + chlorides + bicarbonate
+    return sodium_ratio, chlorides_ratio, total_dissolved_salts
+
+
+def piper_coordinates(
+    calcium, magnesium, sodium, potassium, bicarbonate, carbonate, chlorides, sulfates
+) -> PiperCoordinates:
+    """
+    Project the samples onto the cation triangle, anion triangle and diamond of the Piper diagram.
+
+    The coordinates are in pixels of the Piper background image.
+
+    Parameters:
+    -----------
+    calcium, magnesium, sodium, potassium, bicarbonate, carbonate, chlorides, sulfates : array-like
+        The concentrations in meq/L.
+
+    Returns:
+    --------
+    PiperCoordinates
+        The positions of the samples in the three fields.
+    """
+    calcium = _as_array(calcium)
+    magnesium = _as_array(magnesium)
+    sodium = _as_array(sodium)
+    potassium = _as_array(potassium)
+    bicarbonate = _as_array(bicarbonate)
+    carbonate = _as_array(carbonate)
+    chlorides = _as_array(chlorides)
+    sulfates = _as_array(sulfates)
+    total_anion = sulfates + bicarbonate + carbonate + chlorides
+    total_cation = magnesium + calcium + potassium + sodium
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sulfates_norm = sulfates / total_anion * 100
+        chlorides_norm = chlorides / total_anion * 100
+        magnesium_norm = magnesium / total_cation * 100
+        calcium_norm = calcium / total_cation * 100
+    xcation = (
+        PIPER_MARGIN
+        + PIPER_TRIANGLE
+        - (calcium_norm + magnesium_norm / 2) * PIPER_SCALE
+    )
+    ycation = PIPER_MARGIN + (SQRT_3 * magnesium_norm / 2) * PIPER_SCALE
+    xanion = (
+        PIPER_MARGIN
+        + PIPER_TRIANGLE
+        + PIPER_GAP
+        + (chlorides_norm + sulfates_norm / 2) * PIPER_SCALE
+    )
+    yanion = PIPER_MARGIN + (sulfates_norm * SQRT_3 / 2) * PIPER_SCALE
+    xdiam = 0.5 * (xcation + xanion + (yanion - ycation) / SQRT_3)
+    ydiam = 0.5 * (yanion + ycation + SQRT_3 * (xanion - xcation))
+    return PiperCoordinates(xcation, ycation, xanion, yanion, xdiam, ydiam)
@@ -0,0 +1,376 @@
+import ast
+import io
+import operator
+import re
+import tokenize
+from functools import lru_cache
+from typing import Dict, List, Text
+
+import numpy as np
+import pandas as pd
+
+FIELD_PATTERN = re.compile(r'\[\$"(.*?)"\]')
+
+COMPARISON_OPERATORS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+}
+
+ARITHMETIC_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+}
+
+LIKE_OPERATOR = "Like"
+
+
+class FilterExpression:
+    """
+    A calculator expression parsed once into a Python AST and evaluated as whole-column boolean masks.
+
+    The calculator language references columns as `[$"column"]` and combines them with the operators
+    inserted by the calculator buttons (`==`, `!=`, `<`, `<=`, `>`, `>=`, `&`, `|`, `in []`, `not`,
+    `Like`). Instead of substituting every row into the expression and calling `eval` once per row, the
+    column references are replaced by placeholders, the result is parsed with `ast`, and the tree is
+    evaluated against complete pandas columns.
+
+    `Like` takes an SQL-style pattern, where `%` matches any sequence of characters and `_` matches a
+    single character (e.g. `[$"punto"] Like "PZ-%"`). It is rewritten to the `is` comparison, which the
+    language does not otherwise use, so it keeps the precedence of the other comparison operators.
+
+    Attributes:
+    -----------
+    expression : str
+        The original expression written in the calculator.
+    columns : dict
+        A dictionary mapping the placeholder names used in the AST to the referenced column names.
+    tree : ast.Expression
+        The parsed expression.
+    """
+
+    def __init__(self, expression: Text) -> None:
+        """
+        Parse the calculator expression.
+
+        Parameters:
+        -----------
+        expression : str
+            The expression to be parsed.
+
+        Raises:
+        -------
+        SyntaxError
+            If the expression is not valid in the calculator language.
+        """
+        self.expression = expression
+        self.columns: Dict[Text, Text] = {}
+        source = FIELD_PATTERN.sub(self._placeholder, expression)
+        self.tree = ast.parse(_rewrite_like(source.strip()), mode="eval")
+
+    def _placeholder(self, match) -> Text:
+        column = match.group(1)
+        for name, known_column in self.columns.items():
+            if known_column == column:
+                return f" {name} "
+        name = f"__field_{len(self.columns)}__"
+        self.columns[name] = column
+        return f" {name} "
+
+    def mask(self, data: pd.DataFrame) -> np.ndarray:
+        """
+        Evaluate the expression against every row of the DataFrame at once.
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            The DataFrame the expression is evaluated against.
+
+        Returns:
+        --------
+        np.ndarray
+            A boolean array with one entry per row of `data`, True where the expression holds.
+
+        Raises:
+        -------
+        KeyError
+            If the expression references a column that does not exist in `data`.
+        TypeError, ValueError
+            If the operands of an operator cannot be combined.
+        """
+        for column in self.columns.values():
+            if column not in data.columns:
+                raise KeyError(f"Column '{column}' not found in the dataset.")
+        result = self._evaluate(self.tree.body, data)
+        if isinstance(result, pd.Series):
+            return result.fillna(False).to_numpy(dtype=bool)
+        if isinstance(result, np.ndarray):
+            return result.astype(bool)
+        return np.full(len(data), bool(result))
+
+    def positions(self, data: pd.DataFrame) -> List[int]:
+        """
+        Return the positions of the rows of the DataFrame that satisfy the expression.
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            The DataFrame the expression is evaluated against.
+
+        Returns:
+        --------
+        list
+            The zero-based row positions matching the expression, in table order.
+        """
+        return np.flatnonzero(self.mask(data)).tolist()
+
+    def _evaluate(self, node, data):
+        if isinstance(node, ast.Name):
+            if node.id in self.columns:
+                return data[self.columns[node.id]]
+            raise ValueError(f"Unknown name '{node.id}' in the expression.")
+        if isinstance(node, ast.Constant):
+            return node.value
+        if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+            return [self._evaluate(element, data) for element in node.elts]
+        if isinstance(node, ast.UnaryOp):
+            operand = self._evaluate(node.operand, data)
+            if isinstance(node.op, (ast.Not, ast.Invert)):
+                return _logical_not(operand)
+            if isinstance(node.op, ast.USub):
+                return -operand
+            if isinstance(node.op, ast.UAdd):
+                return operand
+        if isinstance(node, ast.BoolOp):
+            values = [_as_mask(self._evaluate(value, data)) for value in node.values]
+            combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+            result = values[0]
+            for value in values[1:]:
+                result = combine(result, value)
+            return result
+        if isinstance(node, ast.BinOp) and type(node.op) in ARITHMETIC_OPERATORS:
+            left = self._evaluate(node.left, data)
+            right = self._evaluate(node.right, data)
+            if isinstance(node.op, (ast.BitAnd, ast.BitOr)) and (
+                _is_mask(left) or _is_mask(right)
+            ):
+                left, right = _as_mask(left), _as_mask(right)
+            return ARITHMETIC_OPERATORS[type(node.op)](left, right)
+        if isinstance(node, ast.Compare):
+            left = self._evaluate(node.left, data)
+            result = True
+            for op, comparator in zip(node.ops, node.comparators):
+                right = self._evaluate(comparator, data)
+                result = result & _compare(left, op, right)
+                left = right
+            return result
+        raise SyntaxError(
+            f"Unsupported element '{ast.dump(node)}' in the expression: {self.expression}"
+        )
+
+
+def _rewrite_like(source: Text) -> Text:
+    """
+    Replace the `Like` and `not Like` operators by `is` and `is not` so the expression parses as Python.
+    """
+    tokens = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type == tokenize.NAME and token.string == LIKE_OPERATOR:
+                if tokens and tokens[-1][:2] == (tokenize.NAME, "not"):
+                    tokens[-1] = (tokenize.NAME, "is")
+                    tokens.append((tokenize.NAME, "not"))
+                else:
+                    tokens.append((tokenize.NAME, "is"))
+            else:
+                tokens.append((token.type, token.string))
+    except tokenize.TokenError as error:
+        raise SyntaxError(str(error)) from error
+    return tokenize.untokenize(tokens)
+
+
+@lru_cache(maxsize=256)
+def like_pattern(pattern: Text) -> "re.Pattern":
+    """
+    Compile an SQL-style `Like` pattern into a regular expression, to be matched against whole values.
+
+    Patterns are compiled once and cached, so applying the same filter again does not recompile it. The
+    wildcards match line breaks through the scoped `(?s:...)` group rather than the DOTALL flag, which would
+    stop pandas from matching text columns with pyarrow.
+
+    Parameters:
+    -----------
+    pattern : str
+        The pattern, where `%` matches any sequence of characters and `_` matches exactly one character.
+
+    Returns:
+    --------
+    re.Pattern
+        The compiled regular expression, used with `fullmatch`.
+    """
+    regex = "".join(
+        "(?s:.*)" if char == "%" else "(?s:.)" if char == "_" else re.escape(char)
+        for char in pattern
+    )
+    return re.compile(regex)
+
+
+def like_mask(series: pd.Series, pattern: Text) -> pd.Series:
+    """
+    Match every value of a column against an SQL-style `Like` pattern.
+
+    The pattern is only tested once per distinct value: the column is factorized, the distinct values are
+    matched at once with `Series.str.fullmatch`, and the result of each is broadcast back to the rows
+    through the codes. Missing values never match.
+
+    Parameters:
+    -----------
+    series : pd.Series
+        The column to be matched. Non-text values are matched through their text representation.
+    pattern : str
+        The SQL-style pattern.
+
+    Returns:
+    --------
+    pd.Series
+        A boolean Series aligned with `series`.
+    """
+    if not isinstance(pattern, str):
+        raise TypeError(
+            "The 'Like' operator expects a text pattern, e.g. Like \"PZ%\"."
+        )
+    codes, uniques = pd.factorize(series)
+    regex = like_pattern(pattern)
+    matches = (
+        pd.Series(np.asarray(uniques, dtype=object)).astype(str).str.fullmatch(regex)
+    )
+    matches = np.append(matches.to_numpy(dtype=bool), False)
+    return pd.Series(matches[codes], index=series.index)
+
+
+@lru_cache(maxsize=128)
+def compile_expression(expression: Text) -> FilterExpression:
+    """
+    Parse a calculator expression, reusing the parsed tree when the same expression is applied again.
+
+    Parameters:
+    -----------
+    expression : str
+        The expression written in the calculator.
+
+    Returns:
+    --------
+    FilterExpression
+        The compiled expression, ready to be evaluated against a DataFrame.
+    """
+    return FilterExpression(expression)
+
+
+def _is_mask(value) -> bool:
+    if isinstance(value, (pd.Series, np.ndarray)):
+        return value.dtype == bool
+    return isinstance(value, (bool, np.bool_))
+
+
+def _as_mask(value):
+    if isinstance(value, pd.Series):
+        return value.fillna(False).astype(bool)
+    if isinstance(value, np.ndarray):
+        return value.astype(bool)
+    return bool(value)
+
+
+def _logical_not(value):
+    mask = _as_mask(value)
+    if isinstance(mask, (pd.Series, np.ndarray)):
+        return ~mask
+    return not mask
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float, np.number)) and not isinstance(
+        value, (bool, np.bool_)
+    )
+
+
+def _plain_values(series: pd.Series) -> pd.Series:
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.astype(object)
+    return series
+
+
+def _is_text_column(series: pd.Series) -> bool:
+    return not (
+        pd.api.types.is_numeric_dtype(series)
+        or pd.api.types.is_datetime64_any_dtype(series)
+    )
+
+
+def _compare(left, op, right):
+    """
+    Compare two operands the way the per-row evaluation did: numbers as numbers and text as text.
+    """
+    if isinstance(op, (ast.In, ast.NotIn)):
+        if not isinstance(right, list):
+            raise TypeError(
+                "The 'in' operator expects a list of values, e.g. in [1, 2]."
+            )
+        if isinstance(left, pd.Series):
+            values = right
+            if _is_text_column(left) and all(_is_number(value) for value in right):
+                left = pd.to_numeric(left, errors="coerce")
+            elif _is_text_column(left):
+                left = left.astype(str)
+                values = [str(value) for value in right]
+            result = left.isin(values)
+        else:
+            result = left in right
+        return _logical_not(result) if isinstance(op, ast.NotIn) else result
+
+    if isinstance(op, (ast.Is, ast.IsNot)):
+        if isinstance(left, pd.Series):
+            result = like_mask(left, right)
+        else:
+            result = like_mask(pd.Series([left]), right).iloc[0]
+        return _logical_not(result) if isinstance(op, ast.IsNot) else result
+
+    if type(op) not in COMPARISON_OPERATORS:
+        raise SyntaxError(f"Unsupported comparison operator '{type(op).__name__}'.")
+    function = COMPARISON_OPERATORS[type(op)]
+    if isinstance(left, pd.Series) and isinstance(right, pd.Series):
+        # Categoricals can only be compared with each other when their categories are the same.
+        return function(_plain_values(left), _plain_values(right))
+    if isinstance(left, pd.Series) and not isinstance(right, pd.Series):
+        return _compare_column(left, function, right)
+    if isinstance(right, pd.Series) and not isinstance(left, pd.Series):
+        reflected = {
+            operator.lt: operator.gt,
+            operator.le: operator.ge,
+            operator.gt: operator.lt,
+            operator.ge: operator.le,
+        }.get(function, function)
+        return _compare_column(right, reflected, left)
+    return function(left, right)
+
+
+def _compare_column(series: pd.Series, function, value):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # Compare each category (and a missing value) once and broadcast the result through the codes.
+        distinct = pd.Series(series.cat.categories.append(pd.Index([np.nan])))
+        matches = _compare_column(distinct, function, value).to_numpy(dtype=bool)
+        return pd.Series(matches[series.cat.codes.to_numpy()], index=series.index)
+    if _is_number(value) and _is_text_column(series):
+        return function(pd.to_numeric(series, errors="coerce"), value)
+    if isinstance(value, str) and pd.api.types.is_numeric_dtype(series):
+        # A number is never equal to a text value and cannot be ordered against it.
+        return pd.Series(function is operator.ne, index=series.index)
+    if isinstance(value, str) and _is_text_column(series):
+        return function(series.astype(str), value)
+    return function(series, value)
@@ -1,14 +1,81 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import matplotlib.pylab as plt
 import numpy as np
 import math
+from functools import lru_cache
 import matplotlib.pyplot as plt
 import imageio
 import seaborn as sns
 from tkinter import messagebox
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
 from matplotlib.font_manager import FontProperties
+from hydrogeology_app.figure_kernels import (
+    gibbs_coordinates,
+    mifflin_coordinates,
+    piper_coordinates,
+)
+from hydrogeology_app.instrumentation import stage, traced
+from hydrogeology_app.validation import parse_dates
 
+PIPER_BACKGROUND = "PiperCompleto.png"
+STIFF_ATLAS_GRID = (4, 3)
+STIFF_ATLAS_PAGE_SIZE = (8.27, 11.69)
+STIFF_ATLAS_INDEX_ENTRIES = 140
 
+
+def data_path(file_name: str) -> str:
+    """
+    Return the path of a file of the application data folder.
+
+    The folder is looked up next to the package (`src/data`), so the figures can be generated from any
+    working directory, falling back to `./data` as when the GUI is run from `src`.
+
+    Parameters:
+    -----------
+    file_name : str
+        The name of the file inside the data folder.
+
+    Returns:
+    --------
+    str
+        The path of the file.
+    """
+    package_data = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", file_name
+    )
+    if os.path.exists(package_data):
+        return package_data
+    return os.path.join(".", "data", file_name)
+
+
+def _group_data(df: pd.DataFrame, group_columns: list) -> pd.DataFrame:
+    """
+    Return the style and color columns of `df`, without the categories of rows no longer in the table,
+    which seaborn would otherwise keep in the legends.
+    """
+    group_data = df[list(dict.fromkeys(group_columns))].copy()
+    for column in group_data.columns:
+        if isinstance(group_data[column].dtype, pd.CategoricalDtype):
+            group_data[column] = group_data[column].cat.remove_unused_categories()
+    return group_data
+
+
+def _plot_data(df: pd.DataFrame, coordinates: dict, col_style, col_color):
+    """
+    Build the table plotted by seaborn: the coordinate arrays plus the style and color columns of `df`.
+    """
+    group_columns = [column for column in (col_style, col_color) if column is not None]
+    plot_data = _group_data(df, group_columns)
+    for name, values in coordinates.items():
+        plot_data[name] = values
+    return plot_data
+
+
+@traced()
 def mifflin_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = None):
     """
     Generate a Mifflin diagram for groundwater evolution based on the provided data.
@@ -39,12 +106,24 @@ def mifflin_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = No
     - Text annotations are added to the plot to label these regimes and the general direction of groundwater evolution.
     - The function adjusts the font size of the legend based on the number of labels and the maximum label length.
     """
-    df["Na + K (meq/L)"] = df["Sodio (meq/L)"] + df["Potasio (meq/L)"]
-    df["Cl + SO4 (meq/L)"] = df["Cloruros (meq/L)"] + df["Sulfatos (meq/L)"]
-    df["Cl + SO4 (meq/L)"] = df["Cl + SO4 (meq/L)"].apply(abs)
+    chlorides_sulfates, sodium_potassium = mifflin_coordinates(
+        df["Sodio (meq/L)"],
+        df["Potasio (meq/L)"],
+        df["Cloruros (meq/L)"],
+        df["Sulfatos (meq/L)"],
+    )
+    plot_data = _plot_data(
+        df,
+        {
+            "Cl + SO4 (meq/L)": chlorides_sulfates,
+            "Na + K (meq/L)": sodium_potassium,
+        },
+        col_style,
+        col_color,
+    )
     fig, ax = plt.subplots(figsize=(7.2, 5))
     sns.scatterplot(
-        data=df,
+        data=plot_data,
         x="Cl + SO4 (meq/L)",
         y="Na + K (meq/L)",
         ax=ax,
@@ -101,6 +180,7 @@ def mifflin_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = No
     return fig
 
 
+@traced()
 def gibbs_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = None):
     """
     Generate a Gibbs diagram to visualize the geochemical processes in groundwater.
@@ -138,22 +218,26 @@ def gibbs_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = None
     - Text annotations are added to label these processes and to guide the interpretation of the plot.
     - The function adjusts the font size of the legend based on the number of labels and the maximum label length.
     """
-    df["Na/(Na + Ca)"] = df["Sodio (mg/L)"] / (
-        df["Sodio (mg/L)"] + df["Calcio (mg/L)"]
+    sodium_ratio, chlorides_ratio, total_dissolved_salts = gibbs_coordinates(
+        df["Sodio (mg/L)"],
+        df["Calcio (mg/L)"],
+        df["Cloruros (mg/L)"],
+        df["Bicarbonato (mg/L)"],
     )
-    df["Cl/(Cl + HCO3)"] = df["Cloruros (mg/L)"] / (
-        df["Cloruros (mg/L)"] + df["Bicarbonato (mg/L)"]
-    )
-    df["Total dissolved salts (mg/L)"] = (
-        df["Sodio (mg/L)"]
-        + df["Calcio (mg/L)"]
-        + df["Cloruros (mg/L)"]
-        + df["Bicarbonato (mg/L)"]
+    plot_data = _plot_data(
+        df,
+        {
+            "Na/(Na + Ca)": sodium_ratio,
+            "Cl/(Cl + HCO3)": chlorides_ratio,
+            "Total dissolved salts (mg/L)": total_dissolved_salts,
+        },
+        col_style,
+        col_color,
     )
     fig, ax = plt.subplots(1, 2, figsize=(20, 7), sharey=True)
     plt.subplots_adjust(wspace=0.1)
     sns.scatterplot(
-        data=df,
+        data=plot_data,
         x="Na/(Na + Ca)",
         y="Total dissolved salts (mg/L)",
         ax=ax[0],
@@ -215,7 +299,7 @@ def gibbs_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = None
         arrowprops=dict(arrowstyle="<-", color="grey"),
     )
     sns.scatterplot(
-        data=df,
+        data=plot_data,
         x="Cl/(Cl + HCO3)",
         y="Total dissolved salts (mg/L)",
         ax=ax[1],
@@ -269,7 +353,104 @@ def gibbs_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = None
     return fig
 
 
-def piper_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = None):
+@lru_cache(maxsize=1)
+def piper_background() -> np.ndarray:
+    """
+    Return the Piper background image, decoded and flipped once per process.
+
+    The array is read-only because it is shared by every Piper diagram drawn in the process.
+
+    Returns:
+    --------
+    np.ndarray
+        The background image, flipped vertically to be drawn with the origin at the bottom.
+    """
+    img = np.flipud(imageio.imread(data_path(PIPER_BACKGROUND))).copy()
+    img.setflags(write=False)
+    return img
+
+
+class PiperTemplate:
+    """
+    A pre-built empty Piper diagram that new scatter layers are drawn onto.
+
+    The figure holds the background image and the fixed limits; `draw` removes the points and legend of
+    the previous render before plotting new ones, so repeated renders skip the decoding, figure creation and
+    background composition. The figure is not managed by pyplot: it is only closed when the template is
+    discarded, and the figure returned by `draw` is only valid until the next call.
+
+    Attributes:
+    -----------
+    figure : matplotlib.figure.Figure
+        The reusable figure.
+    ax : matplotlib.axes.Axes
+        The axes holding the background image.
+    """
+
+    def __init__(self) -> None:
+        self.figure = Figure()
+        self.ax = self.figure.subplots()
+        self.ax.imshow(piper_background(), zorder=0)
+        self.ax.axis("off")
+        params = self.figure.subplotpars
+        self._layout = {
+            name: getattr(params, name)
+            for name in ("left", "right", "bottom", "top", "wspace", "hspace")
+        }
+
+    def clear(self) -> None:
+        """
+        Remove the scatter layers and legend of the previous render, keeping the background.
+        """
+        for artist in list(self.ax.collections) + list(self.ax.lines):
+            artist.remove()
+        if self.ax.get_legend():
+            self.ax.get_legend().remove()
+        # Points without hue take the next color of the axes cycle, so restart it as in a new figure.
+        self.ax.set_prop_cycle(None)
+        # tight_layout starts from the current layout, so restore the layout of a new figure.
+        self.figure.subplots_adjust(**self._layout)
+
+    def draw(
+        self, df_fig: pd.DataFrame, col_style: str = None, col_color: str = None
+    ) -> Figure:
+        """
+        Plot the points of a Piper diagram on the template.
+
+        Parameters:
+        -----------
+        df_fig : pd.DataFrame
+            The x and y coordinates of the points of the three fields of the diagram.
+        col_style : str, optional
+            The name of the column to be used for styling the points.
+        col_color : str, optional
+            The name of the column to be used for coloring the points.
+
+        Returns:
+        --------
+        matplotlib.figure.Figure
+            The template figure with the new points.
+        """
+        self.clear()
+        _draw_piper(self.figure, self.ax, df_fig, col_style, col_color)
+        return self.figure
+
+
+@lru_cache(maxsize=1)
+def piper_template() -> PiperTemplate:
+    """
+    Return the Piper template of the process, built on first use.
+    """
+    return PiperTemplate()
+
+
+@traced()
+def piper_graphic(
+    df: pd.DataFrame,
+    col_style: str = None,
+    col_color: str = None,
+    template: PiperTemplate = None,
+):
     """
     Generate a Piper diagram to classify the hydrochemical facies of groundwater.
 
@@ -293,6 +474,9 @@ def piper_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = None
         The name of the column to be used for styling the points in the Piper diagram.
     col_color : str, optional
         The name of the column to be used for coloring the points in the Piper diagram.
+    template : PiperTemplate, optional
+        A template to draw the points onto instead of creating a new figure, e.g. `piper_template()`. The
+        returned figure is then reused by the next render of the template.
 
     Returns:
     --------
@@ -307,60 +491,50 @@ def piper_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = None
       characteristics of groundwater.
     - The function adjusts the font size of the legend based on the number of labels and the maximum label length.
     """
-    img = imageio.imread("./data/PiperCompleto.png")
-    df["total_anion"] = (
-        df["Sulfatos (meq/L)"]
-        + df["Bicarbonato (meq/L)"]
-        + df["Carbonato (meq/L)"]
-        + df["Cloruros (meq/L)"]
-    )
-    df["total_cation"] = (
-        df["Magnesio (meq/L)"]
-        + df["Calcio (meq/L)"]
-        + df["Potasio (meq/L)"]
-        + df["Sodio (meq/L)"]
-    )
-    df["SO4_norm"] = df["Sulfatos (meq/L)"] / df["total_anion"] * 100
-    df["HCO3_CO3_norm"] = (
-        (df["Bicarbonato (meq/L)"] + df["Carbonato (meq/L)"]) / df["total_anion"] * 100
-    )
-    df["Cl_norm"] = df["Cloruros (meq/L)"] / df["total_anion"] * 100
-    df["Mg_norm"] = df["Magnesio (meq/L)"] / df["total_cation"] * 100
-    df["Na_K_norm"] = (
-        (df["Potasio (meq/L)"] + df["Sodio (meq/L)"]) / df["total_cation"] * 100
-    )
-    df["Ca_norm"] = df["Calcio (meq/L)"] / df["total_cation"] * 100
-    df["xcation"] = 40 + 360 - (df["Ca_norm"] + df["Mg_norm"] / 2) * 3.6
-    df["ycation"] = 40 + (math.sqrt(3) * df["Mg_norm"] / 2) * 3.6
-    df["xanion"] = 40 + 360 + 100 + (df["Cl_norm"] + df["SO4_norm"] / 2) * 3.6
-    df["yanion"] = 40 + (df["SO4_norm"] * math.sqrt(3) / 2) * 3.6
-    df["xdiam"] = 0.5 * (
-        df["xcation"] + df["xanion"] + (df["yanion"] - df["ycation"]) / math.sqrt(3)
-    )
-    df["ydiam"] = 0.5 * (
-        df["yanion"] + df["ycation"] + math.sqrt(3) * (df["xanion"] - df["xcation"])
+    coordinates = piper_coordinates(
+        df["Calcio (meq/L)"],
+        df["Magnesio (meq/L)"],
+        df["Sodio (meq/L)"],
+        df["Potasio (meq/L)"],
+        df["Bicarbonato (meq/L)"],
+        df["Carbonato (meq/L)"],
+        df["Cloruros (meq/L)"],
+        df["Sulfatos (meq/L)"],
     )
     col_style = [] if col_style is None else [col_style]
     col_color = [] if col_color is None else [col_color]
-    df_cation = df[["xcation", "ycation"] + col_style + col_color].rename(
-        columns={"xcation": "x", "ycation": "y"}
-    )
-    df_anion = df[["xanion", "yanion"] + col_style + col_color].rename(
-        columns={"xanion": "x", "yanion": "y"}
+    group_data = _group_data(df, col_style + col_color)
+    df_fig = pd.concat([group_data] * 3, ignore_index=True)
+    df_fig.insert(
+        0,
+        "x",
+        np.concatenate([coordinates.xcation, coordinates.xanion, coordinates.xdiam]),
     )
-    df_diam = df[["xdiam", "ydiam"] + col_style + col_color].rename(
-        columns={"xdiam": "x", "ydiam": "y"}
+    df_fig.insert(
+        1,
+        "y",
+        np.concatenate([coordinates.ycation, coordinates.yanion, coordinates.ydiam]),
     )
-    df_fig = pd.concat([df_cation, df_anion, df_diam], ignore_index=True)
-    fig, ax = plt.subplots()
-    plt.imshow(np.flipud(img), zorder=0)
     col_style = None if len(col_style) == 0 else col_style[0]
     col_color = None if len(col_color) == 0 else col_color[0]
+    if template is not None:
+        return template.draw(df_fig, col_style, col_color)
+    fig, ax = plt.subplots()
+    ax.imshow(piper_background(), zorder=0)
+    ax.axis("off")
+    _draw_piper(fig, ax, df_fig, col_style, col_color)
+    return fig
+
+
+def _draw_piper(fig, ax, df_fig: pd.DataFrame, col_style: str, col_color: str):
+    """
+    Plot the points and legend of a Piper diagram on axes that already show the background.
+    """
     sns.scatterplot(data=df_fig, x="x", y="y", ax=ax, style=col_style, hue=col_color)
     fig.subplots_adjust(right=0.7)
-    plt.ylim(0, 830)
-    plt.xlim(0, 900)
-    plt.axis("off")
+    ax.set_ylim(0, 830)
+    ax.set_xlim(0, 900)
+    ax.axis("off")
     if ax.get_legend():
         num_labels = len(ax.get_legend().get_texts())
         max_text_length = max(
@@ -375,10 +549,9 @@ def piper_graphic(df: pd.DataFrame, col_style: str = None, col_color: str = None
         print("No legend found in the graphic.")
 
     fig.tight_layout()
-    return fig
 
 
-def stiff_graphic(df: pd.DataFrame, col_point: str, col_date: str):
+def stiff_graphic(df: pd.DataFrame, col_point: str, col_date: str, notify=None):
     """
     Generate Stiff diagrams for visualizing the ionic composition of water samples.
 
@@ -405,6 +578,9 @@ def stiff_graphic(df: pd.DataFrame, col_point: str, col_date: str):
         The name of the column that identifies the sampling points.
     col_date : str
         The name of the column that contains the sampling dates.
+    notify : callable, optional
+        A function called with a title and a message to report points with more than one record for the
+        same date. Defaults to `messagebox.showinfo`; headless callers pass their own function.
 
     Returns:
     --------
@@ -419,44 +595,115 @@ def stiff_graphic(df: pd.DataFrame, col_point: str, col_date: str):
       per liter (meq/L) on the x-axis.
     - The function checks for multiple records at the same sampling point and date and provides a warning if found.
     """
-    figures = {}
-    for point_id, point_values in df.groupby([col_point]):
+    return dict(iter_stiff_figures(df, col_point, col_date, notify=notify, close=False))
+
+
+def iter_stiff_figures(
+    df: pd.DataFrame, col_point: str, col_date: str, notify=None, close: bool = True
+):
+    """
+    Generate the Stiff diagrams of the sampling points one at a time.
+
+    Unlike `stiff_graphic`, which keeps every figure alive in a dictionary, this generator draws the
+    figure of one point, yields it and, once the caller asks for the next point, closes it. Memory therefore
+    stays flat regardless of the number of points, as long as the caller does not keep the figures.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        The water sample data, with the meq/L columns listed in `stiff_graphic`.
+    col_point : str
+        The name of the column that identifies the sampling points.
+    col_date : str
+        The name of the column that contains the sampling dates.
+    notify : callable, optional
+        A function called with a title and a message for each point with more than one record for the
+        same date. Defaults to `messagebox.showinfo`.
+    close : bool, optional
+        Whether each figure is closed when the next one is requested. `stiff_graphic` passes False to
+        keep them open.
+
+    Yields:
+    -------
+    tuple
+        The sampling point identifier and its Matplotlib Figure.
+    """
+    notify = messagebox.showinfo if notify is None else notify
+    for point_id, point_values in df.groupby([col_point], observed=True):
         point_id = point_id if not isinstance(point_id, tuple) else point_id[0]
+        fig = _stiff_figure(point_id, point_values, col_date, notify)
+        try:
+            yield point_id, fig
+        finally:
+            if close:
+                plt.close(fig)
+
+
+def _stiff_figure(point_id, point_values: pd.DataFrame, col_date: str, notify):
+    """
+    Draw the Stiff diagram of one sampling point in its own figure.
+    """
+    with stage("stiff_graphic", rows=len(point_values), point=str(point_id)):
         fig, ax = plt.subplots(figsize=(8, 10))
-        height = 0
-        max_value = 1
-        y_label_data = []
-        y_label_data_str = []
-        date_groups = len(point_values.groupby([col_date]))
-        figure_length = (date_groups * 3 + (date_groups - 1) * 2) + 1
-        for date, values in point_values.groupby([col_date]):
-            date = date if not isinstance(date, tuple) else date[0]
-            if len(values) == 1:
-                Na_K = [
-                    -(abs(values["Sodio (meq/L)"]) + abs(values["Potasio (meq/L)"])),
-                    3 + height,
-                ]
-                cl = [abs(values["Cloruros (meq/L)"]), 3 + height]
-                Ca = [-abs(values["Calcio (meq/L)"]), 2 + height]
-                HCO_CO = [
-                    abs(values["Bicarbonato (meq/L)"])
-                    + abs(values["Carbonato (meq/L)"]),
-                    2 + height,
-                ]
-                Mg = [-abs(values["Magnesio (meq/L)"]), 1 + height]
-                SO4_NO3 = [
-                    abs(values["Sulfatos (meq/L)"]) + abs(values["Nitratos (meq/L)"]),
-                    1 + height,
-                ]
-                points = [Na_K, cl, HCO_CO, SO4_NO3, Mg, Ca]
-                x = [point[0] for point in points]
-                y = [point[1] for point in points]
-                max_value = max([max([math.ceil(abs(val)) for val in x]), max_value])
-                plt.fill(x, y, "blue", alpha=0.3)
-                plt.scatter(x, y, marker=".", color="darkblue")
-                y_label_data += [1 + height, 2 + height, 3 + height]
-                y_label_data_str += ["Mg", "Na+K", "Ca"]
-                height += 5
+        _draw_stiff(ax, point_id, point_values, col_date, notify)
+        fig.tight_layout()
+    return fig
+
+
+def _draw_stiff(
+    ax, point_id, point_values: pd.DataFrame, col_date: str, notify, compact=False
+):
+    """
+    Draw the Stiff diagram of one sampling point on an axes, with one polygon per sampling date.
+
+    With `compact`, used by the small multiples of the atlas, the point is written as the title of the
+    axes, each date is written above its polygon, the fonts are smaller and every other x tick is kept.
+    """
+    font_size = 6 if compact else None
+    height = 0
+    max_value = 1
+    y_label_data = []
+    y_label_data_str = []
+    date_groups = len(point_values.groupby([col_date]))
+    figure_length = (date_groups * 3 + (date_groups - 1) * 2) + 1
+    for date, values in point_values.groupby([col_date]):
+        date = date if not isinstance(date, tuple) else date[0]
+        if len(values) == 1:
+            values = values.iloc[0]
+            Na_K = [
+                -(abs(values["Sodio (meq/L)"]) + abs(values["Potasio (meq/L)"])),
+                3 + height,
+            ]
+            cl = [abs(values["Cloruros (meq/L)"]), 3 + height]
+            Ca = [-abs(values["Calcio (meq/L)"]), 2 + height]
+            HCO_CO = [
+                abs(values["Bicarbonato (meq/L)"]) + abs(values["Carbonato (meq/L)"]),
+                2 + height,
+            ]
+            Mg = [-abs(values["Magnesio (meq/L)"]), 1 + height]
+            SO4_NO3 = [
+                abs(values["Sulfatos (meq/L)"]) + abs(values["Nitratos (meq/L)"]),
+                1 + height,
+            ]
+            points = [Na_K, cl, HCO_CO, SO4_NO3, Mg, Ca]
+            x = [point[0] for point in points]
+            y = [point[1] for point in points]
+            max_value = max([max([math.ceil(abs(val)) for val in x]), max_value])
+            ax.fill(x, y, "blue", alpha=0.3)
+            ax.scatter(x, y, marker=".", color="darkblue")
+            y_label_data += [1 + height, 2 + height, 3 + height]
+            y_label_data_str += ["Mg", "Na+K", "Ca"]
+            if compact:
+                # The date goes in the gap above its polygon, inside the small axes.
+                ax.text(
+                    0,
+                    3.6 + height,
+                    date.strftime("%Y-%m-%d"),
+                    horizontalalignment="center",
+                    verticalalignment="center",
+                    fontsize=font_size,
+                )
+            else:
                 label = point_id + "\n" + date.strftime("%Y-%m-%d")
                 x_pos = -0.3
                 y_pos = np.mean(y) / figure_length
@@ -468,28 +715,322 @@ def stiff_graphic(df: pd.DataFrame, col_point: str, col_date: str):
                     verticalalignment="center",
                     transform=ax.transAxes,
                 )
-            else:
-                messagebox.showinfo(
-                    "Alert Message",
-                    f"The point {point_id} for the date {date.strftime('%Y-%m-%d')} has more than one record",
+            height += 5
+        else:
+            notify(
+                "Alert Message",
+                f"The point {point_id} for the date {date.strftime('%Y-%m-%d')} has more than one record",
+            )
+
+    interval = round(max_value * 2 / 10, 1)
+    x_ticks = np.arange(-max_value, max_value, interval)
+    if compact:
+        x_ticks = x_ticks[::2]
+    x_abs = [round(abs(val), 2) for val in x_ticks]
+    ax.set_xlim(-max_value, max_value)
+    y_top = max(y_label_data, default=0) + (1.6 if compact else 1)
+    ax.set_ylim(0, y_top)
+    ax.set_xticks(x_ticks)
+    ax.set_xticklabels(x_abs, fontsize=font_size)
+    ax.set_yticks(y_label_data)
+    ax.set_yticklabels(y_label_data_str, fontsize=font_size)
+    ax.set_xlabel("meq/L", fontsize=font_size)
+    ax.grid(linestyle="dashed", color="gray")
+    twin = ax.twinx()
+    twin.set_yticks(y_label_data)
+    twin.set_yticklabels(
+        ["SO4+NO3", "HCO3+CO3", "Cl"] * int((len(y_label_data) / 3)),
+        fontsize=font_size,
+    )
+    twin.set_ylim(0, y_top)
+    if compact:
+        ax.set_title(str(point_id), fontsize=8)
+
+
+@traced()
+def export_stiff_atlas(
+    df: pd.DataFrame,
+    path: str,
+    col_point: str,
+    col_date: str,
+    grid: tuple = STIFF_ATLAS_GRID,
+    notify=None,
+):
+    """
+    Write the Stiff diagrams of every sampling point into a single multi-page PDF.
+
+    The atlas starts with an index of the points and the page where each one is drawn, followed by the
+    diagrams as small multiples, `grid` points per page. Each page is written to the file as soon as it is
+    drawn and then discarded, so memory does not grow with the number of points, and vector pages avoid
+    rasterizing one JPEG per point.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        The water sample data, with the meq/L columns listed in `stiff_graphic`.
+    path : str
+        The path of the PDF file.
+    col_point : str
+        The name of the column that identifies the sampling points.
+    col_date : str
+        The name of the column that contains the sampling dates.
+    grid : tuple, optional
+        The number of rows and columns of diagrams on each page.
+    notify : callable, optional
+        A function called with a title and a message for each point with more than one record for the
+        same date. Defaults to `messagebox.showinfo`.
+
+    Returns:
+    --------
+    int
+        The number of pages written.
+    """
+    notify = messagebox.showinfo if notify is None else notify
+    rows, columns = grid
+    per_page = rows * columns
+    groups = df.groupby(col_point, observed=True)
+    point_ids = list(groups.groups.keys())
+    index_pages = max(1, math.ceil(len(point_ids) / STIFF_ATLAS_INDEX_ENTRIES))
+    pages = index_pages
+    index = [
+        f"{point_id}{'.' * 8}{index_pages + 1 + position // per_page}"
+        for position, point_id in enumerate(point_ids)
+    ]
+    with PdfPages(path) as pdf:
+        for first in range(0, max(len(index), 1), STIFF_ATLAS_INDEX_ENTRIES):
+            entries = index[first : first + STIFF_ATLAS_INDEX_ENTRIES]
+            fig = Figure(figsize=STIFF_ATLAS_PAGE_SIZE)
+            fig.text(0.08, 0.95, "Diagramas de Stiff - Índice", fontsize=14)
+            half = STIFF_ATLAS_INDEX_ENTRIES // 2
+            for column, entries_column in enumerate([entries[:half], entries[half:]]):
+                fig.text(
+                    0.08 + column * 0.45,
+                    0.92,
+                    "\n".join(entries_column),
+                    fontsize=7,
+                    verticalalignment="top",
+                    family="monospace",
                 )
-        
-        plt.xlim(-max_value, max_value)
-        plt.ylim(0, max(y_label_data) + 1)
-        interval = round(max_value * 2 / 10, 1)
-        x_abs = [
-            round(abs(val), 2) for val in np.arange(-max_value, max_value, interval)
-        ]
-        plt.xticks(np.arange(-max_value, max_value, interval), x_abs)
-        plt.yticks(y_label_data, y_label_data_str)
-        plt.xlabel("meq/L")
-        ax.grid(linestyle="dashed", color="gray")
-        _ = ax.twinx()
-        plt.yticks(
-            y_label_data, ["SO4+NO3", "HCO3+CO3", "Cl"] * int((len(y_label_data) / 3))
-        )
-        plt.xticks(np.arange(-max_value, max_value, interval), x_abs)
-        plt.ylim(0, max(y_label_data) + 1)
-        fig.tight_layout()
-        figures[point_id] = fig
-    return figures
+            pdf.savefig(fig)
+        for first in range(0, len(point_ids), per_page):
+            fig = Figure(figsize=STIFF_ATLAS_PAGE_SIZE)
+            axes = fig.subplots(rows, columns, squeeze=False).ravel()
+            page_points = point_ids[first : first + per_page]
+            for ax, point_id in zip(axes, page_points):
+                _draw_stiff(
+                    ax,
+                    point_id,
+                    groups.get_group(point_id),
+                    col_date,
+                    notify,
+                    compact=True,
+                )
+            for ax in axes[len(page_points) :]:
+                ax.set_axis_off()
+            # A fixed layout: tight_layout would draw every page twice.
+            fig.subplots_adjust(
+                left=0.1, right=0.88, bottom=0.05, top=0.96, wspace=1.0, hspace=0.45
+            )
+            pdf.savefig(fig)
+            pages += 1
+    return pages
+
+
+FIGURE_FUNCTIONS = {
+    "mifflin": mifflin_graphic,
+    "gibbs": gibbs_graphic,
+}
+
+
+def use_offscreen_backend():
+    """
+    Switch Matplotlib to the non-interactive Agg backend; used as initializer of the rendering workers.
+    """
+    plt.switch_backend("Agg")
+
+
+def figure_executor(workers: int = None) -> ProcessPoolExecutor:
+    """
+    Create a pool of worker processes rendering figures off-screen with the Agg backend.
+
+    The workers are started with `spawn`, so they do not inherit the Tk state of the GUI process.
+
+    Parameters:
+    -----------
+    workers : int, optional
+        The number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+    --------
+    ProcessPoolExecutor
+        The pool, to be used with `render_figure`.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=use_offscreen_backend,
+    )
+
+
+@traced()
+def figure_jobs(
+    df: pd.DataFrame,
+    folder_path: str,
+    col_point: str,
+    col_date: str,
+    col_style: str = None,
+    col_color: str = None,
+    stiff_atlas: tuple = None,
+):
+    """
+    Split the export of a meq table into independent figure renders.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        The meq table, as returned by `calculate_meq_table`.
+    folder_path : str
+        The folder where the images are written.
+    col_point : str
+        The name of the column that identifies the sampling points.
+    col_date : str
+        The name of the column that contains the sampling dates.
+    col_style : str, optional
+        The name of the column used for styling the points of the scatter diagrams.
+    col_color : str, optional
+        The name of the column used for coloring the points of the scatter diagrams.
+    stiff_atlas : tuple, optional
+        The rows and columns of diagrams per page to write every Stiff diagram into a single PDF atlas
+        (`atlas_stiff.pdf`) instead of one image per point.
+
+    Returns:
+    --------
+    list
+        Tuples of (kind, data, path, options) to be passed to `render_figure`: one for each of the Mifflin,
+        Gibbs and Piper diagrams and one Stiff diagram per sampling point, or a single job for the atlas.
+    """
+    options = {"col_style": col_style, "col_color": col_color}
+    jobs = [
+        ("mifflin", df, os.path.join(folder_path, "fig_mifflin.jpg"), options),
+        ("gibbs", df, os.path.join(folder_path, "fig_gibbs.jpg"), options),
+        ("piper", df, os.path.join(folder_path, "fig_pipper.jpg"), options),
+    ]
+    figure_data = df
+    if not pd.api.types.is_datetime64_any_dtype(df[col_date]):
+        # Dates are parsed once by the validation; this only applies to tables built elsewhere.
+        figure_data = df.assign(**{col_date: parse_dates(df[col_date])[0]})
+    stiff_options = {"col_point": col_point, "col_date": col_date}
+    if stiff_atlas is not None:
+        path = os.path.join(folder_path, "atlas_stiff.pdf")
+        atlas_options = {**stiff_options, "grid": stiff_atlas}
+        jobs.append(("atlas", figure_data, path, atlas_options))
+        return jobs
+    for point_id, point_values in figure_data.groupby(col_point, observed=True):
+        path = os.path.join(folder_path, f"fig_stiff{point_id}.jpg")
+        jobs.append(("stiff", point_values, path, stiff_options))
+    return jobs
+
+
+def render_figure(kind: str, df: pd.DataFrame, path: str, options: dict):
+    """
+    Draw one figure of an export job, save it and close it.
+
+    Parameters:
+    -----------
+    kind : str
+        The diagram: "mifflin", "gibbs", "piper", "stiff" or "atlas" (every Stiff diagram in a PDF).
+    df : pd.DataFrame
+        The data of the diagram; for "stiff", the rows of a single sampling point.
+    path : str
+        The path of the image written.
+    options : dict
+        The keyword arguments of the figure function.
+
+    Returns:
+    --------
+    tuple
+        The path of the image and the list of warnings raised while drawing.
+    """
+    warnings = []
+    with stage("render_figure", rows=len(df), kind=kind):
+        if kind == "atlas":
+            export_stiff_atlas(
+                df,
+                path,
+                notify=lambda title, message: warnings.append(message),
+                **options,
+            )
+        elif kind == "stiff":
+            figures = iter_stiff_figures(
+                df, notify=lambda title, message: warnings.append(message), **options
+            )
+            for _, fig in figures:
+                with stage("savefig", kind=kind):
+                    fig.savefig(path)
+        elif kind == "piper":
+            template = piper_template()
+            fig = piper_graphic(df, template=template, **options)
+            with stage("savefig", kind=kind):
+                fig.savefig(path, dpi=400)
+            template.clear()
+        else:
+            fig = FIGURE_FUNCTIONS[kind](df, **options)
+            with stage("savefig", kind=kind):
+                fig.savefig(path, dpi=400)
+            plt.close(fig)
+    return path, warnings
+
+
+def export_figures(
+    df: pd.DataFrame,
+    folder_path: str,
+    col_point: str,
+    col_date: str,
+    col_style: str = None,
+    col_color: str = None,
+    notify=None,
+    stiff_atlas: tuple = None,
+):
+    """
+    Generate the Mifflin, Gibbs, Piper and Stiff diagrams of a meq table and save them as images.
+
+    The figures are rendered one after another in the current process; the GUI sends the same jobs
+    (`figure_jobs`) to a `figure_executor` instead. Every figure is closed once saved, so exporting many
+    tables in the same process does not accumulate open figures.
+
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        The meq table, as returned by `calculate_meq_table`.
+    folder_path : str
+        The folder where the images are written.
+    col_point : str
+        The name of the column that identifies the sampling points.
+    col_date : str
+        The name of the column that contains the sampling dates.
+    col_style : str, optional
+        The name of the column used for styling the points of the scatter diagrams.
+    col_color : str, optional
+        The name of the column used for coloring the points of the scatter diagrams.
+    notify : callable, optional
+        Called with a title and a message for each point with more than one record for the same date.
+        Defaults to `messagebox.showinfo`.
+    stiff_atlas : tuple, optional
+        The rows and columns of diagrams per page to write the Stiff diagrams into a PDF atlas.
+
+    Returns:
+    --------
+    list
+        The paths of the images written.
+    """
+    notify = messagebox.showinfo if notify is None else notify
+    paths = []
+    jobs = figure_jobs(
+        df, folder_path, col_point, col_date, col_style, col_color, stiff_atlas
+    )
+    for job in jobs:
+        path, warnings = render_figure(*job)
+        paths.append(path)
+        for message in warnings:
+            notify("Alert Message", message)
+    return paths
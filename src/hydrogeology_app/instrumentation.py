@@ -0,0 +1,408 @@
+"""
+Per-stage instrumentation of the application.
+
+Each stage (reading a sheet, calculating the meq table, drawing a figure...) is wrapped in `stage` or
+decorated with `traced`. While recording is enabled, every stage records its wall time, the CPU time of its
+thread, the peak of the memory traced by `tracemalloc` and, when known, the number of rows it processed.
+The recorded stages can be summarized or written as a trace file in the Chrome trace event format, which
+chrome://tracing, Perfetto (https://ui.perfetto.dev) and speedscope open directly.
+
+Recording is off by default; `stage` and `traced` then cost one global lookup. It is enabled with the menu
+"Diagnóstico" of the interface, or by setting the `HYDROGEOGRAPH_TRACE` environment variable to the path
+of the trace file, which is written when the application exits. While recording, `tracemalloc` makes
+allocation-heavy stages somewhat slower, so the times are best compared between recorded runs.
+
+Stages executed in worker processes are recorded there: the calls are wrapped with `call_traced`, which
+returns the recorded events with the result so they can be merged with `merge`.
+"""
+
+import atexit
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Text
+
+TRACE_ENV = "HYDROGEOGRAPH_TRACE"
+TRACE_CATEGORY = "hydrogeograph"
+
+logger = logging.getLogger(__name__)
+
+_recorder = None
+_kept_events: List[Dict] = []
+
+
+class Stage:
+    """
+    A stage being recorded; `rows` can be set inside the `with` block once the row count is known.
+
+    Attributes:
+    -----------
+    name : str
+        The name of the stage.
+    rows : int
+        The number of rows processed by the stage, or None.
+    args : dict
+        Other values shown with the stage in the trace viewer.
+    """
+
+    def __init__(self, recorder, name: Text, rows: int = None, args: Dict = None):
+        self.recorder = recorder
+        self.name = name
+        self.rows = rows
+        self.args = args or {}
+        self._start = None
+
+    def __enter__(self):
+        self._start = self.recorder.start_stage()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.end_stage(self, self._start, failed=exc_type is not None)
+        return False
+
+
+class _NullStage:
+    """
+    The stage returned while recording is disabled: entering and leaving it does nothing.
+    """
+
+    name = None
+    rows = None
+    args = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Recorder:
+    """
+    Collects the stages of the current process as trace events.
+
+    The timestamps are taken from the wall clock, so events recorded in different processes line up in the
+    trace. Memory is measured with `tracemalloc`, which is started with the recorder; its peak is shared by
+    the whole process, so the peak of a stage includes allocations made meanwhile by other threads.
+
+    Attributes:
+    -----------
+    events : list
+        The recorded trace events.
+    """
+
+    def __init__(self) -> None:
+        self.events: List[Dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._owns_tracemalloc = not tracemalloc.is_tracing()
+        if self._owns_tracemalloc:
+            tracemalloc.start()
+
+    def close(self) -> None:
+        """
+        Stop `tracemalloc` if the recorder started it.
+        """
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+    def _peaks(self) -> List[int]:
+        if not hasattr(self._local, "peaks"):
+            self._local.peaks = []
+        return self._local.peaks
+
+    def start_stage(self) -> tuple:
+        """
+        Take the start measurements of a stage.
+        """
+        peaks = self._peaks()
+        current, peak = tracemalloc.get_traced_memory()
+        if peaks:
+            peaks[-1] = max(peaks[-1], peak)
+        tracemalloc.reset_peak()
+        peaks.append(current)
+        return time.time_ns(), time.perf_counter_ns(), time.thread_time_ns(), current
+
+    def end_stage(self, stage: Stage, start: tuple, failed: bool = False) -> None:
+        """
+        Record a finished stage as a complete ("X") trace event.
+        """
+        wall_ns, counter_ns, cpu_ns, memory_start = start
+        duration_ns = time.perf_counter_ns() - counter_ns
+        cpu_ns = time.thread_time_ns() - cpu_ns
+        peaks = self._peaks()
+        peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+        if peaks:
+            peaks[-1] = max(peaks[-1], peak)
+        args = {
+            "cpu_ms": round(cpu_ns / 1e6, 3),
+            "peak_mb": round(peak / 1024**2, 3),
+            "peak_increase_mb": round((peak - memory_start) / 1024**2, 3),
+        }
+        if stage.rows is not None:
+            args["rows"] = int(stage.rows)
+        if failed:
+            args["failed"] = True
+        args.update(stage.args)
+        event = {
+            "name": stage.name,
+            "cat": TRACE_CATEGORY,
+            "ph": "X",
+            "ts": wall_ns / 1000,
+            "dur": duration_ns / 1000,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+
+    def drain(self) -> List[Dict]:
+        """
+        Return the recorded events and forget them.
+        """
+        with self._lock:
+            events, self.events = self.events, []
+        return events
+
+    def extend(self, events: List[Dict]) -> None:
+        """
+        Add events recorded by another process.
+        """
+        with self._lock:
+            self.events.extend(events)
+
+
+def enabled() -> bool:
+    """
+    Whether stages are being recorded.
+    """
+    return _recorder is not None
+
+
+def enable() -> None:
+    """
+    Start recording stages.
+    """
+    global _recorder
+    if _recorder is None:
+        _recorder = Recorder()
+
+
+def disable() -> None:
+    """
+    Stop recording stages. The events recorded so far are kept until `clear`.
+    """
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _kept_events.extend(_recorder.drain())
+        _recorder = None
+
+
+def events() -> List[Dict]:
+    """
+    Return the events recorded so far, including those recorded before the last `disable`.
+    """
+    recorded = list(_kept_events)
+    if _recorder is not None:
+        with _recorder._lock:
+            recorded += _recorder.events
+    return recorded
+
+
+def clear() -> None:
+    """
+    Forget every recorded event.
+    """
+    _kept_events.clear()
+    if _recorder is not None:
+        _recorder.drain()
+
+
+def stage(name: Text, rows: int = None, **args):
+    """
+    Record a stage of the application as a `with` block.
+
+    Parameters:
+    -----------
+    name : str
+        The name of the stage.
+    rows : int, optional
+        The number of rows processed; can also be set on the returned stage inside the block.
+    **args
+        Other values shown with the stage in the trace viewer.
+
+    Returns:
+    --------
+    Stage
+        A context manager; a shared no-op one while recording is disabled.
+    """
+    if _recorder is None:
+        return _NULL_STAGE
+    return Stage(_recorder, name, rows, args)
+
+
+def traced(name: Text = None):
+    """
+    Decorate a function so every call is recorded as a stage.
+
+    When the first argument has a length (e.g. a DataFrame), it is recorded as the row count.
+
+    Parameters:
+    -----------
+    name : str, optional
+        The name of the stage. Defaults to the name of the function.
+    """
+
+    def decorator(function):
+        stage_name = name or function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return function(*args, **kwargs)
+            rows = len(args[0]) if args and hasattr(args[0], "__len__") else None
+            with Stage(_recorder, stage_name, rows):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def call_traced(record: bool, function, *args, **kwargs):
+    """
+    Call a function in a worker process, recording its stages if `record` is true.
+
+    Parameters:
+    -----------
+    record : bool
+        Whether the calling process is recording, usually `enabled()`.
+    function : callable
+        The function to be called; it must be picklable.
+
+    Returns:
+    --------
+    tuple
+        The value returned by the function and the events recorded during the call, to be passed to
+        `merge` in the calling process.
+    """
+    if record:
+        enable()
+    elif not os.environ.get(TRACE_ENV):
+        disable()
+        clear()
+    if _recorder is None:
+        return function(*args, **kwargs), []
+    _recorder.drain()
+    result = function(*args, **kwargs)
+    return result, _recorder.drain()
+
+
+def merge(events: List[Dict]) -> None:
+    """
+    Add the events returned by `call_traced` to the events of this process.
+    """
+    if not events:
+        return
+    if _recorder is not None:
+        _recorder.extend(events)
+    else:
+        _kept_events.extend(events)
+
+
+def summary(recorded: List[Dict] = None) -> List[Dict]:
+    """
+    Aggregate the recorded stages by name.
+
+    Returns:
+    --------
+    list
+        One dictionary per stage name with the number of calls, the total wall and CPU time in seconds,
+        the largest memory peak in MB and the total rows, the slowest stages first.
+    """
+    totals = {}
+    for event in events() if recorded is None else recorded:
+        total = totals.setdefault(
+            event["name"],
+            {"name": event["name"], "calls": 0, "wall_s": 0.0, "cpu_s": 0.0},
+        )
+        total["calls"] += 1
+        total["wall_s"] += event["dur"] / 1e6
+        total["cpu_s"] += event["args"]["cpu_ms"] / 1e3
+        total["peak_mb"] = max(total.get("peak_mb", 0.0), event["args"]["peak_mb"])
+        if "rows" in event["args"]:
+            total["rows"] = total.get("rows", 0) + event["args"]["rows"]
+    return sorted(totals.values(), key=lambda total: total["wall_s"], reverse=True)
+
+
+def format_summary(recorded: List[Dict] = None) -> Text:
+    """
+    Describe the recorded stages as text, one line per stage name.
+    """
+    lines = []
+    for total in summary(recorded):
+        rows = f", {total['rows']:,} filas" if "rows" in total else ""
+        lines.append(
+            f"{total['name']}: {total['calls']} x, {total['wall_s']:.2f} s "
+            f"(CPU {total['cpu_s']:.2f} s), pico {total['peak_mb']:.0f} MB{rows}"
+        )
+    return "\n".join(lines) or "No hay etapas registradas."
+
+
+def write_trace(path: Text, recorded: List[Dict] = None) -> int:
+    """
+    Write the recorded stages as a Chrome trace event file.
+
+    Parameters:
+    -----------
+    path : str
+        The path of the JSON file.
+
+    Returns:
+    --------
+    int
+        The number of events written.
+    """
+    recorded = events() if recorded is None else recorded
+    metadata = [
+        {
+            "name": "process_name",
+            "ph": "M",
+            "pid": pid,
+            "args": {
+                "name": "HydroGeoGraph" if pid == os.getpid() else f"worker {pid}"
+            },
+        }
+        for pid in sorted({event["pid"] for event in recorded})
+    ]
+    with open(path, "w", encoding="utf-8") as trace_file:
+        json.dump(
+            {"traceEvents": metadata + recorded, "displayTimeUnit": "ms"}, trace_file
+        )
+    return len(recorded)
+
+
+def _write_trace_at_exit(path: Text) -> None:
+    recorded = events()
+    if recorded:
+        write_trace(path, recorded)
+        logger.info("Trace written to %s (%d stages)", path, len(recorded))
+
+
+if os.environ.get(TRACE_ENV):
+    enable()
+    if multiprocessing.parent_process() is None:
+        atexit.register(_write_trace_at_exit, os.environ[TRACE_ENV])
@@ -1,15 +1,21 @@
 import tkinter as tk
+import tkinter.messagebox
 from tkinter import ttk
-import pandas as pd
-from openpyxl import load_workbook
-from hydrogeology_app.analitic_data import calculate_meq_table
-from hydrogeology_app.table_management import TableManagement
+from hydrogeology_app import instrumentation
+from hydrogeology_app.ion_catalog import ION_CATALOG, load_ion_catalog
+from hydrogeology_app.excel_reader import list_sheets, preview_sheet
+from hydrogeology_app.jobs import JobRunner
 from PIL import Image, ImageTk
 from io import BytesIO
 import base64
 from tkinter import filedialog
 import os
 
+# pandas, matplotlib and the modules built on them are imported on first use, so the window is shown
+# before they are loaded.
+
+MAX_LISTED_ISSUES = 1000
+
 
 class HydrogeologyApp:
     def __init__(self, root):
@@ -21,30 +27,32 @@ class HydrogeologyApp:
         self.combobox_point = None
         self.combobox_value = None
         self.combobox_date = None
-        self.combobox_bicarbonate = None
-        self.combobox_calcium = None
-        self.combobox_carbonate = None
-        self.combobox_chlorides = None
-        self.combobox_magnesium = None
-        self.combobox_nitrates = None
-        self.combobox_potassium = None
-        self.combobox_sodium = None
-        self.combobox_sulfates = None
+        self.ion_catalog = ION_CATALOG
+        self.ion_comboboxes = {}
+        self.ion_widgets = []
         self.combobox_conductivity = None
         self.frame_parameters = None
         self.frame_columns = None
         self.frame_parameters_2 = None
+        self.window_extra_ions = None
+        self.frame_extra_ions = None
         self.combobox_parameter = None
         self.canvas_frame = None
         self.frame_sheet = None
         self.combobox_sheets = None
-        self.table_mannagement: TableManagement = None
+        self.label_sheet_preview = None
+        self.sheet_cache = None
+        self.table_mannagement = None
         self.frame_table = None
         self.data_tree = None
         self.treeview = None
-        self.df_data = pd.DataFrame()
+        self.df_data = None
         self.combobox_group = None
         self.combobox_color = None
+        self.job_runner = JobRunner(root)
+        self.record_stages = None
+        self.single_precision = None
+        self.dict_rename = None
         self.initialize_ui()
 
     def initialize_ui(self):
@@ -63,6 +71,33 @@ class HydrogeologyApp:
         menu_file = tk.Menu(menu, tearoff=0)
         menu.add_cascade(label="Archivo", menu=menu_file)
         menu_file.add_command(label="Abrir..", command=self.select_file)
+        self.single_precision = tk.BooleanVar(value=False)
+        menu_file.add_checkbutton(
+            label="Valores en precisión simple (float32)",
+            variable=self.single_precision,
+        )
+        menu_file.add_command(
+            label="Cargar catálogo de iones...", command=self.select_ion_catalog
+        )
+        menu_cache = tk.Menu(menu, tearoff=0)
+        menu.add_cascade(label="Caché", menu=menu_cache)
+        menu_cache.add_command(label="Ver caché", command=self.show_cache)
+        menu_cache.add_command(label="Limpiar caché", command=self.clear_cache)
+        menu_diagnostics = tk.Menu(menu, tearoff=0)
+        menu.add_cascade(label="Diagnóstico", menu=menu_diagnostics)
+        self.record_stages = tk.BooleanVar(value=instrumentation.enabled())
+        menu_diagnostics.add_checkbutton(
+            label="Registrar etapas",
+            variable=self.record_stages,
+            command=self.toggle_stage_recording,
+        )
+        menu_diagnostics.add_command(
+            label="Ver etapas registradas", command=self.show_stages
+        )
+        menu_diagnostics.add_command(label="Guardar traza...", command=self.save_trace)
+        menu_diagnostics.add_command(
+            label="Borrar etapas registradas", command=instrumentation.clear
+        )
         main_frame = tk.Frame(self.root)
         main_frame.pack(fill=tk.BOTH, expand=1)
         self.canvas_frame = tk.Canvas(main_frame)
@@ -85,6 +120,11 @@ class HydrogeologyApp:
             self.frame_sheet, "Seleccionar Pestaña: ", 0, 0
         )
         self.create_button(self.frame_sheet, "Leer Pestaña", self.select_sheet, 2, 0)
+        self.combobox_sheets.bind("<<ComboboxSelected>>", self.show_sheet_preview)
+        self.label_sheet_preview = tk.Label(
+            self.frame_sheet, text="", justify="left", wraplength=350
+        )
+        self.label_sheet_preview.grid(row=3, column=0, sticky="w")
         self.canvas_frame.create_window((10, 20), window=self.frame_sheet, anchor="nw")
         self.ajustar_ypadx(self.frame_sheet, 4)
         frame_titulo_parametros = tk.Frame(self.canvas_frame, height=30, padx=10)
@@ -128,21 +168,15 @@ class HydrogeologyApp:
             (400, 140), window=frame_titulo_parametros, anchor="nw"
         )
         self.frame_parameters = tk.Frame(self.canvas_frame, height=30, padx=10)
-        self.combobox_bicarbonate = self.generate_combobox(
-            self.frame_parameters, "Etiqueta Bicarbonato (mg/L): ", 1, 0, "Horizontal"
-        )
-        self.combobox_calcium = self.generate_combobox(
-            self.frame_parameters, "Etiqueta Calcio (mg/L): ", 2, 0, "Horizontal"
-        )
-        self.combobox_carbonate = self.generate_combobox(
-            self.frame_parameters, "Etiqueta Carbonato (mg/L): ", 3, 0, "Horizontal"
-        )
-        self.combobox_chlorides = self.generate_combobox(
-            self.frame_parameters, "Etiqueta Cloruros (mg/L Cl-): ", 4, 0, "Horizontal"
-        )
-        self.combobox_magnesium = self.generate_combobox(
-            self.frame_parameters, "Etiqueta Magnesio (mg/L): ", 5, 0, "Horizontal"
-        )
+        self.frame_parameters_2 = tk.Frame(self.canvas_frame, height=30, padx=10)
+        self.window_extra_ions = tk.Toplevel(self.root)
+        self.window_extra_ions.title("Iones adicionales")
+        self.window_extra_ions.protocol(
+            "WM_DELETE_WINDOW", self.window_extra_ions.withdraw
+        )
+        self.window_extra_ions.withdraw()
+        self.frame_extra_ions = tk.Frame(self.window_extra_ions, padx=10, pady=10)
+        self.frame_extra_ions.pack()
         boton_table = tk.Button(
             self.frame_parameters,
             text="Leer Columnas",
@@ -152,43 +186,98 @@ class HydrogeologyApp:
         self.canvas_frame.create_window(
             (400, 170), window=self.frame_parameters, anchor="nw"
         )
-
-        self.frame_parameters_2 = tk.Frame(self.canvas_frame, height=30, padx=10)
-        self.combobox_nitrates = self.generate_combobox(
+        boton_extra_ions = tk.Button(
             self.frame_parameters_2,
-            "Etiqueta Nitratos (mg/L N-NO3): ",
-            1,
-            0,
-            "Horizontal",
-        )
-        self.combobox_potassium = self.generate_combobox(
-            self.frame_parameters_2, "Etiqueta Potasio (mg/L): ", 2, 0, "Horizontal"
+            text="Iones adicionales...",
+            command=self.window_extra_ions.deiconify,
         )
-        self.combobox_sodium = self.generate_combobox(
-            self.frame_parameters_2, "Etiqueta Sodio (mg/L): ", 3, 0, "Horizontal"
-        )
-        self.combobox_sulfates = self.generate_combobox(
-            self.frame_parameters_2,
-            "Etiqueta Sulfatos (mg/L SO4-2): ",
-            4,
-            0,
-            "Horizontal",
+        boton_extra_ions.grid(row=10, column=0, sticky="w")
+        self.canvas_frame.create_window(
+            (800, 170), window=self.frame_parameters_2, anchor="nw"
         )
+        self.build_ion_comboboxes()
+        self.root.after_idle(self.create_table_area)
+        self.root.mainloop()
+
+    def create_table_area(self):
+        """
+        Create the (empty) table area once the window is drawn, loading pandas and the table modules.
+        """
+        self.root.update_idletasks()
+        import pandas as pd
+        from hydrogeology_app.table_management import TableManagement
+
+        self.df_data = pd.DataFrame()
+        self.table_mannagement = TableManagement(self, pd.DataFrame())
+        self.table_mannagement.generate_table()
+
+    def get_sheet_cache(self):
+        """
+        Return the sheet cache, creating it on first use.
+        """
+        if self.sheet_cache is None:
+            from hydrogeology_app.sheet_cache import SheetCache
+
+            self.sheet_cache = SheetCache()
+        return self.sheet_cache
+
+    def build_ion_comboboxes(self):
+        """
+        Create the combobox of every ion of `ion_catalog`, and the one of the conductivity after them,
+        replacing those of the previous catalog.
+
+        The required ions are split between the two parameter frames and the optional ions are listed in
+        the "Iones adicionales" window.
+        """
+        for widget in self.ion_widgets:
+            widget.destroy()
+        self.ion_widgets = []
+        self.ion_comboboxes = {}
+        required_ions = sorted(
+            [ion for ion in self.ion_catalog if ion.required], key=lambda ion: ion.name
+        )
+        optional_ions = [ion for ion in self.ion_catalog if not ion.required]
+        half = (len(required_ions) + 2) // 2
+        ion_frames = [
+            (self.frame_parameters, required_ions[:half]),
+            (self.frame_parameters_2, required_ions[half:]),
+            (self.frame_extra_ions, optional_ions),
+        ]
+        for frame, ions in ion_frames:
+            for row, ion in enumerate(ions, start=1):
+                self.ion_comboboxes[ion.key] = self.generate_combobox(
+                    frame, f"Etiqueta {ion.label}: ", row, 0, "Horizontal"
+                )
+                self.ion_widgets.extend(frame.grid_slaves(row=row))
+        row = len(required_ions) - half + 1
         self.combobox_conductivity = self.generate_combobox(
             self.frame_parameters_2,
             "Etiqueta Conductividad (µS/cm): ",
-            5,
+            row,
             0,
             "Horizontal",
         )
-        self.canvas_frame.create_window(
-            (800, 170), window=self.frame_parameters_2, anchor="nw"
-        )
+        self.ion_widgets.extend(self.frame_parameters_2.grid_slaves(row=row))
         self.ajustar_ypadx(self.frame_parameters, 3)
         self.ajustar_ypadx(self.frame_parameters_2, 3)
-        self.table_mannagement = TableManagement(self, pd.DataFrame())
-        self.table_mannagement.generate_table()
-        self.root.mainloop()
+
+    def select_ion_catalog(self):
+        """
+        Replace the ions converted to meq/L by those of a JSON catalog (see `load_ion_catalog`), offering
+        the parameters of the sheet again if they were already read.
+        """
+        path = filedialog.askopenfilename(filetypes=[("Catálogo de iones", "*.json")])
+        if not path:
+            return
+        try:
+            ion_catalog = load_ion_catalog(path)
+        except (OSError, ValueError) as error:
+            tk.messagebox.showerror("Catálogo de iones", str(error))
+            return
+        self.ion_catalog = ion_catalog
+        self.build_ion_comboboxes()
+        if self.data is not None and len(self.combobox_parameter.get()) > 0:
+            self.select_parameter_labels()
 
     def populate_combo_frame(self, frame, values):
         for widget in frame.winfo_children():
@@ -230,23 +319,89 @@ class HydrogeologyApp:
             filetypes=[("Archivos de Excel", "*.xlsx")]
         )
 
+        self.label_sheet_preview.config(text="")
         if not os.path.exists(self.file):
             return
-        workbook = load_workbook(filename=self.file)
-        sheets_names = workbook.sheetnames
+        sheets_names = list_sheets(self.file)
         self.populate_combo_frame(self.frame_sheet, sheets_names)
 
+    def show_sheet_preview(self, _):
+        preview = preview_sheet(self.file, self.combobox_sheets.get())
+        rows = "?" if preview.n_rows is None else f"{preview.n_rows:,}"
+        columns = ", ".join(str(value) for value in preview.header if value is not None)
+        self.label_sheet_preview.config(text=f"{rows} filas - Columnas: {columns}")
+
     def select_sheet(self):
         self.clean_frame([self.frame_columns, self.frame_parameters])
         sheet_name = self.combobox_sheets.get()
-        self.data = pd.read_excel(self.file, sheet_name=sheet_name)
+        self.job_runner.submit(
+            f"Leyendo la pestaña {sheet_name}",
+            self.read_sheet,
+            self.file,
+            sheet_name,
+            on_done=self.sheet_loaded,
+        )
+
+    def read_sheet(self, job, file, sheet_name):
+        """
+        Read a worksheet through the sheet cache, with its repeated labels stored as categoricals. Executed
+        by the job runner on a worker thread.
+        """
+        from hydrogeology_app.data_layout import compact_labels
+
+        with instrumentation.stage("read_sheet", sheet=sheet_name) as current:
+            data = self.get_sheet_cache().read_excel(file, sheet_name)
+            current.rows = len(data)
+        return compact_labels(data)
+
+    def sheet_loaded(self, data):
+        """
+        Keep the worksheet read by `read_sheet` and offer its columns.
+        """
+        self.data = data
         columns = self.data.columns.tolist()
         self.populate_combo_frame(self.frame_columns, columns)
 
+    def show_cache(self):
+        from hydrogeology_app.sheet_cache import describe_cache
+
+        tk.messagebox.showinfo(
+            "Caché de pestañas", describe_cache(self.get_sheet_cache())
+        )
+
+    def toggle_stage_recording(self):
+        if self.record_stages.get():
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    def show_stages(self):
+        tk.messagebox.showinfo("Etapas registradas", instrumentation.format_summary())
+
+    def save_trace(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json", filetypes=[("Traza de Chrome/Perfetto", "*.json")]
+        )
+        if path:
+            count = instrumentation.write_trace(path)
+            tk.messagebox.showinfo(
+                "Traza guardada",
+                f"Se guardaron {count} etapas. Abrir en https://ui.perfetto.dev "
+                "o chrome://tracing.",
+            )
+
+    def clear_cache(self):
+        if tk.messagebox.askyesno(
+            "Caché de pestañas", "¿Eliminar todas las pestañas guardadas en caché?"
+        ):
+            self.get_sheet_cache().clear()
+
     def select_parameter_labels(self):
-        self.clean_frame([self.frame_parameters, self.frame_parameters_2])
+        self.clean_frame(
+            [self.frame_parameters, self.frame_parameters_2, self.frame_extra_ions]
+        )
         filled_columns = self.check_completion_frame(self.frame_columns, "Columnas")
-        if filled_columns & self.check_date_columns() & self.check_value_column():
+        if filled_columns and self.validate_data():
             parameters = (
                 self.data[[self.combobox_parameter.get()]]
                 .sort_values(by=self.combobox_parameter.get())[
@@ -257,15 +412,12 @@ class HydrogeologyApp:
             )
             self.populate_combo_frame(self.frame_parameters, parameters)
             self.populate_combo_frame(self.frame_parameters_2, parameters)
-            self.set_value_combo(self.combobox_bicarbonate, "Bicarbonato (mg/L)")
-            self.set_value_combo(self.combobox_calcium, "Calcio (mg/L)")
-            self.set_value_combo(self.combobox_carbonate, "Carbonato (mg/L)")
-            self.set_value_combo(self.combobox_chlorides, "Cloruros (mg/L Cl-)")
-            self.set_value_combo(self.combobox_magnesium, "Magnesio (mg/L)")
-            self.set_value_combo(self.combobox_nitrates, "Nitratos (mg/L N-NO3)")
-            self.set_value_combo(self.combobox_potassium, "Potasio (mg/L)")
-            self.set_value_combo(self.combobox_sodium, "Sodio (mg/L)")
-            self.set_value_combo(self.combobox_sulfates, "Sulfatos (mg/L SO4-2)")
+            self.populate_combo_frame(self.frame_extra_ions, parameters)
+            for ion in self.ion_catalog:
+                for label in (ion.label,) + ion.aliases:
+                    if label in parameters:
+                        self.set_value_combo(self.ion_comboboxes[ion.key], label)
+                        break
             self.set_value_combo(self.combobox_conductivity, "Conductividad (µS/cm)")
 
     def check_completion_frame(self, frame, name_frame):
@@ -279,112 +431,93 @@ class HydrogeologyApp:
                     return False
             return True
 
-    def check_date_columns(self):
-        data_copy = self.data.copy()
-        col_date = self.combobox_date.get()
-        date_format = "%d/%m/%Y"
-        try:
-            data_copy[col_date] = pd.to_datetime(
-                data_copy[col_date], format=date_format
-            )
-            return True
-        except KeyError:
-            tk.messagebox.showinfo(
-                "Mensaje de Alerta", f"La columna {col_date} no existe en los datos."
-            )
-            return False
-        except ValueError:
-            tk.messagebox.showinfo(
-                "Mensaje de Alerta",
-                f"La columna {col_date} no cuenta con el formato {date_format}.",
+    def validate_data(self):
+        """
+        Check the date and value columns of the sheet in a single pass, converting them in place.
+
+        Every row that cannot be converted is listed in a window instead of stopping at the first one.
+
+        Returns:
+        --------
+        bool
+            Whether both columns are valid.
+        """
+        from hydrogeology_app.validation import validate_lab_data
+
+        with instrumentation.stage("validate_columns", rows=len(self.data)):
+            issues = validate_lab_data(
+                self.data, self.combobox_date.get(), self.combobox_value.get()
             )
-            return False
+        if len(issues) > 0:
+            self.show_validation_issues(issues)
+        return len(issues) == 0
 
-    def check_value_column(self):
-        data_copy = self.data.copy()
-        col_valor = self.combobox_value.get()
-        try:
-            data_copy[col_valor].astype(float)
-            return True
-        except KeyError:
-            tk.messagebox.showinfo(
-                "Mensaje de Alerta", f"La columna {col_valor} no existe en los datos."
+    def show_validation_issues(self, issues):
+        """
+        List the problems found by `validate_data`, with the option to save them as an Excel file.
+
+        Parameters:
+        -----------
+        issues : pd.DataFrame
+            The table returned by `validate_lab_data`.
+        """
+        window = tk.Toplevel(self.root)
+        window.title("Problemas en los datos")
+        window.transient(self.root)
+        shown = issues.iloc[:MAX_LISTED_ISSUES]
+        text = (
+            f"{len(issues)} problemas encontrados. Corrija el libro y vuelva a abrirlo."
+        )
+        if len(issues) > len(shown):
+            text += f" Se muestran los primeros {len(shown)}."
+        tk.Label(window, text=text, padx=10, pady=5).pack(fill=tk.X)
+        frame = tk.Frame(window)
+        frame.pack(fill=tk.BOTH, expand=1, padx=10)
+        treeview = ttk.Treeview(
+            frame, columns=list(issues.columns), show="headings", height=15
+        )
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=treeview.yview)
+        treeview.configure(yscrollcommand=scrollbar.set)
+        for column, width in zip(issues.columns, (60, 150, 150, 300)):
+            treeview.heading(column, text=column)
+            treeview.column(column, width=width)
+        for row in shown.itertuples(index=False):
+            treeview.insert(
+                "", tk.END, values=["" if value is None else value for value in row]
             )
-            return False
-        except ValueError:
-            tk.messagebox.showinfo(
-                "Mensaje de Alerta",
-                f"La columna {col_valor} no cuenta con el formato numérico.",
+        treeview.pack(side=tk.LEFT, fill=tk.BOTH, expand=1)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        def save_issues():
+            path = filedialog.asksaveasfilename(
+                parent=window,
+                defaultextension=".xlsx",
+                filetypes=[("Archivos de Excel", "*.xlsx")],
             )
-            return False
+            if path:
+                issues.to_excel(path, index=False)
+
+        buttons = tk.Frame(window)
+        buttons.pack(fill=tk.X, padx=10, pady=5)
+        tk.Button(buttons, text="Guardar...", command=save_issues).pack(side=tk.LEFT)
+        tk.Button(buttons, text="Cerrar", command=window.destroy).pack(side=tk.RIGHT)
 
     def generate_table(self):
         self.check_completion_frame(self.frame_parameters, "Parametros")
         self.check_completion_frame(self.frame_columns, "Columnas")
-        para_sulfates = (
-            self.combobox_sulfates.get()
-            if len(self.combobox_sulfates.get()) > 0
-            else "null_sulfatos"
-        )
-        para_sodium = (
-            self.combobox_sodium.get()
-            if len(self.combobox_sodium.get()) > 0
-            else "null_sodio"
-        )
-        para_potassium = (
-            self.combobox_potassium.get()
-            if len(self.combobox_potassium.get()) > 0
-            else "null_potasio"
-        )
-        para_nitrates = (
-            self.combobox_nitrates.get()
-            if len(self.combobox_nitrates.get()) > 0
-            else "null_nitratos"
-        )
-        para_magnesium = (
-            self.combobox_magnesium.get()
-            if len(self.combobox_magnesium.get()) > 0
-            else "null_magnesio"
-        )
-        para_chlorides = (
-            self.combobox_chlorides.get()
-            if len(self.combobox_chlorides.get()) > 0
-            else "null_cloruros"
-        )
-        para_carbonate = (
-            self.combobox_carbonate.get()
-            if len(self.combobox_carbonate.get()) > 0
-            else "null_carbonato"
-        )
-        para_calcium = (
-            self.combobox_calcium.get()
-            if len(self.combobox_calcium.get()) > 0
-            else "null_calcio"
-        )
-        para_bicarbonate = (
-            self.combobox_bicarbonate.get()
-            if len(self.combobox_bicarbonate.get()) > 0
-            else "null_bicarbonato"
-        )
-        para_conductivity = (
+        selected_parameters = {}
+        for ion in self.ion_catalog:
+            parameter = self.ion_comboboxes[ion.key].get()
+            if len(parameter) > 0:
+                selected_parameters[ion.mg_label] = parameter
+            elif ion.required:
+                selected_parameters[ion.mg_label] = f"null_{ion.key}"
+        selected_parameters["Conductividad (µS/cm)"] = (
             self.combobox_conductivity.get()
             if len(self.combobox_conductivity.get()) > 0
             else "null_conductivity"
         )
-        keys_repetidos = self.find_duplicates(
-            [
-                para_sulfates,
-                para_sodium,
-                para_potassium,
-                para_nitrates,
-                para_magnesium,
-                para_chlorides,
-                para_carbonate,
-                para_calcium,
-                para_bicarbonate,
-                para_conductivity
-            ]
-        )
+        keys_repetidos = self.find_duplicates(list(selected_parameters.values()))
         if len(keys_repetidos) > 0:
             tk.messagebox.showerror(
                 "Error en parametros",
@@ -392,23 +525,43 @@ class HydrogeologyApp:
             )
             return None
         dict_rename = {
-            para_sulfates: "Sulfatos (mg/L)",
-            para_sodium: "Sodio (mg/L)",
-            para_potassium: "Potasio (mg/L)",
-            para_nitrates: "Nitratos (mg/L)",
-            para_magnesium: "Magnesio (mg/L)",
-            para_chlorides: "Cloruros (mg/L)",
-            para_carbonate: "Carbonato (mg/L)",
-            para_calcium: "Calcio (mg/L)",
-            para_bicarbonate: "Bicarbonato (mg/L)",
-            para_conductivity: "Conductividad (µS/cm)"
+            parameter: column_name
+            for column_name, parameter in selected_parameters.items()
         }
-        self.table_mannagement.df_data = calculate_meq_table(
+        self.dict_rename = dict_rename
+        self.job_runner.submit(
+            "Calculando la tabla meq/L",
+            self.calculate_table,
             self.data,
             dict_rename,
             self.combobox_parameter.get(),
             self.combobox_value.get(),
+            self.single_precision.get(),
+            on_done=self.table_calculated,
         )
+
+    def calculate_table(
+        self, job, data, dict_rename, column_parameter, column_value, float32
+    ):
+        """
+        Calculate the meq table. Executed by the job runner on a worker thread.
+        """
+        from hydrogeology_app.analitic_data import calculate_meq_table
+
+        return calculate_meq_table(
+            data,
+            dict_rename,
+            column_parameter,
+            column_value,
+            self.ion_catalog,
+            float32=float32,
+        )
+
+    def table_calculated(self, df_data):
+        """
+        Display the meq table calculated by `calculate_table`.
+        """
+        self.table_mannagement.df_data = df_data
         self.table_mannagement.generate_table()
 
     def find_duplicates(self, lst):
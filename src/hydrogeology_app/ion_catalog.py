@@ -0,0 +1,275 @@
+import json
+from typing import List, NamedTuple, Sequence, Text, Tuple
+
+
+class Ion(NamedTuple):
+    """
+    A major ion that can be converted from mg/L to meq/L.
+
+    Attributes:
+    -----------
+    key : str
+        A short identifier of the ion, also used for the placeholder of unselected parameters
+        (`null_<key>`).
+    name : str
+        The name of the ion used in the column names of the meq table, e.g. "Calcio".
+    molar_mass : float
+        The molar mass of the ion in g/mol.
+    charge : int
+        The charge of the ion: positive for cations and negative for anions. The sign is kept in the meq/L
+        values, so anion concentrations are negative.
+    label : str
+        The parameter label expected in the lab data, shown next to the combobox of the ion.
+    aliases : tuple
+        Other parameter labels that identify the ion in the lab data.
+    required : bool
+        Whether the ion is always part of the meq table (the nine major ions), or only when a parameter
+        is selected for it.
+    """
+
+    key: Text
+    name: Text
+    molar_mass: float
+    charge: int
+    label: Text
+    aliases: Tuple[Text, ...] = ()
+    required: bool = False
+
+    @property
+    def mg_label(self) -> Text:
+        return f"{self.name} (mg/L)"
+
+    @property
+    def meq_label(self) -> Text:
+        return f"{self.name} (meq/L)"
+
+    @property
+    def weight(self) -> float:
+        """
+        The factor converting mg/L into signed meq/L.
+        """
+        return self.charge / self.molar_mass
+
+    @property
+    def is_cation(self) -> bool:
+        return self.charge > 0
+
+
+ION_CATALOG: Tuple[Ion, ...] = (
+    Ion(
+        "sulfatos",
+        "Sulfatos",
+        96.06,
+        -2,
+        "Sulfatos (mg/L SO4-2)",
+        ("Sulfatos (mg/L)",),
+        True,
+    ),
+    Ion("sodio", "Sodio", 22.99, 1, "Sodio (mg/L)", ("Sodio (mg/L Na)",), True),
+    Ion("potasio", "Potasio", 39.1, 1, "Potasio (mg/L)", ("Potasio (mg/L K)",), True),
+    Ion(
+        "nitratos",
+        "Nitratos",
+        62,
+        -1,
+        "Nitratos (mg/L N-NO3)",
+        ("Nitratos (mg/L)",),
+        True,
+    ),
+    Ion(
+        "magnesio",
+        "Magnesio",
+        24.31,
+        2,
+        "Magnesio (mg/L)",
+        ("Magnesio (mg/L Mg)",),
+        True,
+    ),
+    Ion(
+        "cloruros",
+        "Cloruros",
+        35.45,
+        -1,
+        "Cloruros (mg/L Cl-)",
+        ("Cloruros (mg/L)",),
+        True,
+    ),
+    Ion(
+        "carbonato",
+        "Carbonato",
+        60.01,
+        -2,
+        "Carbonato (mg/L)",
+        ("Carbonatos (mg/L)",),
+        True,
+    ),
+    Ion("calcio", "Calcio", 40.08, 2, "Calcio (mg/L)", ("Calcio (mg/L Ca)",), True),
+    Ion(
+        "bicarbonato",
+        "Bicarbonato",
+        61.01,
+        -1,
+        "Bicarbonato (mg/L)",
+        ("Bicarbonatos (mg/L)",),
+        True,
+    ),
+    Ion(
+        "hierro",
+        "Hierro",
+        55.845,
+        2,
+        "Hierro (mg/L)",
+        ("Hierro total (mg/L)", "Fe (mg/L)"),
+    ),
+    Ion(
+        "manganeso",
+        "Manganeso",
+        54.938,
+        2,
+        "Manganeso (mg/L)",
+        ("Manganeso total (mg/L)", "Mn (mg/L)"),
+    ),
+    Ion(
+        "amonio",
+        "Amonio",
+        18.04,
+        1,
+        "Amonio (mg/L)",
+        ("Amonio (mg/L NH4)", "NH4 (mg/L)"),
+    ),
+    Ion(
+        "fluoruros",
+        "Fluoruros",
+        19.00,
+        -1,
+        "Fluoruros (mg/L)",
+        ("Fluoruro (mg/L)", "F (mg/L)"),
+    ),
+    Ion(
+        "bromuros",
+        "Bromuros",
+        79.904,
+        -1,
+        "Bromuros (mg/L)",
+        ("Bromuro (mg/L)", "Br (mg/L)"),
+    ),
+)
+
+
+REQUIRED_FIELDS = tuple(
+    field for field in Ion._fields if field not in Ion._field_defaults
+)
+
+
+def load_ion_catalog(path: Text) -> Tuple[Ion, ...]:
+    """
+    Read an ion catalog from a JSON file.
+
+    The file holds a list of objects with the fields of `Ion`, e.g.
+    `{"key": "litio", "name": "Litio", "molar_mass": 6.94, "charge": 1, "label": "Litio (mg/L)"}`.
+
+    Parameters:
+    -----------
+    path : str
+        The path to the JSON file.
+
+    Returns:
+    --------
+    tuple
+        The ions of the catalog, in file order.
+
+    Raises:
+    -------
+    ValueError
+        If an entry lacks a field or has an unknown one, if a molar mass is not a positive number or a
+        charge a non-zero integer, or if two entries share a key.
+    """
+    with open(path, encoding="utf-8") as catalog_file:
+        entries = json.load(catalog_file)
+    if not isinstance(entries, list):
+        raise ValueError(f"The ion catalog {path} is not a list of ions.")
+    ions = []
+    for position, entry in enumerate(entries, start=1):
+        if not isinstance(entry, dict):
+            raise ValueError(
+                f"Entry {position} of the ion catalog {path} is not an object."
+            )
+        missing = [field for field in REQUIRED_FIELDS if field not in entry]
+        unknown = [field for field in entry if field not in Ion._fields]
+        if missing or unknown:
+            raise ValueError(
+                f"Entry {position} of the ion catalog {path} lacks the fields {missing} "
+                f"or has unknown fields {unknown}."
+            )
+        ion = Ion(**{**entry, "aliases": tuple(entry.get("aliases", ()))})
+        if not _is_number(ion.molar_mass) or ion.molar_mass <= 0:
+            raise ValueError(
+                f"The molar mass of {ion.key!r} must be a positive number, not {ion.molar_mass!r}."
+            )
+        if (
+            not _is_number(ion.charge)
+            or ion.charge != int(ion.charge)
+            or ion.charge == 0
+        ):
+            raise ValueError(
+                f"The charge of {ion.key!r} must be a non-zero integer, not {ion.charge!r}."
+            )
+        ions.append(ion)
+    keys = [ion.key for ion in ions]
+    repeated = sorted({key for key in keys if keys.count(key) > 1})
+    if repeated:
+        raise ValueError(f"The ion catalog {path} repeats the keys {repeated}.")
+    return tuple(ions)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def selected_ions(
+    ion_catalog: Sequence[Ion], parameter_names: Sequence[Text]
+) -> List[Ion]:
+    """
+    Return the ions of the catalog that are part of a meq table.
+
+    Parameters:
+    -----------
+    ion_catalog : sequence
+        The ions of the catalog.
+    parameter_names : sequence
+        The mg/L column names present after renaming the parameters.
+
+    Returns:
+    --------
+    list
+        The required ions plus the optional ions whose mg/L column is present, in catalog order.
+    """
+    names = set(parameter_names)
+    return [ion for ion in ion_catalog if ion.required or ion.mg_label in names]
+
+
+def conversion_matrix(ions: Sequence[Ion]) -> "np.ndarray":
+    """
+    Build the matrix converting a block of mg/L concentrations into meq/L values and ionic totals.
+
+    Multiplying an (n_samples, n_ions) mg/L block by this (n_ions, n_ions + 2) matrix yields, in one
+    product, the meq/L value of every ion followed by the total cations and the total anions.
+
+    Parameters:
+    -----------
+    ions : sequence
+        The ions, in the order of the columns of the mg/L block.
+
+    Returns:
+    --------
+    np.ndarray
+        The conversion matrix.
+    """
+    # Imported here: the interface reads the catalog at start-up, before numpy is needed.
+    import numpy as np
+
+    weights = np.array([ion.weight for ion in ions], dtype=float)
+    cations = np.array([ion.is_cation for ion in ions], dtype=float)
+    return np.column_stack(
+        [np.diag(weights), weights * cations, weights * (1 - cations)]
+    )
@@ -0,0 +1,266 @@
+"""
+Background jobs of the interface.
+
+Reading a sheet, calculating the meq table and exporting figures can take minutes on large files. They run
+on a worker thread while the Tk mainloop keeps drawing the window. The worker never touches a widget: it
+reports its progress and result through a queue, which the mainloop drains every `JOB_POLL_MS`
+milliseconds, and the callbacks of the job are always called on the Tk thread.
+"""
+
+import queue
+import threading
+import time
+import tkinter as tk
+import tkinter.messagebox
+from tkinter import ttk
+
+JOB_POLL_MS = 100
+CANCELLING_TEXT = "Cancelando: esperando a que termine el paso en curso..."
+
+
+class JobCancelled(Exception):
+    """
+    Raised inside a job to stop it once the user has cancelled it.
+    """
+
+
+class Job:
+    """
+    The handle given to the function of a background job, to report progress and check for cancellation.
+
+    Attributes:
+    -----------
+    title : str
+        The description of the job shown in the progress window.
+    messages : queue.Queue
+        The progress updates and the outcome of the job, read by the Tk thread.
+    started : float
+        The `time.perf_counter` value when the job was created.
+    """
+
+    def __init__(self, title: str) -> None:
+        self.title = title
+        self.messages = queue.Queue()
+        self.started = time.perf_counter()
+        self._cancel_event = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        """
+        Whether the user asked to cancel the job.
+        """
+        return self._cancel_event.is_set()
+
+    @property
+    def elapsed(self) -> float:
+        """
+        The seconds since the job was created.
+        """
+        return time.perf_counter() - self.started
+
+    def cancel(self) -> None:
+        """
+        Ask the job to stop. The function stops at its next call to `check_cancelled`.
+        """
+        self._cancel_event.set()
+
+    def check_cancelled(self) -> None:
+        """
+        Raise JobCancelled if the job was cancelled; called by the function between units of work.
+        """
+        if self.cancelled:
+            raise JobCancelled()
+
+    def progress(self, done: int, total: int = None, text: str = None) -> None:
+        """
+        Report how much of the job is finished.
+
+        Parameters:
+        -----------
+        done : int
+            The units of work finished so far.
+        total : int, optional
+            The total units of work; when omitted the progress bar only shows activity.
+        text : str, optional
+            A description of the current step shown in the progress window.
+        """
+        self.messages.put(("progress", done, total, text))
+
+    def run(self, function, args) -> None:
+        """
+        Call the function of the job and queue its outcome. Executed on the worker thread.
+        """
+        try:
+            result = function(self, *args)
+        except JobCancelled:
+            self.messages.put(("cancelled",))
+        except Exception as error:
+            self.messages.put(("error", error))
+        else:
+            self.messages.put(("cancelled",) if self.cancelled else ("done", result))
+
+
+class JobRunner:
+    """
+    Runs one background job at a time and shows its progress, elapsed time and a cancel button.
+
+    While a job runs, its progress window grabs the input of the application, so the data being read or
+    calculated cannot be changed from the interface, but the window is still drawn and can be moved.
+
+    Attributes:
+    -----------
+    root : tk.Tk
+        The main window of the application.
+    job : Job
+        The running job, or None.
+    poll_ms : int
+        The interval in milliseconds at which the messages of the job are read.
+    """
+
+    def __init__(self, root, poll_ms: int = JOB_POLL_MS) -> None:
+        self.root = root
+        self.poll_ms = poll_ms
+        self.job = None
+        self.window = None
+        self.label_step = None
+        self.label_elapsed = None
+        self.progress = None
+        self.button_cancel = None
+
+    @property
+    def busy(self) -> bool:
+        """
+        Whether a job is running.
+        """
+        return self.job is not None
+
+    def submit(
+        self, title: str, function, *args, on_done=None, on_error=None, on_cancel=None
+    ):
+        """
+        Start a job on a worker thread.
+
+        Parameters:
+        -----------
+        title : str
+            The description of the job shown in the progress window.
+        function : callable
+            Called on the worker thread as `function(job, *args)`; it must not touch any widget.
+        on_done : callable, optional
+            Called on the Tk thread with the value returned by the function.
+        on_error : callable, optional
+            Called on the Tk thread with the exception raised by the function. By default the error is
+            shown in a message box.
+        on_cancel : callable, optional
+            Called on the Tk thread when the job was cancelled.
+
+        Returns:
+        --------
+        Job or None
+            The started job, or None if another job is still running.
+        """
+        if self.busy:
+            tk.messagebox.showinfo(
+                "Tarea en curso", f"Espere a que termine: {self.job.title}"
+            )
+            return None
+        job = Job(title)
+        self.job = job
+        self.open_window(title)
+        threading.Thread(target=job.run, args=(function, args), daemon=True).start()
+        self.root.after(self.poll_ms, self.poll, job, on_done, on_error, on_cancel)
+        return job
+
+    def open_window(self, title: str) -> None:
+        """
+        Open the progress window of a job.
+        """
+        self.window = tk.Toplevel(self.root)
+        self.window.title(title)
+        self.window.resizable(False, False)
+        self.window.transient(self.root)
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.label_step = tk.Label(self.window, text=title, padx=10, pady=5)
+        self.label_step.pack(fill=tk.X)
+        self.progress = ttk.Progressbar(self.window, length=300, mode="indeterminate")
+        self.progress.pack(padx=10)
+        self.progress.start()
+        self.label_elapsed = tk.Label(self.window, text="", padx=10, pady=5)
+        self.label_elapsed.pack(fill=tk.X)
+        self.button_cancel = tk.Button(
+            self.window, text="Cancelar", command=self.cancel
+        )
+        self.button_cancel.pack(pady=5)
+        self.window.grab_set()
+
+    def cancel(self) -> None:
+        """
+        Cancel the running job.
+
+        The job stops at its next call to `check_cancelled`; steps that cannot be interrupted, such as
+        reading a worksheet, finish first. Until the worker thread ends, the progress window stays open and
+        no other job can start. The result of the job is then discarded.
+        """
+        if self.job is None or self.job.cancelled:
+            return
+        self.job.cancel()
+        self.label_step.config(text=CANCELLING_TEXT)
+        self.button_cancel.config(state=tk.DISABLED)
+
+    def poll(self, job: Job, on_done, on_error, on_cancel) -> None:
+        """
+        Read the messages of a job, update its progress window and call its callbacks once it ends.
+        """
+        outcome = None
+        while outcome is None:
+            try:
+                message = job.messages.get_nowait()
+            except queue.Empty:
+                break
+            if message[0] != "progress":
+                outcome = message
+            elif not job.cancelled:
+                self.show_progress(*message[1:])
+        if outcome is None:
+            minutes, seconds = divmod(int(job.elapsed), 60)
+            self.label_elapsed.config(
+                text=f"Tiempo transcurrido: {minutes:02d}:{seconds:02d}"
+            )
+            self.root.after(self.poll_ms, self.poll, job, on_done, on_error, on_cancel)
+            return
+        # The worker thread has ended: only now may another job start.
+        self.close_window()
+        self.job = None
+        if job.cancelled:
+            outcome = ("cancelled",)
+        if outcome[0] == "done":
+            if on_done is not None:
+                on_done(outcome[1])
+        elif outcome[0] == "error":
+            if on_error is not None:
+                on_error(outcome[1])
+            else:
+                tk.messagebox.showerror("Error", f"Ocurrió un error: {outcome[1]}")
+        elif on_cancel is not None:
+            on_cancel()
+
+    def show_progress(self, done: int, total: int, text: str) -> None:
+        """
+        Show a progress update in the progress window.
+        """
+        if total:
+            if str(self.progress["mode"]) != "determinate":
+                self.progress.stop()
+                self.progress.config(mode="determinate")
+            self.progress.config(maximum=total, value=done)
+        if text:
+            self.label_step.config(text=text)
+
+    def close_window(self) -> None:
+        """
+        Close the progress window of the finished job.
+        """
+        self.progress.stop()
+        self.window.grab_release()
+        self.window.destroy()
+        self.window = None
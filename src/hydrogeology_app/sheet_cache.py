@@ -0,0 +1,359 @@
+import datetime
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Dict, List, NamedTuple, Optional, Text, Tuple
+
+import pandas as pd
+
+CACHE_DIR_ENV = "HYDROGEOGRAPH_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".hydrogeograph", "cache")
+DEFAULT_MAX_BYTES = 1024**3
+HASH_CHUNK_SIZE = 1024**2
+DATA_EXTENSION = ".parquet"
+TEMPORARY_EXTENSION = ".tmp"
+# Written by earlier versions of the cache, or left by interrupted writes; still counted and evicted, but
+# never loaded.
+STALE_EXTENSIONS = (".pkl", TEMPORARY_EXTENSION)
+MIXED_TYPES = ("mixed", "mixed-integer")
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    """
+    A parsed worksheet stored in the cache.
+
+    Attributes:
+    -----------
+    key : str
+        The cache key of the worksheet.
+    source : str
+        The path of the workbook the worksheet was read from.
+    sheet_name : str
+        The name of the worksheet.
+    size : int
+        The size of the cached file in bytes.
+    last_used : float
+        The time the entry was last written or read, as a POSIX timestamp.
+    """
+
+    key: Text
+    source: Text
+    sheet_name: Text
+    size: int
+    last_used: float
+
+
+class SheetCache:
+    """
+    An on-disk cache of parsed Excel worksheets stored in a columnar binary format.
+
+    Each worksheet is keyed by the absolute path, size, modification time and content hash of the
+    workbook plus the sheet name, so an edited workbook is never served from the cache. Worksheets are
+    written as Parquet; columns mixing numbers and text are stored as text (see `columnar_sheet`), and a
+    worksheet that Parquet cannot represent is not cached. The cache is capped at `max_bytes`; the least
+    recently used entries are evicted first.
+
+    Attributes:
+    -----------
+    directory : str
+        The folder holding the cached worksheets. Defaults to the `HYDROGEOGRAPH_CACHE_DIR` environment
+        variable, or `~/.hydrogeograph/cache`.
+    max_bytes : int
+        The maximum total size of the cache in bytes.
+    """
+
+    def __init__(self, directory: Text = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self._hashes: Dict[Tuple, Text] = {}
+
+    def read_excel(self, path: Text, sheet_name: Text) -> pd.DataFrame:
+        """
+        Read a worksheet, from the cache when possible and with `pd.read_excel` otherwise.
+
+        Parameters:
+        -----------
+        path : str
+            The path to the workbook.
+        sheet_name : str
+            The name of the worksheet.
+
+        Returns:
+        --------
+        pd.DataFrame
+            The worksheet as returned by `pd.read_excel`, with the columns mixing numbers and text
+            converted to text, whether it was read from the cache or not.
+        """
+        key = self.key(path, sheet_name)
+        data = self.load(key)
+        if data is None:
+            data = pd.read_excel(path, sheet_name=sheet_name)
+            columnar = columnar_sheet(data)
+            if columnar is not None:
+                self.store(key, columnar, path, sheet_name)
+                data = columnar
+        return data
+
+    def key(self, path: Text, sheet_name: Text) -> Text:
+        """
+        Compute the cache key of a worksheet.
+
+        Parameters:
+        -----------
+        path : str
+            The path to the workbook.
+        sheet_name : str
+            The name of the worksheet.
+
+        Returns:
+        --------
+        str
+            A hexadecimal digest of the path, size, modification time, content hash and sheet name.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        identity = (path, stat.st_size, stat.st_mtime_ns)
+        if identity not in self._hashes:
+            content_hash = hashlib.blake2b(digest_size=16)
+            with open(path, "rb") as workbook:
+                for chunk in iter(lambda: workbook.read(HASH_CHUNK_SIZE), b""):
+                    content_hash.update(chunk)
+            self._hashes[identity] = content_hash.hexdigest()
+        key = json.dumps([*identity, self._hashes[identity], sheet_name])
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+    def load(self, key: Text) -> Optional[pd.DataFrame]:
+        """
+        Load a cached worksheet and mark it as recently used.
+
+        Parameters:
+        -----------
+        key : str
+            The cache key of the worksheet.
+
+        Returns:
+        --------
+        pd.DataFrame or None
+            The cached worksheet, or None if it is not in the cache or cannot be read.
+        """
+        data_path = os.path.join(self.directory, key + DATA_EXTENSION)
+        if not os.path.exists(data_path):
+            return None
+        try:
+            data = pd.read_parquet(data_path)
+        except Exception as e:
+            logger.warning("Cache entry %s could not be read: %s", data_path, e)
+            self.remove(key)
+            return None
+        try:
+            os.utime(data_path)
+        except FileNotFoundError:
+            # Evicted meanwhile by another process sharing the cache.
+            pass
+        return data
+
+    def store(
+        self, key: Text, data: pd.DataFrame, source: Text, sheet_name: Text
+    ) -> bool:
+        """
+        Write a parsed worksheet to the cache as Parquet and evict old entries beyond `max_bytes`.
+
+        Parameters:
+        -----------
+        key : str
+            The cache key of the worksheet.
+        data : pd.DataFrame
+            The parsed worksheet.
+        source : str
+            The path of the workbook, recorded to inspect the cache.
+        sheet_name : str
+            The name of the worksheet, recorded to inspect the cache.
+
+        Returns:
+        --------
+        bool
+            Whether the worksheet was cached. It is not when Parquet cannot represent one of its columns or
+            the cache folder cannot be written (e.g. a full disk); the worksheet is then only read.
+        """
+        temporary_path = os.path.join(self.directory, key + TEMPORARY_EXTENSION)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            data.to_parquet(temporary_path, engine="pyarrow")
+            os.replace(
+                temporary_path, os.path.join(self.directory, key + DATA_EXTENSION)
+            )
+            with open(os.path.join(self.directory, f"{key}.json"), "w") as info_file:
+                json.dump(
+                    {"source": os.path.abspath(source), "sheet_name": sheet_name},
+                    info_file,
+                )
+        except (ImportError, ValueError, TypeError, NotImplementedError) as e:
+            logger.info("Sheet %s of %s is not cached: %s", sheet_name, source, e)
+        except OSError as e:
+            logger.warning(
+                "Sheet %s of %s could not be cached: %s", sheet_name, source, e
+            )
+        else:
+            for extension in STALE_EXTENSIONS:
+                self._remove_file(key + extension)
+            self.evict()
+            return True
+        self._remove_file(key + TEMPORARY_EXTENSION)
+        return False
+
+    def entries(self) -> List[CacheEntry]:
+        """
+        List the worksheets stored in the cache, the least recently used first.
+
+        Returns:
+        --------
+        list
+            The entries of the cache.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for file_name in os.listdir(self.directory):
+            key, extension = os.path.splitext(file_name)
+            if extension != DATA_EXTENSION and extension not in STALE_EXTENSIONS:
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, file_name))
+            except FileNotFoundError:
+                # Removed meanwhile by another process sharing the cache.
+                continue
+            try:
+                with open(os.path.join(self.directory, f"{key}.json")) as info_file:
+                    info = json.load(info_file)
+            except (OSError, ValueError):
+                info = {}
+            entries.append(
+                CacheEntry(
+                    key,
+                    info.get("source", ""),
+                    info.get("sheet_name", ""),
+                    stat.st_size,
+                    stat.st_mtime,
+                )
+            )
+        return sorted(entries, key=lambda entry: entry.last_used)
+
+    def total_size(self) -> int:
+        """
+        Return the total size of the cached worksheets in bytes.
+        """
+        return sum(entry.size for entry in self.entries())
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries until the cache fits in `max_bytes`.
+        """
+        entries = self.entries()
+        total = sum(entry.size for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            self.remove(entry.key)
+            total -= entry.size
+
+    def remove(self, key: Text) -> None:
+        """
+        Remove one entry from the cache.
+
+        Parameters:
+        -----------
+        key : str
+            The cache key of the worksheet.
+        """
+        for extension in (DATA_EXTENSION, *STALE_EXTENSIONS, ".json"):
+            self._remove_file(key + extension)
+
+    def _remove_file(self, file_name: Text) -> None:
+        try:
+            os.remove(os.path.join(self.directory, file_name))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+        """
+        for entry in self.entries():
+            self.remove(entry.key)
+
+
+def columnar_sheet(data: pd.DataFrame) -> Optional[pd.DataFrame]:
+    """
+    Prepare a worksheet to be stored as Parquet, which needs a single type per column.
+
+    Columns mixing numbers and text, such as values written as "<0.5" next to numbers or point codes
+    mixing numbers and names, become text columns; the later stages convert their numbers back as they
+    did with the values read from the workbook. Dates are not converted to text, as that would change how
+    they are parsed.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        The worksheet as returned by `pd.read_excel`.
+
+    Returns:
+    --------
+    pd.DataFrame or None
+        The worksheet with its mixed columns as text (`data` itself if there is none), or None if one of
+        them holds dates, in which case the worksheet is not cached.
+    """
+    mixed = [
+        column
+        for column in data.columns
+        if data[column].dtype == object
+        and pd.api.types.infer_dtype(data[column], skipna=True) in MIXED_TYPES
+    ]
+    if not mixed:
+        return data
+    data = data.copy()
+    for column in mixed:
+        values = data[column]
+        filled = values.notna()
+        if any(
+            isinstance(value, (datetime.date, datetime.time))
+            for value in values[filled]
+        ):
+            return None
+        data[column] = values.where(~filled, values[filled].astype(str))
+    return data
+
+
+def describe_cache(cache: SheetCache, limit: int = 10) -> Text:
+    """
+    Summarize the content of the cache for display.
+
+    Parameters:
+    -----------
+    cache : SheetCache
+        The cache to be described.
+    limit : int, optional
+        The maximum number of entries listed, the most recently used first.
+
+    Returns:
+    --------
+    str
+        A text with the location, size and most recent entries of the cache.
+    """
+    entries = cache.entries()
+    total = sum(entry.size for entry in entries)
+    lines = [
+        f"Ubicación: {cache.directory}",
+        f"Pestañas en caché: {len(entries)}",
+        f"Tamaño: {total / 1024 ** 2:.1f} MB de {cache.max_bytes / 1024 ** 2:.0f} MB",
+    ]
+    for entry in reversed(entries[-limit:]):
+        used = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.last_used))
+        lines.append(
+            f"- {os.path.basename(entry.source)} [{entry.sheet_name}] "
+            f"{entry.size / 1024 ** 2:.1f} MB, {used}"
+        )
+    return "\n".join(lines)
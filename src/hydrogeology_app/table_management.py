@@ -1,14 +1,186 @@
 import tkinter as tk
+import tkinter.filedialog
+import tkinter.messagebox
 from tkinter import ttk
 import os
+from concurrent.futures import FIRST_COMPLETED, wait
+import numpy as np
 import pandas as pd
+from hydrogeology_app.analitic_data import MISSING_LABEL
 from hydrogeology_app.calculadora import HydrogeologyCalculator
-from hydrogeology_app.funciones_figuras import (
-    mifflin_graphic,
-    gibbs_graphic,
-    piper_graphic,
-    stiff_graphic,
-)
+from hydrogeology_app.instrumentation import call_traced, enabled, merge, stage, traced
+from hydrogeology_app.value_index import UniqueValueIndex
+
+VIRTUAL_TABLE_THRESHOLD = 5000
+VIRTUAL_TABLE_BUFFER = 100
+# Bits of the Tk event state set while Shift or Control is held down.
+ADDITIVE_SELECTION_STATE = 0x0001 | 0x0004
+EXPORT_POLL_MS = 100
+COLUMN_WIDTH_SAMPLE = 200
+# Dates are shown as they are written in the sheets (see `validation.DATE_FORMAT`).
+DISPLAY_DATE_FORMAT = "%d/%m/%Y"
+
+
+def sample_positions(length, size=COLUMN_WIDTH_SAMPLE):
+    """
+    Select a bounded set of row positions: the head and tail of the table plus evenly seeded random rows.
+
+    Parameters:
+    -----------
+    length : int
+        The number of rows of the table.
+    size : int, optional
+        The maximum number of positions returned.
+
+    Returns:
+    --------
+    np.ndarray
+        The sorted, unique row positions of the sample.
+    """
+    if length <= size:
+        return np.arange(length)
+    edge = size // 4
+    random_positions = np.random.default_rng(length).integers(
+        edge, length - edge, size - 2 * edge
+    )
+    return np.unique(
+        np.concatenate(
+            [np.arange(edge), random_positions, np.arange(length - edge, length)]
+        )
+    )
+
+
+def estimate_column_width(series, column):
+    """
+    Estimate the display width of a column from a bounded sample of its values.
+
+    Text columns are measured on the rows returned by `sample_positions`; numeric columns also include the
+    length of their minimum and maximum, which are computed without converting the column to text.
+
+    Parameters:
+    -----------
+    series : pd.Series
+        The values of the column.
+    column : str
+        The name of the column, shown in its heading.
+
+    Returns:
+    --------
+    int
+        The width of the column in pixels.
+    """
+    sample = series.iloc[sample_positions(len(series))]
+    if pd.api.types.is_datetime64_any_dtype(sample):
+        sample = format_dates(sample)
+    longest = sample.astype(str).str.len().max() if len(sample) > 0 else 0
+    if (
+        len(series) > 0
+        and pd.api.types.is_numeric_dtype(series)
+        and not pd.api.types.is_bool_dtype(series)
+    ):
+        longest = max(longest, len(str(series.max())), len(str(series.min())))
+    return max([longest * 10 + 10, len(column) * 10 + 10])
+
+
+def format_dates(series):
+    """
+    Format a datetime column as displayed in the table, with `MISSING_LABEL` for missing dates.
+    """
+    return series.dt.strftime(DISPLAY_DATE_FORMAT).fillna(MISSING_LABEL)
+
+
+def format_rows(data):
+    """
+    Convert rows of `data_tree` into the values displayed by the Treeview.
+
+    Dates stay datetime64 in `data_tree` and are only formatted here, for the rows being displayed.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        The rows to be displayed.
+
+    Returns:
+    --------
+    list
+        One list of values per row, starting with the index label shown in the "ID" column.
+    """
+    dates = {
+        column: format_dates(data[column])
+        for column in data.columns
+        if pd.api.types.is_datetime64_any_dtype(data[column])
+    }
+    if dates:
+        data = data.assign(**dates)
+    return data.to_records().tolist()
+
+
+def column_fingerprint(series):
+    """
+    Summarize a column cheaply, so cached widths are only recalculated for columns whose data changed.
+
+    Parameters:
+    -----------
+    series : pd.Series
+        The values of the column.
+
+    Returns:
+    --------
+    tuple
+        The length, dtype and a hash of the sampled values of the column.
+    """
+    sample = series.iloc[sample_positions(len(series))]
+    sample_hash = int(pd.util.hash_pandas_object(sample, index=False).sum())
+    return len(series), str(series.dtype), sample_hash
+
+
+class RowIdentityMap:
+    """
+    A two-way mapping between the index labels of `data_tree` and the item ids of the Treeview.
+
+    Both directions are dictionaries, so translating a row in either direction costs O(1) and selecting
+    or deleting k rows costs O(k) regardless of the size of the table.
+    """
+
+    def __init__(self) -> None:
+        self.item_by_label = {}
+        self.label_by_item = {}
+
+    def clear(self) -> None:
+        """
+        Forget every row, e.g. before the Treeview is filled again.
+        """
+        self.item_by_label.clear()
+        self.label_by_item.clear()
+
+    def bind(self, label, item) -> None:
+        """
+        Register that the row with index label `label` is displayed by the Treeview item `item`.
+        """
+        self.item_by_label[label] = item
+        self.label_by_item[item] = label
+
+    def items(self, labels) -> list:
+        """
+        Return the Treeview item ids of the given index labels, skipping rows that are not displayed.
+        """
+        return [
+            self.item_by_label[label] for label in labels if label in self.item_by_label
+        ]
+
+    def labels(self, items) -> list:
+        """
+        Return the index labels of the given Treeview item ids.
+        """
+        return [self.label_by_item[item] for item in items]
+
+    def remove_items(self, items) -> None:
+        """
+        Forget the rows displayed by the given Treeview item ids.
+        """
+        for item in items:
+            label = self.label_by_item.pop(item)
+            del self.item_by_label[label]
 
 
 class TableManagement:
@@ -25,13 +197,28 @@ class TableManagement:
     frame_table : Frame
         The frame that contains the table widget.
     data_tree : pd.DataFrame
-        A copy of the data used for manipulation and filtering within the table.
+        The rows of `df_data` shown in the table; removing rows replaces it with a new frame.
     treeview : Treeview
         The Treeview widget used to display the table data.
     combobox_group : Combobox
         A Combobox widget used for selecting the column to group the data by.
     combobox_color : Combobox
         A Combobox widget used for selecting the column to color the data by.
+    unique_index : UniqueValueIndex
+        The cached unique values of the columns of `data_tree`, used by the calculator's field browser.
+    row_map : RowIdentityMap
+        The mapping between the index labels of `data_tree` and the item ids of `treeview`.
+    virtual_threshold : int
+        The number of rows above which the table is displayed in virtual mode.
+    virtual_mode : bool
+        Whether the Treeview only holds the rows around the viewport instead of every row of `data_tree`.
+    selected_labels : set
+        In virtual mode, the index labels of the selected rows, including those that are not materialized.
+    additive_selection : bool or None
+        In virtual mode, whether the click or key press being handled extends the selection (Shift or
+        Control held down) or replaces it; None when the selection is changed by the application.
+    column_widths : dict
+        The width of each column displayed so far, with the fingerprint of the data it was estimated on.
     """
 
     def __init__(self, app_hydrogeology, df_data) -> None:
@@ -52,7 +239,22 @@ class TableManagement:
         self.treeview = None
         self.combobox_group = None
         self.combobox_color = None
+        self.unique_index = UniqueValueIndex()
+        self.row_map = RowIdentityMap()
+        self.virtual_threshold = VIRTUAL_TABLE_THRESHOLD
+        self.virtual_mode = False
+        self.selected_labels = set()
+        self.additive_selection = None
+        self.vertical_scroll = None
+        self.offset = 0
+        self.window_start = 0
+        self.window_end = 0
+        self.column_widths = {}
+        self.figure_executor = None
+        self.stiff_atlas = None
+        self.excel_control_sheets = None
 
+    @traced()
     def generate_table(self):
         """
         Generate and display the table of data, including controls for filtering, deleting, and exporting data.
@@ -94,23 +296,32 @@ class TableManagement:
         canvas.create_window((0, 0), window=frame_treeview, anchor="nw")
         self.treeview = ttk.Treeview(frame_treeview)
         self.treeview.pack()
-        data_copy = self.df_data.copy()
-        self.data_tree = self.df_data.copy()
-        self.treeview["columns"] = tuple(["ID"] + data_copy.columns.to_list())
+        # `data_tree` shares the data of `df_data`; removing rows builds a new frame instead of
+        # modifying it in place.
+        self.data_tree = self.df_data
+        self.unique_index.invalidate()
+        self.virtual_mode = len(self.data_tree) > self.virtual_threshold
+        if self.virtual_mode:
+            self.vertical_scroll = tk.Scrollbar(
+                self.frame_table, orient="vertical", command=self.scroll_command
+            )
+            self.vertical_scroll.grid(row=0, column=1, sticky="ns")
+            self.treeview.config(yscrollcommand=self.treeview_scrolled)
+            self.treeview.bind("<<TreeviewSelect>>", self.sync_selection)
+            for sequence in ("<ButtonPress-1>", "<KeyPress>"):
+                self.treeview.bind(sequence, self.selection_started, add="+")
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.treeview.bind(sequence, self.scroll_wheel)
+        self.treeview["columns"] = tuple(["ID"] + self.data_tree.columns.to_list())
         self.treeview.column("#0", width=0, stretch=tk.NO)
         self.treeview.heading("#0", text="")
-        if len(data_copy) > 0:
+        if len(self.data_tree) > 0:
             self.treeview.column("ID", width=50, anchor=tk.CENTER)
             self.treeview.heading("ID", text="ID")
         else:
             self.treeview.column("ID", width=1200, anchor=tk.CENTER)
-        for column in data_copy.columns.to_list():
-            length = max(
-                [
-                    data_copy[column].astype(str).str.len().max() * 10 + 10,
-                    len(column) * 10 + 10,
-                ]
-            )
+        for column in self.data_tree.columns.to_list():
+            length = self.column_width(column)
             self.treeview.column(column, width=length, anchor=tk.CENTER)
             self.treeview.heading(column, text=column)
         self.insert_data()
@@ -135,41 +346,33 @@ class TableManagement:
             command=self.export_figures,
         )
         button_figures.grid(row=0, column=0, sticky="w")
-        button_export_excel = tk.Button(
+        self.stiff_atlas = tk.BooleanVar(value=False)
+        check_atlas = tk.Checkbutton(
+            frame_buttons, text="Stiff en atlas PDF", variable=self.stiff_atlas
+        )
+        check_atlas.grid(row=1, column=0, sticky="w")
+        button_export_table = tk.Button(
+            frame_buttons,
+            text="Exportar tabla",
+            command=self.export_table,
+        )
+        button_export_table.grid(row=0, column=3, sticky="w")
+        self.excel_control_sheets = tk.BooleanVar(value=False)
+        check_control_sheets = tk.Checkbutton(
             frame_buttons,
-            text="Exportar Excel",
-            command=self.export_excel,
+            text="Hojas de control en Excel",
+            variable=self.excel_control_sheets,
         )
-        button_export_excel.grid(row=0, column=3, sticky="w")
+        check_control_sheets.grid(row=1, column=3, sticky="w")
         self.app_hydrogeology.ajustar_xpadx(frame_buttons, 5)
         self.app_hydrogeology.ajustar_xpadx(export_frame, 5)
         self.app_hydrogeology.canvas_frame.create_window(
             (1000, 390), window=frame_buttons, anchor="nw"
         )
         group_columns = self.df_data.columns.to_list()
-        data_column = [
-            "Error %",
-            "Total Aniones (meq/L)",
-            "Total Cationes (meq/L)",
-            "Nitratos (meq/L)",
-            "Bicarbonato (meq/L)",
-            "Carbonato (meq/L)",
-            "Sulfatos (meq/L)",
-            "Cloruros (meq/L)",
-            "Potasio (meq/L)",
-            "Sodio (meq/L)",
-            "Magnesio (meq/L)",
-            "Calcio (meq/L)",
-            "Sulfatos (mg/L)",
-            "Sodio (mg/L)",
-            "Potasio (mg/L)",
-            "Nitratos (mg/L)",
-            "Magnesio (mg/L)",
-            "Cloruros (mg/L)",
-            "Carbonato (mg/L)",
-            "Calcio (mg/L)",
-            "Bicarbonato (mg/L)",
-        ]
+        data_column = ["Error %", "Total Aniones (meq/L)", "Total Cationes (meq/L)"]
+        for ion in self.app_hydrogeology.ion_catalog:
+            data_column += [ion.meq_label, ion.mg_label]
         grouped_columns = list(set(group_columns).difference(set(data_column)))
         self.app_hydrogeology.populate_combo_frame(export_frame, grouped_columns)
         self.app_hydrogeology.canvas_frame.create_window(
@@ -179,96 +382,425 @@ class TableManagement:
             (10, 425), window=self.frame_table, anchor="nw"
         )
 
+    def column_width(self, column):
+        """
+        Return the display width of a column of `data_tree`, reusing the cached width if its data is unchanged.
+
+        Parameters:
+        -----------
+        column : str
+            The name of the column.
+
+        Returns:
+        --------
+        int
+            The width of the column in pixels.
+        """
+        series = self.data_tree[column]
+        fingerprint = column_fingerprint(series)
+        cached = self.column_widths.get(column)
+        if cached is None or cached[0] != fingerprint:
+            cached = (fingerprint, estimate_column_width(series, column))
+            self.column_widths[column] = cached
+        return cached[1]
+
     def insert_data(self):
         """
-        Insert data into the Treeview widget from the provided DataFrame.
+        Insert data into the Treeview widget from `data_tree`.
+
+        Below `virtual_threshold` rows every record is inserted. Above it the table is displayed in virtual
+        mode: only the rows of the viewport plus a buffer of `VIRTUAL_TABLE_BUFFER` rows on each side are
+        materialized, and they are fetched again from `data_tree` as the user scrolls.
+        """
+        self.row_map.clear()
+        self.selected_labels = set()
+        self.offset = 0
+        self.window_start = 0
+        self.window_end = 0
+        with stage("insert_data", virtual=self.virtual_mode) as current:
+            if self.virtual_mode:
+                self.scroll_to(0)
+            elif len(self.data_tree) > 0:
+                rows = format_rows(self.data_tree)
+                for label, dato in zip(self.data_tree.index, rows):
+                    self.row_map.bind(
+                        label, self.treeview.insert("", tk.END, values=dato)
+                    )
+            current.rows = len(self.row_map.item_by_label)
+
+    def scroll_to(self, offset, refresh=False):
+        """
+        Show the rows of `data_tree` starting at a given position in virtual mode.
+
+        When the requested viewport lies inside the materialized window the Treeview is only scrolled;
+        otherwise a new window around the viewport is fetched from `data_tree`.
 
         Parameters:
         -----------
-        data_copy : pd.DataFrame
-            The DataFrame containing the data to be inserted into the Treeview for display.
+        offset : int
+            The position of the first row to be shown.
+        refresh : bool, optional
+            Whether the window has to be materialized again even if it covers the viewport, e.g. after
+            rows were removed from `data_tree`.
         """
-        if len(self.df_data) > 0:
-            self.df_data.index = [str(indice) for indice in self.df_data.index.tolist()]
-            self.df_data[self.app_hydrogeology.combobox_date.get()] = pd.to_datetime(
-                self.df_data[self.app_hydrogeology.combobox_date.get()]
-            ).dt.strftime("%Y-%m-%d")
-            for dato in self.df_data.to_records().tolist():
-                self.treeview.insert("", tk.END, values=dato)
+        total = len(self.data_tree)
+        height = int(self.treeview["height"])
+        self.offset = max(0, min(offset, total - height))
+        if (
+            refresh
+            or self.offset < self.window_start
+            or min(self.offset + height, total) > self.window_end
+        ):
+            self.window_start = max(0, self.offset - VIRTUAL_TABLE_BUFFER)
+            self.window_end = min(total, self.offset + height + VIRTUAL_TABLE_BUFFER)
+            focus = self.row_map.label_by_item.get(self.treeview.focus())
+            self.treeview.delete(*self.treeview.get_children())
+            self.row_map.clear()
+            window = self.data_tree.iloc[self.window_start : self.window_end]
+            for label, dato in zip(window.index, format_rows(window)):
+                self.row_map.bind(label, self.treeview.insert("", tk.END, values=dato))
+            self.treeview.selection_set(
+                self.row_map.items(
+                    [label for label in window.index if label in self.selected_labels]
+                )
+            )
+            # Keep the keyboard focus on the same row, so the arrow keys keep moving from it.
+            if focus in self.row_map.item_by_label:
+                self.treeview.focus(self.row_map.item_by_label[focus])
+        window_length = max(1, self.window_end - self.window_start)
+        self.treeview.yview_moveto((self.offset - self.window_start) / window_length)
+        self.update_scrollbar()
+
+    def update_scrollbar(self):
+        """
+        Show the position of the viewport within the whole of `data_tree` in the vertical scrollbar.
+        """
+        total = max(1, len(self.data_tree))
+        height = int(self.treeview["height"])
+        self.vertical_scroll.set(
+            self.offset / total, min(1.0, (self.offset + height) / total)
+        )
+
+    def scroll_command(self, *args):
+        """
+        Scroll the virtual table from the vertical scrollbar.
+
+        Used as the command of the vertical scrollbar, which passes either ("moveto", fraction) or
+        ("scroll", number, "units" | "pages").
+        """
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * len(self.data_tree)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= int(self.treeview["height"])
+            self.scroll_to(self.offset + step)
+
+    def scroll_wheel(self, event):
+        """
+        Scroll the virtual table with the mouse wheel.
+        """
+        step = -3 if event.num == 4 or event.delta > 0 else 3
+        self.scroll_to(self.offset + step)
+        return "break"
+
+    def treeview_scrolled(self, first, last):
+        """
+        Follow scrolls made inside the materialized window, e.g. with the keyboard.
+
+        Used as the yscrollcommand of the Treeview in virtual mode. When the viewport reaches the edge of
+        the window, a new window around the viewport is fetched.
+        """
+        window_length = self.window_end - self.window_start
+        if window_length == 0:
+            return
+        self.offset = self.window_start + round(float(first) * window_length)
+        self.update_scrollbar()
+        at_start = float(first) <= 0.0 and self.window_start > 0
+        at_end = float(last) >= 1.0 and self.window_end < len(self.data_tree)
+        if at_start or at_end:
+            # The viewport still lies inside the window, so the refetch has to be forced.
+            self.treeview.after_idle(self.scroll_to, self.offset, True)
+
+    def selection_started(self, event):
+        """
+        Record whether a click or key press in the virtual table extends the selection or replaces it.
+
+        Bound to the button and key presses of the Treeview in virtual mode; the selection they make is
+        then recorded by `sync_selection`.
+        """
+        self.additive_selection = bool(event.state & ADDITIVE_SELECTION_STATE)
+        self.treeview.after_idle(self.selection_finished)
+
+    def selection_finished(self):
+        self.additive_selection = None
+
+    def sync_selection(self, _):
+        """
+        Record the selection of the materialized rows in `selected_labels`.
+
+        A click or key press without Shift or Control replaces the selection, including the rows selected
+        outside the window; otherwise the selection of the window is merged into `selected_labels`.
+
+        Triggered by the <<TreeviewSelect>> event in virtual mode.
+        """
+        selected = set(self.row_map.labels(self.treeview.selection()))
+        if self.additive_selection is False:
+            self.selected_labels = selected
+            return
+        window_labels = set(self.row_map.item_by_label)
+        self.selected_labels.difference_update(window_labels - selected)
+        self.selected_labels.update(selected)
 
     def remove_selected(self):
         """
         Remove the selected rows from the Treeview widget and the underlying data.
 
         This method deletes the currently selected rows in the Treeview and updates the internal DataFrame to
-        reflect the deletions.
+        reflect the deletions. The rows are translated through `row_map` and removed from both in one batch;
+        in virtual mode every row in `selected_labels` is dropped and the visible window is fetched again.
+        Selected rows outside the window are only dropped once the user confirms it.
         """
-        selected = self.treeview.selection()
-        for item in selected:
-            row_id = self.treeview.item(item)["values"][0]
-            self.data_tree.drop(index=row_id, inplace=True)
-            self.treeview.delete(item)
+        if self.virtual_mode:
+            if len(self.selected_labels) == 0:
+                return
+            hidden = len(self.selected_labels.difference(self.row_map.item_by_label))
+            if hidden > 0 and not tk.messagebox.askyesno(
+                "Eliminar Seleccionados",
+                f"La selección incluye {hidden:,} filas que no están a la vista. "
+                f"¿Eliminar las {len(self.selected_labels):,} filas seleccionadas?",
+            ):
+                return
+            self.data_tree = self.data_tree.drop(index=list(self.selected_labels))
+            self.selected_labels.clear()
+            self.scroll_to(self.offset, refresh=True)
+        else:
+            selected = self.treeview.selection()
+            if len(selected) == 0:
+                return
+            self.data_tree = self.data_tree.drop(index=self.row_map.labels(selected))
+            self.treeview.delete(*selected)
+            self.row_map.remove_items(selected)
+        self.unique_index.invalidate()
 
-    def export_excel(self):
+    def select_positions(self, positions):
         """
-        Export the current data in the table to an Excel file.
+        Replace the selection of the Treeview with the rows at the given positions of `data_tree`.
+
+        In virtual mode the selection is recorded in `selected_labels` and the table is scrolled to the
+        first selected row.
 
-        This method prompts the user to select a save location and filename, and then exports the data
-        displayed in the Treeview to an Excel file at the specified location.
+        Parameters:
+        -----------
+        positions : list
+            The zero-based positions of the rows in `data_tree`, as returned by the calculator.
+        """
+        labels = self.data_tree.index[positions]
+        if self.virtual_mode:
+            self.selected_labels = set(labels)
+            offset = positions[0] if len(positions) > 0 else self.offset
+            self.scroll_to(offset, refresh=True)
+        else:
+            self.treeview.selection_set(self.row_map.items(labels))
+
+    def export_table(self):
+        """
+        Export the current data in the table to an Excel, CSV or Parquet file.
+
+        This method prompts the user to select a save location and filename, and then starts a background
+        job that writes the data of the table in the format given by the extension of the file:
+        - ".xlsx": streamed into the workbook a chunk of rows at a time. When "Hojas de control en Excel"
+          is checked, the charge-balance, group summary and mapping sheets are added.
+        - ".csv", or ".csv.gz" to compress it: written a chunk of rows at a time.
+        - ".parquet": a columnar file keeping the type of every column, read back without parsing.
         """
         file_location = tk.filedialog.asksaveasfilename(
-            defaultextension=".xlsx", filetypes=[("Archivos de Excel", "*.xlsx")]
+            defaultextension=".xlsx",
+            filetypes=[
+                ("Archivos de Excel", "*.xlsx"),
+                ("CSV", "*.csv"),
+                ("CSV comprimido", "*.csv.gz"),
+                ("Parquet", "*.parquet"),
+            ],
         )
         if file_location:
-            self.data_tree.to_excel(file_location, index=False)
+            control_sheets = self.excel_control_sheets.get()
+            group_column = self.combobox_group.get() or None
+            self.app_hydrogeology.job_runner.submit(
+                "Exportando la tabla",
+                self.write_table,
+                self.data_tree,
+                file_location,
+                control_sheets,
+                group_column,
+                self.export_mapping() if control_sheets else None,
+                on_done=self.table_exported,
+            )
+
+    def write_table(self, job, df, path, control_sheets, group_column, mapping):
+        """
+        Write the table to the file chosen in `export_table`. Executed by the job runner on a worker thread.
+        """
+        from hydrogeology_app.exporters import write_csv, write_excel, write_parquet
+
+        def progress(done, total):
+            job.check_cancelled()
+            job.progress(done, total, f"{done:,} de {total:,} filas")
+
+        extension = path.lower()
+        if extension.endswith(".parquet"):
+            write_parquet(df, path)
+        elif extension.endswith((".csv", ".csv.gz", ".csv.bz2", ".csv.xz")):
+            write_csv(df, path, progress=progress)
+        else:
+            write_excel(
+                df,
+                path,
+                charge_balance=control_sheets,
+                group_column=group_column,
+                mapping=mapping,
+                progress=progress,
+            )
+        return path
+
+    def table_exported(self, path):
+        tk.messagebox.showinfo("Finalización", f"Tabla exportada en {path}")
+
+    def export_mapping(self):
+        """
+        Describe the columns and parameters used to build the table, for the sheet "Mapeo" of the export.
+        """
+        from hydrogeology_app.exporters import describe_mapping
+
+        app = self.app_hydrogeology
+        columns = {
+            "Columna de puntos": app.combobox_point.get(),
+            "Columna de fechas": app.combobox_date.get(),
+            "Columna de parámetros": app.combobox_parameter.get(),
+            "Columna de valores": app.combobox_value.get(),
+            "Columna de agrupación": self.combobox_group.get(),
+            "Columna de color": self.combobox_color.get(),
+        }
+        return describe_mapping(columns, app.dict_rename or {})
 
     def export_figures(self):
         """
         Generate and export hydrogeological figures (Mifflin, Gibbs, Piper, Stiff) based on the current data.
 
-        This method prompts the user to select a directory for saving the generated figures, then creates and
-        saves the Mifflin, Gibbs, Piper, and Stiff diagrams using the data in the table. The figures are saved
-        as image files in the selected directory.
+        This method prompts the user to select a directory for saving the generated figures, then starts a
+        background job that sends the Mifflin, Gibbs, Piper and Stiff diagrams of the data in the table to a
+        pool of worker processes that render them off-screen. Each image is written as soon as its figure is
+        ready, while the progress window of the job keeps the interface responsive and lets the export be
+        cancelled. When "Stiff en atlas PDF" is checked, the Stiff diagrams are written into a single
+        multi-page PDF instead of one image per point.
         """
         folder_path = tk.filedialog.askdirectory()
         if folder_path:
-            try:
-                colgrup = self.combobox_group.get()
-                colgrup = colgrup if colgrup != "" else None
-                colcolor = self.combobox_color.get()
-                colcolor = colcolor if colcolor != "" else None
-                col_date = self.app_hydrogeology.combobox_date.get()
-                figure_data = self.data_tree.copy()
-                figure_data[col_date] = pd.to_datetime(figure_data[col_date])
-                figure_mifflin = mifflin_graphic(
-                    self.data_tree, col_style=colgrup, col_color=colcolor
-                )
-                figure_gibbs = gibbs_graphic(
-                    self.data_tree, col_style=colgrup, col_color=colcolor
-                )
-                figure_pipper = piper_graphic(
-                    self.data_tree, col_style=colgrup, col_color=colcolor
-                )
-                figure_mifflin.savefig(
-                    os.path.join(folder_path, "fig_mifflin.jpg"), dpi=400
-                )
-                figure_gibbs.savefig(
-                    os.path.join(folder_path, "fig_gibbs.jpg"), dpi=400
-                )
-                figure_pipper.savefig(
-                    os.path.join(folder_path, "fig_pipper.jpg"), dpi=400
-                )
-                figures_stiff = stiff_graphic(
-                    figure_data, self.app_hydrogeology.combobox_point.get(), col_date
-                )
-                for punto, fig in figures_stiff.items():
-                    fig.savefig(os.path.join(folder_path, f"fig_stiff{punto}.jpg"))
-                tk.messagebox.showinfo(
-                    "Finalización", "La generación de figures termino con exito"
+            colgrup = self.combobox_group.get()
+            colgrup = colgrup if colgrup != "" else None
+            colcolor = self.combobox_color.get()
+            colcolor = colcolor if colcolor != "" else None
+            self.app_hydrogeology.job_runner.submit(
+                "Exportando figuras",
+                self.render_figures,
+                self.data_tree,
+                folder_path,
+                self.app_hydrogeology.combobox_point.get(),
+                self.app_hydrogeology.combobox_date.get(),
+                colgrup,
+                colcolor,
+                self.stiff_atlas.get(),
+                on_done=self.figures_exported,
+            )
+
+    def render_figures(
+        self, job, df, folder_path, col_point, col_date, col_style, col_color, atlas
+    ):
+        """
+        Render the figures of an export in the pool of worker processes, reporting each finished figure.
+
+        Executed by the job runner on a worker thread. When the job is cancelled, the figures that have not
+        started yet are cancelled.
+
+        Returns:
+        --------
+        tuple
+            The warnings of the rendered figures and the messages of the figures that failed.
+        """
+        # The plotting stack is only loaded when figures are exported.
+        from hydrogeology_app.funciones_figuras import (
+            STIFF_ATLAS_GRID,
+            figure_executor,
+            figure_jobs,
+            render_figure,
+        )
+
+        with stage("export_figures", rows=len(df)):
+            jobs = figure_jobs(
+                df,
+                folder_path,
+                col_point,
+                col_date,
+                col_style=col_style,
+                col_color=col_color,
+                stiff_atlas=STIFF_ATLAS_GRID if atlas else None,
+            )
+            job.progress(0, len(jobs), f"0 de {len(jobs)} figuras")
+            if self.figure_executor is None:
+                self.figure_executor = figure_executor()
+            futures = [
+                self.figure_executor.submit(
+                    call_traced, enabled(), render_figure, *args
                 )
-            except Exception as e:
-                # Muestra una ventana de mensaje de error con el mensaje de la excepción
-                tk.messagebox.showerror("Error", f"Ocurrió un error: {str(e)}")
+                for args in jobs
+            ]
+            pending = set(futures)
+            try:
+                while pending:
+                    _, pending = wait(
+                        pending,
+                        timeout=EXPORT_POLL_MS / 1000,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    job.check_cancelled()
+                    finished = len(futures) - len(pending)
+                    job.progress(
+                        finished, len(futures), f"{finished} de {len(futures)} figuras"
+                    )
+            finally:
+                for future in pending:
+                    future.cancel()
+        errors = []
+        warnings = []
+        for future in futures:
+            if future.exception() is not None:
+                errors.append(str(future.exception()))
+            else:
+                (_, figure_warnings), events = future.result()
+                warnings += figure_warnings
+                merge(events)
+        return warnings, errors
+
+    def figures_exported(self, result):
+        """
+        Report the result of an export once every figure is finished.
+
+        Parameters:
+        -----------
+        result : tuple
+            The warnings and errors returned by `render_figures`.
+        """
+        warnings, errors = result
+        if warnings:
+            tk.messagebox.showinfo("Alert Message", "\n".join(warnings))
+        if errors:
+            tk.messagebox.showerror(
+                "Error", f"Ocurrió un error en {len(errors)} figuras: {errors[0]}"
+            )
+        else:
+            tk.messagebox.showinfo(
+                "Finalización", "La generación de figures termino con exito"
+            )
 
     def create_calculator(self):
         """
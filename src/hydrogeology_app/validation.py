@@ -0,0 +1,154 @@
+"""
+Validation of the date and value columns of a lab table.
+
+Each column is converted once: the distinct entries are parsed (the categories of a categorical column, or
+the values found by `pd.factorize`) and the result is broadcast to the rows through their codes, so a date
+repeated in thousands of rows is parsed once. The converted columns replace the raw ones in the table, and
+every row that cannot be converted is reported with its reason instead of stopping at the first one.
+"""
+
+from typing import Callable, Text, Tuple
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%d/%m/%Y"
+ISSUE_COLUMNS = ["Fila", "Columna", "Valor", "Motivo"]
+FIRST_DATA_ROW = 2
+
+
+def parse_dates(
+    series: pd.Series, date_format: Text = DATE_FORMAT
+) -> Tuple[pd.Series, np.ndarray]:
+    """
+    Convert a column to datetime64.
+
+    Parameters:
+    -----------
+    series : pd.Series
+        The column, as read from the sheet: dates, text in `date_format` or a categorical of either.
+    date_format : str, optional
+        The format of the dates written as text.
+
+    Returns:
+    --------
+    tuple
+        The converted column, with NaT where the date is missing or invalid, and a boolean array marking
+        the rows holding a value that is not a date in `date_format`.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series, np.zeros(len(series), dtype=bool)
+    return _convert_distinct(
+        series,
+        lambda values: pd.to_datetime(values, format=date_format, errors="coerce"),
+        pd.NaT,
+    )
+
+
+def parse_values(series: pd.Series) -> Tuple[pd.Series, np.ndarray]:
+    """
+    Convert a column to float.
+
+    Parameters:
+    -----------
+    series : pd.Series
+        The column, as read from the sheet.
+
+    Returns:
+    --------
+    tuple
+        The converted column, with NaN where the value is missing or not a number, and a boolean array
+        marking the rows holding a value that is not a number.
+    """
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return series.astype(float), np.zeros(len(series), dtype=bool)
+    return _convert_distinct(
+        series, lambda values: pd.to_numeric(values, errors="coerce"), np.nan
+    )
+
+
+def validate_lab_data(
+    data: pd.DataFrame,
+    col_date: Text,
+    col_value: Text,
+    date_format: Text = DATE_FORMAT,
+) -> pd.DataFrame:
+    """
+    Check and convert the date and value columns of a lab table in a single pass.
+
+    A column without problems is replaced in `data` by its converted version (datetime64 dates, float
+    values), which the following stages use as is. A column with problems is left untouched.
+
+    Parameters:
+    -----------
+    data : pd.DataFrame
+        The lab table, modified in place. Only its columns are replaced; the table is not copied.
+    col_date : str
+        The column holding the sampling dates.
+    col_value : str
+        The column holding the measured values.
+    date_format : str, optional
+        The format of the dates written as text.
+
+    Returns:
+    --------
+    pd.DataFrame
+        One row per problem with the sheet row (the header being row 1), the column, the raw value and the
+        reason. Empty if both columns are valid.
+    """
+    issues = []
+    checks = (
+        (
+            col_date,
+            lambda series: parse_dates(series, date_format),
+            f"La fecha no tiene el formato {date_format}.",
+        ),
+        (col_value, parse_values, "El valor no es numérico."),
+    )
+    for column, parse, reason in checks:
+        if column not in data.columns:
+            issues.append(
+                pd.DataFrame(
+                    [[None, column, None, "La columna no existe en los datos."]],
+                    columns=ISSUE_COLUMNS,
+                )
+            )
+            continue
+        converted, invalid = parse(data[column])
+        if invalid.any():
+            rows = np.flatnonzero(invalid)
+            issues.append(
+                pd.DataFrame(
+                    {
+                        "Fila": rows + FIRST_DATA_ROW,
+                        "Columna": column,
+                        "Valor": data[column].iloc[rows].to_numpy(dtype=object),
+                        "Motivo": reason,
+                    }
+                )
+            )
+        elif converted is not data[column]:
+            data[column] = converted
+    if not issues:
+        return pd.DataFrame(columns=ISSUE_COLUMNS)
+    return pd.concat(issues, ignore_index=True)
+
+
+def _convert_distinct(
+    series: pd.Series, convert: Callable, missing
+) -> Tuple[pd.Series, np.ndarray]:
+    """
+    Convert the distinct entries of a column and broadcast them to its rows.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        distinct = pd.Series(series.cat.categories.to_numpy(dtype=object))
+    else:
+        codes, uniques = pd.factorize(series)
+        distinct = pd.Series(np.asarray(uniques, dtype=object))
+    converted = convert(distinct)
+    invalid = converted.isna().to_numpy() & distinct.notna().to_numpy()
+    # Code -1 (a missing entry) takes the appended missing value.
+    values = pd.concat([converted, pd.Series([missing], dtype=converted.dtype)])
+    result = pd.Series(values.to_numpy()[codes], index=series.index, name=series.name)
+    return result, np.append(invalid, False)[codes]
@@ -0,0 +1,173 @@
+import math
+from typing import Dict, List, Optional, Text, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class ColumnValues:
+    """
+    The distinct values of one column, sorted by their text representation, with their occurrence counts.
+
+    Attributes:
+    -----------
+    labels : np.ndarray
+        The text representation of every distinct value, sorted, used for prefix searches.
+    values : np.ndarray
+        The distinct values, aligned with `labels`.
+    counts : np.ndarray
+        The number of rows holding each distinct value, aligned with `labels`.
+    """
+
+    def __init__(self, series: pd.Series) -> None:
+        """
+        Count the distinct values of a column.
+
+        Parameters:
+        -----------
+        series : pd.Series
+            The column to be indexed.
+        """
+        counts = series.value_counts(dropna=False, sort=False)
+        # Categorical columns also count the categories of rows that were removed.
+        counts = counts[counts > 0]
+        values = counts.index.to_numpy(dtype=object)
+        labels = np.array([format_value(value) for value in values], dtype=str)
+        order = np.argsort(labels, kind="stable")
+        self.labels = labels[order]
+        self.values = values[order]
+        self.counts = counts.to_numpy()[order]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def search(self, prefix: Text = "") -> Tuple[int, int]:
+        """
+        Find the range of distinct values whose text representation starts with a prefix.
+
+        Parameters:
+        -----------
+        prefix : str, optional
+            The prefix to be searched. An empty prefix matches every value.
+
+        Returns:
+        --------
+        tuple
+            The start (inclusive) and end (exclusive) positions of the matching values.
+        """
+        if not prefix:
+            return 0, len(self.labels)
+        start = int(np.searchsorted(self.labels, prefix, side="left"))
+        end = int(np.searchsorted(self.labels, prefix + "\U0010ffff", side="left"))
+        return start, end
+
+    def page(
+        self, prefix: Text, offset: int, size: int
+    ) -> List[Tuple[object, Text, int]]:
+        """
+        Return one page of the distinct values matching a prefix.
+
+        Parameters:
+        -----------
+        prefix : str
+            The prefix the values must start with.
+        offset : int
+            The number of matching values to skip.
+        size : int
+            The maximum number of values returned.
+
+        Returns:
+        --------
+        list
+            Tuples of (value, text representation, count).
+        """
+        start, end = self.search(prefix)
+        start = min(start + offset, end)
+        stop = min(start + size, end)
+        return list(
+            zip(
+                self.values[start:stop].tolist(),
+                self.labels[start:stop].tolist(),
+                self.counts[start:stop].tolist(),
+            )
+        )
+
+
+class UniqueValueIndex:
+    """
+    A lazily built, cached index of the distinct values of the columns of a table.
+
+    Each column is indexed the first time its values are requested. The cached columns stay valid until
+    `invalidate` is called, which the owner of the table does whenever the table changes.
+    """
+
+    def __init__(self) -> None:
+        self._columns: Dict[Text, ColumnValues] = {}
+
+    def invalidate(self) -> None:
+        """
+        Discard every cached column, e.g. after rows were removed from the table.
+        """
+        self._columns.clear()
+
+    def column(self, data: pd.DataFrame, column: Text) -> ColumnValues:
+        """
+        Return the distinct values of a column, indexing the column on first use.
+
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            The table the column belongs to.
+        column : str
+            The name of the column.
+
+        Returns:
+        --------
+        ColumnValues
+            The distinct values of the column with their counts.
+        """
+        if column not in self._columns:
+            self._columns[column] = ColumnValues(data[column])
+        return self._columns[column]
+
+
+def format_value(value) -> Text:
+    """
+    Return the text used to show a value of the table in the calculator.
+
+    Parameters:
+    -----------
+    value : object
+        The value to be shown.
+
+    Returns:
+    --------
+    str
+        The text representation of the value.
+    """
+    if isinstance(value, pd.Timestamp) and value == value.normalize():
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def expression_literal(value) -> Optional[Text]:
+    """
+    Return the text inserted into a calculator expression to compare a column with a value.
+
+    Parameters:
+    -----------
+    value : object
+        A distinct value of a column.
+
+    Returns:
+    --------
+    str or None
+        A number literal for numbers and quoted text for any other value, or None for missing values and
+        infinite numbers, which the expression language cannot write.
+    """
+    if pd.isna(value):
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value) if math.isfinite(value) else None
+    text = format_value(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
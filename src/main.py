@@ -1,6 +1,16 @@
-import tkinter as tk
-from hydrogeology_app.interface import HydrogeologyApp
+import sys
+from multiprocessing import freeze_support
 
 
-root = tk.Tk()
-app = HydrogeologyApp(root)
\ No newline at end of file
+if __name__ == "__main__":
+    freeze_support()
+    if len(sys.argv) > 1:
+        from hydrogeology_app.batch import main
+
+        sys.exit(main())
+
+    import tkinter as tk
+    from hydrogeology_app.interface import HydrogeologyApp
+
+    root = tk.Tk()
+    app = HydrogeologyApp(root)
@@ -0,0 +1,28 @@
+"""
+Fixtures shared by the tests.
+
+The tests are run from the repository root with `python -m pytest`. They import the application package
+from `src/` and the former implementations kept by the benchmarks from `benchmarks/`. Figures are drawn
+with the non-interactive Agg backend.
+"""
+
+import os
+import sys
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for folder in ("src", "benchmarks"):
+    if os.path.join(ROOT_DIR, folder) not in sys.path:
+        sys.path.insert(0, os.path.join(ROOT_DIR, folder))
+
+from lab_tables import lab_data  # noqa: E402
+
+
+@pytest.fixture
+def lab_table():
+    return lab_data()
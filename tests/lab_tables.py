@@ -0,0 +1,47 @@
+"""
+Small lab tables built by the tests.
+"""
+
+import numpy as np
+import pandas as pd
+
+from hydrogeology_app.ion_catalog import ION_CATALOG
+
+CONDUCTIVITY = "Conductividad (µS/cm)"
+
+
+def lab_data(points=3, dates=2, seed=0):
+    """
+    Build a small long-format lab table with every required ion and the conductivity of each sample.
+    """
+    random = np.random.default_rng(seed)
+    labels = [ion.label for ion in ION_CATALOG if ion.required] + [CONDUCTIVITY]
+    rows = [
+        {
+            "punto": f"P-{point}",
+            "fecha": pd.Timestamp("2020-01-01") + pd.Timedelta(days=91 * date),
+            "campaña": "Seca" if date % 2 == 0 else "Lluvias",
+            "parametro": label,
+            "valores": round(float(random.gamma(4.0, 10.0)), 3),
+        }
+        for point in range(points)
+        for date in range(dates)
+        for label in labels
+    ]
+    return pd.DataFrame(rows)
+
+
+def parameter_rename(parameters):
+    """
+    Build the `dict_rename` argument of `calculate_meq_table` for the given parameter labels.
+    """
+    dict_rename = {}
+    for ion in ION_CATALOG:
+        if ion.label in parameters:
+            dict_rename[ion.label] = ion.mg_label
+        elif ion.required:
+            dict_rename[f"null_{ion.key}"] = ion.mg_label
+    dict_rename[CONDUCTIVITY if CONDUCTIVITY in parameters else "null_conductivity"] = (
+        CONDUCTIVITY
+    )
+    return dict_rename
@@ -0,0 +1,102 @@
+"""
+Tests of the batch command line on small generated workbooks, processed in the test process.
+"""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hydrogeology_app.analitic_data import calculate_meq_table
+from hydrogeology_app.batch import MEQ_TABLE_FILE, SUMMARY_FILE, main
+from hydrogeology_app.ion_catalog import ION_CATALOG
+from lab_tables import CONDUCTIVITY, lab_data, parameter_rename
+
+SHEET = "Datos"
+MAPPING = {
+    "sheet": SHEET,
+    "columns": {
+        "point": "punto",
+        "date": "fecha",
+        "parameter": "parametro",
+        "value": "valores",
+    },
+    "parameters": {
+        **{ion.key: ion.label for ion in ION_CATALOG if ion.required},
+        "conductividad": CONDUCTIVITY,
+    },
+    "group": "campaña",
+    "color": None,
+}
+
+
+@pytest.fixture
+def batch_folder(tmp_path):
+    """
+    Write two valid workbooks and, between them, one with a value that is not a number.
+    """
+    folder = tmp_path / "libros"
+    folder.mkdir()
+    lab_data(points=2, seed=1).to_excel(
+        folder / "a_campaña.xlsx", sheet_name=SHEET, index=False
+    )
+    broken = lab_data(points=2, seed=2).astype({"valores": object})
+    broken.loc[3, "valores"] = "sin dato"
+    broken.to_excel(folder / "b_dañado.xlsx", sheet_name=SHEET, index=False)
+    lab_data(points=3, seed=3).to_excel(
+        folder / "c_campaña.xlsx", sheet_name=SHEET, index=False
+    )
+    mapping_path = tmp_path / "mapeo.json"
+    mapping_path.write_text(json.dumps(MAPPING), encoding="utf-8")
+    return tmp_path
+
+
+def test_broken_workbook_is_reported_without_stopping_the_batch(batch_folder):
+    output = batch_folder / "resultados"
+    exit_code = main(
+        [
+            str(batch_folder / "libros"),
+            "--mapping",
+            str(batch_folder / "mapeo.json"),
+            "--output",
+            str(output),
+            "--workers",
+            "1",
+            "--no-cache",
+        ]
+    )
+    assert exit_code == 1
+    with open(output / SUMMARY_FILE, encoding="utf-8") as summary_file:
+        summary = json.load(summary_file)
+    assert (summary["workbooks"], summary["succeeded"], summary["failed"]) == (3, 2, 1)
+    first, broken, last = summary["results"]
+    assert [os.path.basename(result["workbook"]) for result in summary["results"]] == [
+        "a_campaña.xlsx",
+        "b_dañado.xlsx",
+        "c_campaña.xlsx",
+    ]
+
+    assert broken["status"] == "error"
+    assert broken["error"].startswith("validate: ValueError: 1 filas")
+    issues = pd.read_csv(os.path.join(broken["output"], "problemas_datos.csv"))
+    assert issues["Valor"].tolist() == ["sin dato"]
+    assert not os.path.exists(os.path.join(broken["output"], MEQ_TABLE_FILE))
+
+    for result, points, seed in [(first, 2, 1), (last, 3, 3)]:
+        assert result["status"] == "ok"
+        assert result["error"] is None
+        assert result["samples"] == points * 2
+        assert result["figures"] > 0
+        assert {"select_sheet", "validate", "calculate_meq_table"} <= set(
+            result["timings"]
+        )
+        data = lab_data(points=points, seed=seed)
+        expected = calculate_meq_table(
+            data, parameter_rename(data["parametro"].unique()), "parametro", "valores"
+        )
+        written = pd.read_excel(os.path.join(result["output"], MEQ_TABLE_FILE))
+        assert written["punto"].tolist() == expected["punto"].tolist()
+        for column in ["Calcio (meq/L)", "Total Aniones (meq/L)", "Error %"]:
+            np.testing.assert_allclose(written[column], expected[column])
@@ -0,0 +1,125 @@
+"""
+Tests of the worksheet names and header previews read from the workbook XML, against pandas.
+"""
+
+import zipfile
+
+import pandas as pd
+import pytest
+
+from hydrogeology_app.excel_reader import list_sheets, preview_sheet
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/libro.xml"
+ ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/hojas/datos.xml"
+ ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/hojas/resumen.xml"
+ ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/{strings}"
+ ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>
+</Types>"""
+PACKAGE_RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Target="xl/libro.xml"
+ Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>
+</Relationships>"""
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+ xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets>
+<sheet name="Resumen" sheetId="1" r:id="rId2"/>
+<sheet name="Datos" sheetId="2" r:id="rId1"/>
+</sheets>
+</workbook>"""
+WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Target="hojas/datos.xml"
+ Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>
+<Relationship Id="rId2" Target="/xl/hojas/resumen.xml"
+ Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/>
+<Relationship Id="rId3" Target="{strings_target}"
+ Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings"/>
+</Relationships>"""
+SHEET_DATA = """<?xml version="1.0" encoding="UTF-8"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<dimension ref="A1:D3"/>
+<sheetData>
+<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c>
+<c r="C1" t="inlineStr"><is><t>parametro</t></is></c><c r="D1" t="s"><v>2</v></c></row>
+<row r="2"><c r="A2" t="s"><v>3</v></c><c r="B2"><v>43831</v></c>
+<c r="C2" t="s"><v>4</v></c><c r="D2"><v>1.5</v></c></row>
+<row r="3"><c r="A3" t="s"><v>3</v></c><c r="B3"><v>43832</v></c>
+<c r="C3" t="s"><v>4</v></c><c r="D3"><v>2</v></c></row>
+</sheetData>
+</worksheet>"""
+SHEET_SUMMARY = """<?xml version="1.0" encoding="UTF-8"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<dimension ref="A1:B2"/>
+<sheetData>
+<row r="1"><c r="A1" t="s"><v>5</v></c><c r="B1"><v>2020</v></c></row>
+<row r="2"><c r="A2" t="s"><v>3</v></c><c r="B2"><v>3</v></c></row>
+</sheetData>
+</worksheet>"""
+SHARED_STRINGS = """<?xml version="1.0" encoding="UTF-8"?>
+<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" count="6" uniqueCount="6">
+<si><t>punto</t></si>
+<si><r><t>fe</t></r><r><t>cha</t></r></si>
+<si><t>valores</t></si>
+<si><t>P-1</t></si>
+<si><t>Calcio (mg/L)</t></si>
+<si><t>campaña</t></si>
+</sst>"""
+
+
+def write_workbook(path, strings, strings_target):
+    """
+    Write a workbook whose workbook and worksheet parts are not at the paths Excel uses, with the shared
+    strings at `strings`.
+    """
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES.format(strings=strings))
+        archive.writestr("_rels/.rels", PACKAGE_RELS)
+        archive.writestr("xl/libro.xml", WORKBOOK)
+        archive.writestr(
+            "xl/_rels/libro.xml.rels",
+            WORKBOOK_RELS.format(strings_target=strings_target),
+        )
+        archive.writestr("xl/hojas/datos.xml", SHEET_DATA)
+        archive.writestr("xl/hojas/resumen.xml", SHEET_SUMMARY)
+        archive.writestr(strings, SHARED_STRINGS)
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "strings, strings_target",
+    [
+        ("xl/sharedStrings.xml", "sharedStrings.xml"),
+        ("xl/textos/cadenas.xml", "textos/cadenas.xml"),
+        ("xl/textos/cadenas.xml", "/xl/textos/cadenas.xml"),
+    ],
+)
+def test_preview_matches_pandas(tmp_path, strings, strings_target):
+    path = write_workbook(tmp_path / "libro.xlsx", strings, strings_target)
+    sheet_names = pd.ExcelFile(path, engine="openpyxl").sheet_names
+    assert list_sheets(path) == sheet_names == ["Resumen", "Datos"]
+    for sheet_name in sheet_names:
+        data = pd.read_excel(path, sheet_name=sheet_name, engine="openpyxl")
+        preview = preview_sheet(path, sheet_name)
+        assert preview.header == list(data.columns)
+        assert preview.n_rows == len(data)
+
+
+def test_preview_of_a_workbook_written_by_pandas(tmp_path):
+    path = str(tmp_path / "laboratorio.xlsx")
+    data = pd.DataFrame({"punto": ["P-1", "P-2"], "valores": [1.5, 2.0], 2020: [1, 2]})
+    with pd.ExcelWriter(path) as writer:
+        data.to_excel(writer, sheet_name="Datos", index=False)
+        data.iloc[:1].to_excel(writer, sheet_name="Copia", index=False)
+    assert list_sheets(path) == pd.ExcelFile(path).sheet_names
+    preview = preview_sheet(path, "Copia")
+    assert preview.header == list(pd.read_excel(path, sheet_name="Copia").columns)
+    assert preview.n_rows == 1
@@ -0,0 +1,175 @@
+"""
+Round trips of the meq table through the Excel, CSV and Parquet exports.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import load_workbook
+
+from hydrogeology_app.analitic_data import calculate_meq_table
+from hydrogeology_app.exporters import (
+    ERROR_COLUMN,
+    SHEET_CHARGE_BALANCE,
+    SHEET_DATA,
+    SHEET_SUMMARY,
+    write_csv,
+    write_excel,
+    write_parquet,
+)
+from lab_tables import lab_data, parameter_rename
+
+LIMIT = 10.0
+CHUNK_ROWS = 4
+
+
+def meq_table(float32=False):
+    """
+    Calculate the meq table of 15 samples, with an error that cannot be calculated, an infinite one and
+    one at the limit.
+    """
+    data = lab_data(points=5, dates=3)
+    table = calculate_meq_table(
+        data,
+        parameter_rename(data["parametro"].unique().tolist()),
+        "parametro",
+        "valores",
+        float32=float32,
+    )
+    table.loc[1, ERROR_COLUMN] = np.nan
+    table.loc[2, ERROR_COLUMN] = np.inf
+    table.loc[3, ERROR_COLUMN] = LIMIT
+    table.loc[4, "Calcio (meq/L)"] = -np.inf
+    return table
+
+
+def finite(table):
+    """
+    The table as read back from a file where missing and infinite values are empty.
+    """
+    table = table.copy()
+    for column in table.select_dtypes("number").columns:
+        table[column] = table[column].where(np.isfinite(table[column]))
+    return table
+
+
+def assert_same_values(read, table):
+    pd.testing.assert_frame_equal(
+        finite(read),
+        finite(table),
+        check_dtype=False,
+        check_categorical=False,
+        check_column_type=False,
+        check_index_type=False,
+        check_names=False,
+    )
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = str(tmp_path / "tabla.xlsx")
+    write_excel(
+        meq_table(),
+        path,
+        charge_balance=True,
+        group_column="campaña",
+        limit=LIMIT,
+        chunk_rows=CHUNK_ROWS,
+    )
+    return path
+
+
+def test_data_sheet_holds_the_table_with_empty_cells(workbook):
+    table = meq_table()
+    read = pd.read_excel(workbook, sheet_name=SHEET_DATA)
+    read["punto"] = read["punto"].astype(object)
+    read["campaña"] = read["campaña"].astype(object)
+    assert_same_values(read, table.astype({"punto": object, "campaña": object}))
+
+    sheet = load_workbook(workbook)[SHEET_DATA]
+    header = [cell.value for cell in sheet[1]]
+    error = header.index(ERROR_COLUMN) + 1
+    calcium = header.index("Calcio (meq/L)") + 1
+    assert sheet.cell(row=3, column=error).value is None
+    assert sheet.cell(row=4, column=error).value is None
+    assert sheet.cell(row=6, column=calcium).value is None
+
+
+def test_charge_balance_sheet_lists_the_samples_outside_the_limit(workbook):
+    table = meq_table()
+    error = table[ERROR_COLUMN]
+    expected = table[(error.abs() > LIMIT) | error.isna()]
+    assert 3 < len(expected) < len(table)
+    assert 3 not in expected.index
+
+    read = pd.read_excel(workbook, sheet_name=SHEET_CHARGE_BALANCE)
+    assert read["punto"].tolist() == expected["punto"].tolist()
+    assert read["fecha"].tolist() == expected["fecha"].tolist()
+    np.testing.assert_allclose(
+        read[ERROR_COLUMN], finite(expected)[ERROR_COLUMN], equal_nan=True
+    )
+
+
+def test_group_summary_matches_groupby(workbook):
+    table = finite(meq_table())
+    assert len(table) > CHUNK_ROWS
+    numeric = table.select_dtypes("number").columns
+    expected = table.groupby("campaña", observed=True)[list(numeric)].agg(
+        ["count", "mean", "min", "max"]
+    )
+    outside = (
+        (~(table[ERROR_COLUMN].abs() <= LIMIT))
+        .groupby(table["campaña"], observed=True)
+        .sum()
+    )
+
+    read = pd.read_excel(workbook, sheet_name=SHEET_SUMMARY)
+    assert len(read) == len(expected) * len(numeric)
+    for row in read.itertuples(index=False):
+        group, samples, outside_limit, column, count, mean, minimum, maximum = row
+        assert samples == (table["campaña"] == group).sum()
+        assert outside_limit == outside[group]
+        assert count == expected.loc[group, (column, "count")]
+        assert mean == pytest.approx(expected.loc[group, (column, "mean")])
+        assert minimum == pytest.approx(expected.loc[group, (column, "min")])
+        assert maximum == pytest.approx(expected.loc[group, (column, "max")])
+
+
+def test_compressed_csv_reloads_as_the_table(tmp_path):
+    table = meq_table()
+    path = str(tmp_path / "tabla.csv.gz")
+    assert write_csv(table, path, chunk_rows=CHUNK_ROWS) == len(table)
+    read = pd.read_csv(path, parse_dates=["fecha"])
+    assert_same_values(
+        read.astype({"punto": object, "campaña": object}),
+        table.astype({"punto": object, "campaña": object}),
+    )
+
+
+def test_parquet_keeps_the_column_types(tmp_path):
+    table = meq_table(float32=True)
+    path = str(tmp_path / "tabla.parquet")
+    write_parquet(table, path)
+    read = pd.read_parquet(path)
+    pd.testing.assert_frame_equal(
+        read, table, check_column_type=False, check_names=False
+    )
+    assert isinstance(read["punto"].dtype, pd.CategoricalDtype)
+    assert read["fecha"].dtype.kind == "M"
+    assert read[ERROR_COLUMN].dtype == np.float32
+
+
+def test_parquet_writes_mixed_labels_as_text(tmp_path):
+    table = meq_table()
+    points = pd.Series(
+        [1 if row % 2 == 0 else "P-2" for row in range(len(table))], dtype=object
+    )
+    table["punto"] = points.astype("category")
+    table["codigo"] = points.astype(object)
+    path = str(tmp_path / "tabla.parquet")
+    write_parquet(table, path)
+    read = pd.read_parquet(path)
+    assert list(read["punto"].cat.categories) == ["1", "P-2"]
+    assert read["punto"].astype(object).tolist() == points.astype(str).tolist()
+    assert read["codigo"].tolist() == points.astype(str).tolist()
+    assert list(table["punto"].cat.categories) == [1, "P-2"]
@@ -0,0 +1,216 @@
+import io
+import os
+import re
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_figure_kernels import build_data, check, kernel_transforms, legacy_transforms
+from bench_piper import legacy_piper_graphic
+from bench_stiff_memory import build_meq_data
+from hydrogeology_app import funciones_figuras
+from hydrogeology_app.analitic_data import calculate_meq_table
+from hydrogeology_app.data_layout import compact_labels
+from hydrogeology_app.funciones_figuras import (
+    PiperTemplate,
+    export_stiff_atlas,
+    gibbs_graphic,
+    iter_stiff_figures,
+    mifflin_graphic,
+    piper_graphic,
+    stiff_graphic,
+)
+from lab_tables import lab_data, parameter_rename
+
+
+@pytest.fixture
+def dry_season(lab_table):
+    """
+    The meq table after removing the rows of the rainy season, as "Eliminar Seleccionados" does.
+    """
+    compact_labels(lab_table)
+    meq = calculate_meq_table(
+        lab_table,
+        parameter_rename(lab_table["parametro"].unique()),
+        "parametro",
+        "valores",
+    )
+    assert list(meq["campaña"].cat.categories) == ["Lluvias", "Seca"]
+    return meq[meq["campaña"] == "Seca"]
+
+
+def legend_labels(ax):
+    return [text.get_text() for text in ax.get_legend().get_texts()]
+
+
+def test_mifflin_legend_skips_removed_groups(dry_season):
+    fig = mifflin_graphic(dry_season, col_color="campaña")
+    assert legend_labels(fig.axes[0]) == ["Seca"]
+    plt.close(fig)
+
+
+def test_gibbs_legend_skips_removed_groups(dry_season):
+    fig = gibbs_graphic(dry_season, col_style="campaña")
+    assert legend_labels(fig.axes[0]) == ["Seca"]
+    plt.close(fig)
+
+
+def test_piper_legend_skips_removed_groups(dry_season):
+    fig = piper_graphic(dry_season, col_color="campaña")
+    assert legend_labels(fig.axes[0]) == ["Seca"]
+    plt.close(fig)
+
+
+def read_bytes(path):
+    with open(path, "rb") as image_file:
+        return image_file.read()
+
+
+def test_worker_processes_render_the_same_files(tmp_path):
+    data = calculate_meq_table(
+        lab_data(),
+        parameter_rename(lab_data()["parametro"].unique()),
+        "parametro",
+        "valores",
+    )
+    # A repeated sample of the first point is reported instead of drawn.
+    data = pd.concat([data, data.iloc[[0]]], ignore_index=True)
+    rendered = {}
+    for mode in ("process", "pool"):
+        folder = tmp_path / mode
+        folder.mkdir()
+        jobs = funciones_figuras.figure_jobs(
+            data, str(folder), "punto", "fecha", col_color="campaña"
+        )
+        if mode == "pool":
+            with funciones_figuras.figure_executor(2) as executor:
+                results = list(
+                    executor.map(funciones_figuras.render_figure, *zip(*jobs))
+                )
+        else:
+            results = [funciones_figuras.render_figure(*job) for job in jobs]
+        rendered[mode] = {
+            os.path.basename(path): (warnings, read_bytes(path))
+            for path, warnings in results
+        }
+    assert sorted(rendered["process"]) == [
+        "fig_gibbs.jpg",
+        "fig_mifflin.jpg",
+        "fig_pipper.jpg",
+        "fig_stiffP-0.jpg",
+        "fig_stiffP-1.jpg",
+        "fig_stiffP-2.jpg",
+    ]
+    assert rendered["process"]["fig_stiffP-0.jpg"][0] == [
+        "The point P-0 for the date 2020-01-01 has more than one record"
+    ]
+    assert rendered["pool"] == rendered["process"]
+
+
+def stiff_polygons(ax):
+    return [patch.get_xy()[:-1] for patch in ax.patches]
+
+
+def former_stiff_polygons(point_values):
+    """
+    The vertices of each date of a point, as computed by the former `stiff_graphic`.
+    """
+    polygons = []
+    for height, (_, values) in zip(
+        range(0, 5 * len(point_values), 5), point_values.groupby("fecha")
+    ):
+        values = values.iloc[0]
+        x = [
+            -(abs(values["Sodio (meq/L)"]) + abs(values["Potasio (meq/L)"])),
+            abs(values["Cloruros (meq/L)"]),
+            abs(values["Bicarbonato (meq/L)"]) + abs(values["Carbonato (meq/L)"]),
+            abs(values["Sulfatos (meq/L)"]) + abs(values["Nitratos (meq/L)"]),
+            -abs(values["Magnesio (meq/L)"]),
+            -abs(values["Calcio (meq/L)"]),
+        ]
+        y = [3 + height, 3 + height, 2 + height, 1 + height, 1 + height, 2 + height]
+        polygons.append(np.column_stack([x, y]))
+    return polygons
+
+
+def test_stiff_polygons_match_the_former_diagram():
+    data = build_meq_data(4)
+    figures = stiff_graphic(data, "punto", "fecha", notify=None)
+    streamed = {
+        point_id: stiff_polygons(fig.axes[0])
+        for point_id, fig in iter_stiff_figures(data, "punto", "fecha")
+    }
+    assert list(figures) == list(streamed) == sorted(data["punto"].unique())
+    for point_id, fig in figures.items():
+        expected = former_stiff_polygons(data[data["punto"] == point_id])
+        assert len(expected) == 3
+        for drawn in (stiff_polygons(fig.axes[0]), streamed[point_id]):
+            assert len(drawn) == len(expected)
+            for polygon, vertices in zip(drawn, expected):
+                np.testing.assert_allclose(polygon, vertices)
+        plt.close(fig)
+
+
+def pdf_pages(path):
+    with open(path, "rb") as pdf_file:
+        return len(re.findall(rb"/Type\s*/Page\b", pdf_file.read()))
+
+
+@pytest.mark.parametrize(
+    "points, grid, index_entries, pages",
+    [(7, (2, 2), 140, 1 + 2), (9, (1, 2), 4, 3 + 5), (1, (4, 3), 140, 1 + 1)],
+)
+def test_stiff_atlas_writes_index_and_point_pages(
+    tmp_path, monkeypatch, points, grid, index_entries, pages
+):
+    monkeypatch.setattr(funciones_figuras, "STIFF_ATLAS_INDEX_ENTRIES", index_entries)
+    path = str(tmp_path / "atlas_stiff.pdf")
+    written = export_stiff_atlas(build_meq_data(points), path, "punto", "fecha", grid)
+    assert written == pages
+    assert pdf_pages(path) == pages
+
+
+def png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=40)
+    return plt.imread(io.BytesIO(buffer.getvalue()))
+
+
+def test_piper_template_keeps_no_artists_between_renders():
+    colored = build_data(40, seed=1)
+    colored["campaña"] = np.where(np.arange(40) % 2 == 0, "Seca", "Lluvias")
+    plain = build_data(25, seed=2)
+    template = PiperTemplate()
+    piper_graphic(colored, col_color="campaña", col_style="campaña", template=template)
+    fig = piper_graphic(plain, template=template)
+    ax = template.ax
+    assert fig is template.figure
+    assert len(ax.images) == 1
+    assert len(ax.collections) == 1
+    assert len(ax.collections[0].get_offsets()) == 3 * len(plain)
+    assert ax.get_legend() is None
+
+    new = piper_graphic(plain)
+    assert np.array_equal(png(fig), png(new))
+    plt.close(new)
+
+
+def test_kernels_match_the_former_pandas_transforms():
+    data = build_data(500)
+    # Samples without cations, anions or ions of a ratio are divided by zero.
+    data.iloc[:3] = 0.0
+    data.loc[3, ["Sodio (mg/L)", "Calcio (mg/L)"]] = 0.0
+    check(legacy_transforms(data), kernel_transforms(data))
+
+
+def test_piper_matches_the_former_figure():
+    data = build_data(60)
+    data["campaña"] = np.where(np.arange(60) % 3 == 0, "Seca", "Lluvias")
+    legacy = legacy_piper_graphic(data.copy(), col_color="campaña")
+    fig = piper_graphic(data, col_color="campaña")
+    assert np.array_equal(png(legacy), png(fig))
+    assert list(data.columns) == list(build_data(0).columns) + ["campaña"]
+    plt.close(legacy)
+    plt.close(fig)
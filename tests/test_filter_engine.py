@@ -0,0 +1,153 @@
+"""
+Tests of the calculator expressions: the vectorized evaluation against the former per-row `eval`, missing
+values, invalid expressions and the `Like` operator.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_filter import legacy_evaluate
+from hydrogeology_app.data_layout import compact_labels
+from hydrogeology_app.filter_engine import compile_expression, like_mask
+
+EXPRESSIONS = [
+    '[$"Calcio"] > 2',
+    '[$"Calcio"] >= 2.1',
+    '[$"Calcio"] < 2.1',
+    '[$"Calcio"] <= 2.1',
+    '[$"Calcio"] == 2.1',
+    '[$"Calcio"] != 2.1',
+    '[$"Calcio"] > -1',
+    '[$"Calcio"] <= [$"Sodio"]',
+    '[$"Calcio"] != [$"Sodio"]',
+    '[$"Calcio"] + [$"Sodio"] > 5',
+    '[$"muestras"] >= 3',
+    '[$"muestras"] == 2',
+    '[$"punto"] == "P-3"',
+    '[$"punto"] != "P-3"',
+    '[$"punto"] < "P-3"',
+    '[$"campana"] == 10',
+    '[$"campana"] > 5',
+    '[$"campana"] == "2021-1"',
+    '([$"Calcio"] > 2) & ([$"punto"] != "P-1")',
+    '([$"Calcio"] > 4) | ([$"Sodio"] < 1)',
+    '([$"Calcio"] > 1) & ([$"Sodio"] > 1) | ([$"punto"] == "P-0")',
+    'not ([$"campana"] == "2021-1")',
+    'not [$"Calcio"] > 2',
+    '[$"punto"] in ["P-1", "P-2"]',
+    '[$"punto"] not in ["P-1"]',
+    '[$"Calcio"] in [2.1, 3.4]',
+    '[$"campana"] in [10]',
+    '1 < [$"Calcio"] <= 3',
+    '[$"Sodio"] < [$"Calcio"] < 4',
+]
+
+
+def lab_results(rows=80, seed=0):
+    """
+    Build a table with float, integer and text columns, and a column mixing numbers and text, as read
+    from a sheet where some cells hold numbers.
+    """
+    random = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "punto": [f"P-{i}" for i in random.integers(0, 6, rows)],
+            "campana": np.array(["2020-1", "2021-1", 10], dtype=object)[
+                random.integers(0, 3, rows)
+            ],
+            "Calcio": random.gamma(2.0, 1.5, rows).round(1),
+            "Sodio": random.gamma(2.0, 2.0, rows).round(1),
+            "muestras": random.integers(0, 5, rows),
+        }
+    )
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["object", "categorical"])
+@pytest.mark.parametrize("expression", EXPRESSIONS)
+def test_selects_the_rows_of_the_per_row_evaluation(expression, compact):
+    data = lab_results()
+    expected = legacy_evaluate(data, expression)
+    if compact:
+        data = compact_labels(data)
+    assert compile_expression(expression).positions(data) == expected
+
+
+def test_invert_negates_like_not():
+    data = lab_results()
+    assert compile_expression('~([$"Calcio"] > 2)').positions(
+        data
+    ) == compile_expression('not ([$"Calcio"] > 2)').positions(data)
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["object", "categorical"])
+def test_missing_values_only_match_not_equal(compact):
+    data = pd.DataFrame(
+        {
+            "punto": ["P-1", None, "P-2"],
+            "Calcio": [1.0, 2.0, np.nan],
+        }
+    )
+    if compact:
+        data = compact_labels(data)
+    positions = lambda expression: compile_expression(expression).positions(data)
+    assert positions('[$"Calcio"] > 0') == [0, 1]
+    assert positions('[$"Calcio"] == 1') == [0]
+    assert positions('[$"Calcio"] != 1') == [1, 2]
+    assert positions('[$"Calcio"] in [1, 2]') == [0, 1]
+    assert positions('[$"punto"] == "P-1"') == [0]
+    assert positions('[$"punto"] != "P-1"') == [1, 2]
+    assert positions('[$"punto"] in ["P-1", "P-2"]') == [0, 2]
+    assert positions('[$"punto"] Like "P%"') == [0, 2]
+
+
+@pytest.mark.parametrize(
+    "expression, error",
+    [
+        ('[$"Calcio"] >', SyntaxError),
+        ('([$"Calcio"] > 2', SyntaxError),
+        ('[$"Calcio"] > 2 if True else 3', SyntaxError),
+        ('[$"Magnesio"] > 2', KeyError),
+        ('[$"Calcio"] > limite', ValueError),
+        ('[$"Calcio"] in 2', TypeError),
+        ('[$"punto"] Like 2', TypeError),
+    ],
+)
+def test_invalid_expressions_raise(expression, error):
+    with pytest.raises(error):
+        compile_expression(expression).mask(lab_results())
+
+
+POINTS = ["PZ-1", "PZ-10", "pz-2", None, "PZ-1\nbis", "Pozo 100%", "PZ-1"]
+
+
+@pytest.mark.parametrize("dtype", [object, "category", "str"])
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        ("PZ-1", [True, False, False, False, False, False, True]),
+        ("PZ-1%", [True, True, False, False, True, False, True]),
+        ("PZ-_", [True, False, False, False, False, False, True]),
+        ("PZ-1_", [False, True, False, False, False, False, False]),
+        ("%100%", [False, False, False, False, False, True, False]),
+        ("%", [True, True, True, False, True, True, True]),
+    ],
+)
+def test_like_matches_whole_values(dtype, pattern, expected):
+    series = pd.Series(POINTS, dtype=dtype)
+    assert like_mask(series, pattern).tolist() == expected
+
+
+def test_like_matches_numbers_through_their_text():
+    series = pd.Series([1.5, 10.0, np.nan, 15.25])
+    assert like_mask(series, "1%5").tolist() == [True, False, False, True]
+
+
+def test_like_on_empty_column():
+    assert like_mask(pd.Series([], dtype=object), "PZ%").tolist() == []
+
+
+def test_not_like_in_expression():
+    data = pd.DataFrame({"punto": pd.Series(POINTS, dtype="category")})
+    mask = compile_expression('[$"punto"] not Like "PZ-1%"').mask(data)
+    assert mask.tolist() == [False, False, True, True, False, True, False]
@@ -0,0 +1,109 @@
+"""
+Tests of the stages recorded in worker processes and of the Chrome trace file written with them.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+from hydrogeology_app import instrumentation
+from hydrogeology_app.analitic_data import calculate_meq_table
+from lab_tables import lab_data, parameter_rename
+
+EVENT_KEYS = {"name", "cat", "ph", "ts", "dur", "pid", "tid", "args"}
+
+
+@pytest.fixture(autouse=True)
+def recording():
+    instrumentation.disable()
+    instrumentation.clear()
+    yield
+    instrumentation.disable()
+    instrumentation.clear()
+
+
+def test_worker_stages_are_merged_into_a_chrome_trace(tmp_path):
+    data = lab_data(points=2, dates=2)
+    rename = parameter_rename(data["parametro"].unique().tolist())
+    instrumentation.enable()
+    with instrumentation.stage("leer", rows=len(data)):
+        pass
+    with ProcessPoolExecutor(
+        max_workers=1, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        table, worker_events = executor.submit(
+            instrumentation.call_traced,
+            True,
+            calculate_meq_table,
+            data,
+            rename,
+            "parametro",
+            "valores",
+        ).result()
+    pd.testing.assert_frame_equal(
+        table, calculate_meq_table(data, rename, "parametro", "valores")
+    )
+    assert [event["name"] for event in worker_events] == ["calculate_meq_table"]
+    worker_pid = worker_events[0]["pid"]
+    assert worker_pid != os.getpid()
+
+    instrumentation.disable()
+    instrumentation.merge(worker_events)
+    path = tmp_path / "traza.json"
+    assert instrumentation.write_trace(str(path)) == 3
+
+    with open(path, encoding="utf-8") as trace_file:
+        trace = json.load(trace_file)
+    assert isinstance(trace["traceEvents"], list)
+    complete = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    assert [event["name"] for event in complete] == [
+        "leer",
+        "calculate_meq_table",
+        "calculate_meq_table",
+    ]
+    for event in complete:
+        assert set(event) == EVENT_KEYS
+        assert event["dur"] >= 0
+        assert event["args"]["cpu_ms"] >= 0
+        assert event["args"]["rows"] == len(data)
+    processes = {
+        event["pid"]: event["args"]["name"]
+        for event in trace["traceEvents"]
+        if event["ph"] == "M" and event["name"] == "process_name"
+    }
+    assert processes == {
+        os.getpid(): "HydroGeoGraph",
+        worker_pid: f"worker {worker_pid}",
+    }
+
+
+def test_calls_are_not_recorded_unless_requested():
+    data = lab_data(points=1, dates=1)
+    rename = parameter_rename(data["parametro"].unique().tolist())
+    table, worker_events = instrumentation.call_traced(
+        False, calculate_meq_table, data, rename, "parametro", "valores"
+    )
+    assert len(table) == 1
+    assert worker_events == []
+    assert not instrumentation.enabled()
+    assert instrumentation.events() == []
+
+
+def test_trace_written_at_exit_is_logged(tmp_path, caplog):
+    path = str(tmp_path / "traza.json")
+    instrumentation._write_trace_at_exit(path)
+    assert not os.path.exists(path)
+
+    instrumentation.enable()
+    with instrumentation.stage("leer"):
+        pass
+    with caplog.at_level(logging.INFO, logger=instrumentation.__name__):
+        instrumentation._write_trace_at_exit(path)
+    assert caplog.messages == [f"Trace written to {path} (1 stages)"]
+    with open(path, encoding="utf-8") as trace_file:
+        assert len(json.load(trace_file)["traceEvents"]) == 2
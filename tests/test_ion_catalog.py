@@ -0,0 +1,137 @@
+"""
+Tests of the ion catalog: the JSON catalogs read by `load_ion_catalog`, and the conversion to meq/L of
+their ions.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hydrogeology_app.analitic_data import calculate_meq_table
+from hydrogeology_app.ion_catalog import (
+    ION_CATALOG,
+    conversion_matrix,
+    load_ion_catalog,
+)
+from lab_tables import lab_data, parameter_rename
+
+# Charge and molar mass (g/mol) of the ions of the built-in catalog.
+EXPECTED_IONS = {
+    "sulfatos": (-2, 96.06),
+    "sodio": (1, 22.99),
+    "potasio": (1, 39.1),
+    "nitratos": (-1, 62.0),
+    "magnesio": (2, 24.31),
+    "cloruros": (-1, 35.45),
+    "carbonato": (-2, 60.01),
+    "calcio": (2, 40.08),
+    "bicarbonato": (-1, 61.01),
+    "hierro": (2, 55.845),
+    "manganeso": (2, 54.938),
+    "amonio": (1, 18.04),
+    "fluoruros": (-1, 19.00),
+    "bromuros": (-1, 79.904),
+}
+FLUORIDE = {
+    "key": "fluor",
+    "name": "Fluor",
+    "molar_mass": 19.00,
+    "charge": -1,
+    "label": "F (mg/L)",
+}
+
+
+def write_catalog(tmp_path, entries):
+    path = tmp_path / "iones.json"
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return str(path)
+
+
+def required_entries():
+    return [ion._asdict() for ion in ION_CATALOG if ion.required]
+
+
+def test_built_in_catalog_round_trips(tmp_path):
+    entries = [ion._asdict() for ion in ION_CATALOG]
+    assert load_ion_catalog(write_catalog(tmp_path, entries)) == ION_CATALOG
+
+
+def test_extra_ion_is_converted_and_added_to_the_anions(tmp_path):
+    required_catalog = load_ion_catalog(write_catalog(tmp_path, required_entries()))
+    catalog = load_ion_catalog(write_catalog(tmp_path, required_entries() + [FLUORIDE]))
+    assert catalog[-1].aliases == ()
+    assert not catalog[-1].required
+
+    data = lab_data()
+    samples = data.drop_duplicates(["punto", "fecha"])
+    fluoride = samples.assign(
+        parametro="F (mg/L)", valores=np.arange(1.0, len(samples) + 1)
+    )
+    data = pd.concat([data, fluoride], ignore_index=True)
+    dict_rename = parameter_rename(data["parametro"].unique().tolist())
+    dict_rename["F (mg/L)"] = "Fluor (mg/L)"
+
+    result = calculate_meq_table(data, dict_rename, "parametro", "valores", catalog)
+    without = calculate_meq_table(
+        data, dict_rename, "parametro", "valores", required_catalog
+    )
+    assert "Fluor (meq/L)" not in without
+    np.testing.assert_allclose(
+        result["Fluor (meq/L)"], result["Fluor (mg/L)"] * -1 / 19.00
+    )
+    np.testing.assert_allclose(
+        result["Total Aniones (meq/L)"],
+        without["Total Aniones (meq/L)"] + result["Fluor (meq/L)"],
+    )
+    np.testing.assert_allclose(
+        result["Total Cationes (meq/L)"], without["Total Cationes (meq/L)"]
+    )
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        ({"charge": None}, r"lacks the fields \['charge'\]"),
+        ({"molar_mass": None}, r"lacks the fields \['molar_mass'\]"),
+        ({"valence": -1}, r"unknown fields \['valence'\]"),
+        ({"charge": 0}, "non-zero integer"),
+        ({"charge": "-1"}, "non-zero integer"),
+        ({"charge": -1.5}, "non-zero integer"),
+        ({"molar_mass": 0}, "positive number"),
+        ({"molar_mass": "19"}, "positive number"),
+        ({"key": "calcio"}, r"repeats the keys \['calcio'\]"),
+    ],
+)
+def test_malformed_entry_raises(tmp_path, change, message):
+    entry = {**FLUORIDE, **change}
+    entry = {field: value for field, value in entry.items() if value is not None}
+    path = write_catalog(tmp_path, required_entries() + [entry])
+    with pytest.raises(ValueError, match=message):
+        load_ion_catalog(path)
+
+
+def test_catalog_must_be_a_list_of_objects(tmp_path):
+    with pytest.raises(ValueError, match="not a list"):
+        load_ion_catalog(write_catalog(tmp_path, FLUORIDE))
+    with pytest.raises(ValueError, match="Entry 2 .* not an object"):
+        load_ion_catalog(write_catalog(tmp_path, [FLUORIDE, "Litio"]))
+
+
+def test_built_in_charges_and_molar_masses():
+    assert {ion.key: ion.charge for ion in ION_CATALOG} == {
+        key: charge for key, (charge, _) in EXPECTED_IONS.items()
+    }
+    for ion in ION_CATALOG:
+        assert ion.molar_mass == pytest.approx(EXPECTED_IONS[ion.key][1])
+
+
+def test_one_millimole_of_each_ion_gives_its_charge():
+    ions = list(ION_CATALOG)
+    mg = np.array([ion.molar_mass for ion in ions])
+    meq = mg @ conversion_matrix(ions)
+    charges = np.array([EXPECTED_IONS[ion.key][0] for ion in ions], dtype=float)
+    np.testing.assert_allclose(meq[: len(ions)], charges)
+    assert meq[len(ions)] == pytest.approx(charges[charges > 0].sum())
+    assert meq[len(ions) + 1] == pytest.approx(charges[charges < 0].sum())
@@ -0,0 +1,99 @@
+"""
+Tests of the background job runner, with the Tk root and the progress window replaced by stand-ins.
+"""
+
+import threading
+import time
+import tkinter as tk
+import tkinter.messagebox
+
+import pytest
+
+from hydrogeology_app.jobs import JobRunner
+
+
+class FakeRoot:
+    """
+    Keeps the callbacks scheduled with `after` so the test runs them instead of a mainloop.
+    """
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, function, *args):
+        self.scheduled.append((function, args))
+
+    def run_pending(self):
+        scheduled, self.scheduled = self.scheduled, []
+        for function, args in scheduled:
+            function(*args)
+
+
+class FakeWidget:
+    def __init__(self):
+        self.options = {}
+
+    def config(self, **options):
+        self.options.update(options)
+
+
+class WindowlessRunner(JobRunner):
+    def open_window(self, title):
+        self.window = object()
+        self.label_step = FakeWidget()
+        self.label_elapsed = FakeWidget()
+        self.progress = FakeWidget()
+        self.button_cancel = FakeWidget()
+
+    def close_window(self):
+        self.window = None
+
+
+@pytest.fixture
+def runner():
+    return WindowlessRunner(FakeRoot())
+
+
+def run_until_idle(runner, timeout=5):
+    deadline = time.perf_counter() + timeout
+    while runner.busy and time.perf_counter() < deadline:
+        runner.root.run_pending()
+        time.sleep(0.01)
+
+
+def test_cancelled_job_keeps_runner_busy_until_thread_ends(runner, monkeypatch):
+    monkeypatch.setattr(tk.messagebox, "showinfo", lambda *args: None)
+    release = threading.Event()
+    cancelled = []
+    done = []
+
+    def work(job):
+        release.wait(5)
+        return "result"
+
+    runner.submit(
+        "Tarea", work, on_done=done.append, on_cancel=lambda: cancelled.append(True)
+    )
+    runner.cancel()
+    for _ in range(3):
+        runner.root.run_pending()
+    assert runner.busy
+    assert runner.window is not None
+    assert runner.button_cancel.options["state"] == tk.DISABLED
+    assert runner.submit("Otra tarea", work) is None
+    assert cancelled == []
+
+    release.set()
+    run_until_idle(runner)
+    assert not runner.busy
+    assert cancelled == [True]
+    assert done == []
+    assert runner.window is None
+
+
+def test_finished_job_calls_on_done(runner):
+    done = []
+    job = runner.submit("Tarea", lambda job: 42, on_done=done.append)
+    run_until_idle(runner)
+    assert done == [42]
+    assert not job.cancelled
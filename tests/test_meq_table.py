@@ -0,0 +1,81 @@
+"""
+Equivalence of `calculate_meq_table` with the former pivot_table implementation on small lab tables.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from bench_meq_table import PARAMETERS, legacy_calculate_meq_table
+from hydrogeology_app.analitic_data import MISSING_LABEL, calculate_meq_table
+from hydrogeology_app.data_layout import compact_labels
+
+KEY_COLUMNS = ["punto", "fecha", "campaña", "profundidad"]
+
+
+def long_table():
+    """
+    Build a lab table with two samples per point, a repeated record, ions missing from some samples and
+    missing values in the label (punto, campaña) and non-label (fecha, profundidad) key columns.
+    """
+    samples = pd.DataFrame(
+        {
+            "punto": ["P-1", "P-1", "P-2", "P-2", None, "P-3"],
+            "fecha": pd.to_datetime(
+                [
+                    "2020-01-01",
+                    "2020-04-01",
+                    "2020-01-01",
+                    None,
+                    "2020-01-01",
+                    "2020-04-01",
+                ]
+            ),
+            "campaña": ["Seca", "Lluvias", None, "Seca", "Seca", "Lluvias"],
+            "profundidad": [10.0, 10.0, np.nan, 25.0, 5.0, np.nan],
+        }
+    )
+    parameters = [key for key in PARAMETERS if not key.startswith("null_")] + ["pH"]
+    data = samples.loc[samples.index.repeat(len(parameters))].reset_index(drop=True)
+    data["parametro"] = np.tile(parameters, len(samples))
+    data["valores"] = np.random.default_rng(0).gamma(2.0, 20.0, len(data)).round(3)
+    # Sodium and potassium are not measured in the second sample, nor sulfates in the last one.
+    missing = ((data.index // len(parameters)) == 1) & data["parametro"].isin(
+        ["Sodio (mg/L)", "Potasio (mg/L)"]
+    )
+    missing |= ((data.index // len(parameters)) == 5) & (
+        data["parametro"] == "Sulfatos (mg/L SO4-2)"
+    )
+    data = data[~missing]
+    # A record repeated with another value is averaged.
+    repeated = data[data["parametro"] == "Calcio (mg/L)"].iloc[:2]
+    data = pd.concat([data, repeated.assign(valores=repeated["valores"] * 3)])
+    data.loc[data.index[3], "valores"] = np.nan
+    return data.reset_index(drop=True)
+
+
+def with_missing_keys_as_labels(table):
+    """
+    Write the missing keys as `MISSING_LABEL`, as the former implementation did for every key column.
+    """
+    table = table.copy()
+    for column in KEY_COLUMNS:
+        values = table[column].astype(object)
+        table[column] = values.where(values.notna(), MISSING_LABEL)
+    return table
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["object", "categorical"])
+def test_matches_pivot_table_implementation(compact):
+    data = long_table()
+    expected = legacy_calculate_meq_table(data, PARAMETERS, "parametro", "valores")
+    if compact:
+        data = compact_labels(data)
+    result = calculate_meq_table(data, PARAMETERS, "parametro", "valores")
+    assert len(result) == 6
+    pd.testing.assert_frame_equal(
+        with_missing_keys_as_labels(result),
+        with_missing_keys_as_labels(expected),
+        check_dtype=False,
+        check_categorical=False,
+    )
@@ -0,0 +1,113 @@
+"""
+Tests of the on-disk cache of parsed worksheets.
+"""
+
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+from hydrogeology_app.sheet_cache import SheetCache
+
+SHEET = "Datos"
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "laboratorio.xlsx"
+    pd.DataFrame(
+        {
+            "punto": [101, "PZ-1", "PZ-2", 101],
+            "fecha": pd.to_datetime(["2020-01-01", "2020-02-01", None, "2020-03-01"]),
+            "valores": [1.5, "<0.5", None, 3],
+        }
+    ).to_excel(path, sheet_name=SHEET, index=False)
+    return str(path)
+
+
+def read_from_cache_only(cache, path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("the worksheet was read from the workbook")
+
+    monkeypatch.setattr(pd, "read_excel", fail)
+    return cache.read_excel(path, SHEET)
+
+
+def test_mixed_columns_are_cached_as_parquet_text(tmp_path, workbook, monkeypatch):
+    cache = SheetCache(str(tmp_path / "cache"))
+    first = cache.read_excel(workbook, SHEET)
+    assert first["punto"].tolist() == ["101", "PZ-1", "PZ-2", "101"]
+    assert first["valores"].tolist()[:2] == ["1.5", "<0.5"]
+    assert pd.isna(first["valores"].iloc[2])
+    assert all(
+        name.endswith((".parquet", ".json")) for name in os.listdir(cache.directory)
+    )
+
+    cached = read_from_cache_only(cache, workbook, monkeypatch)
+    pd.testing.assert_frame_equal(cached, first, check_dtype=False)
+    assert pd.api.types.is_datetime64_any_dtype(cached["fecha"])
+
+
+def test_sheet_mixing_dates_and_text_is_not_cached(tmp_path):
+    path = str(tmp_path / "fechas.xlsx")
+    raw = pd.DataFrame({"fecha": [pd.Timestamp("2020-01-01"), "03/02/2020"]})
+    raw.to_excel(path, sheet_name=SHEET, index=False)
+    cache = SheetCache(str(tmp_path / "cache"))
+    data = cache.read_excel(path, SHEET)
+    assert isinstance(data["fecha"].iloc[0], datetime.datetime)
+    assert cache.entries() == []
+
+
+def test_pickle_files_are_never_loaded(tmp_path, workbook):
+    cache = SheetCache(str(tmp_path / "cache"))
+    key = cache.key(workbook, SHEET)
+    os.makedirs(cache.directory)
+    stale_path = os.path.join(cache.directory, key + ".pkl")
+    with open(stale_path, "wb") as stale_file:
+        stale_file.write(b"not a pickle")
+    assert cache.load(key) is None
+    assert [entry.key for entry in cache.entries()] == [key]
+
+    cache.read_excel(workbook, SHEET)
+    assert not os.path.exists(stale_path)
+    cache.clear()
+    assert os.listdir(cache.directory) == []
+
+
+def test_write_failure_still_returns_the_converted_sheet(
+    tmp_path, workbook, monkeypatch
+):
+    def disk_full(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(pd.DataFrame, "to_parquet", disk_full)
+    cache = SheetCache(str(tmp_path / "cache"))
+    data = cache.read_excel(workbook, SHEET)
+    assert data["valores"].tolist()[:2] == ["1.5", "<0.5"]
+    assert os.listdir(cache.directory) == []
+
+
+def test_files_removed_by_another_process_are_skipped(tmp_path, workbook, monkeypatch):
+    cache = SheetCache(str(tmp_path / "cache"))
+    cache.read_excel(workbook, SHEET)
+    key = cache.key(workbook, SHEET)
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: listdir(path) + ["evicted.parquet"])
+    assert [entry.key for entry in cache.entries()] == [key]
+
+    def evicted(*args, **kwargs):
+        raise FileNotFoundError(args[0])
+
+    monkeypatch.setattr(os, "utime", evicted)
+    assert cache.load(key) is not None
+
+
+def test_interrupted_writes_are_counted_and_cleared(tmp_path):
+    cache = SheetCache(str(tmp_path / "cache"))
+    os.makedirs(cache.directory)
+    with open(os.path.join(cache.directory, "interrumpido.tmp"), "wb") as tmp_file:
+        tmp_file.write(b"0" * 100)
+    assert cache.total_size() == 100
+    cache.clear()
+    assert os.listdir(cache.directory) == []
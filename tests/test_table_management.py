@@ -0,0 +1,188 @@
+"""
+Tests of the virtual mode of the table, with the Treeview and its scrollbar replaced by stand-ins.
+"""
+
+import tkinter.messagebox
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hydrogeology_app import table_management
+from hydrogeology_app.table_management import (
+    VIRTUAL_TABLE_BUFFER,
+    TableManagement,
+)
+
+ROWS = 1000
+HEIGHT = 10
+
+
+class FakeTreeview:
+    """
+    Keeps the items, selection and focus of a Treeview; `after_idle` callbacks are run by the test.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self.selected = ()
+        self.focused = ""
+        self.idle = []
+        self.next_id = 0
+
+    def __getitem__(self, option):
+        return {"height": HEIGHT}[option]
+
+    def insert(self, parent, index, values):
+        self.next_id += 1
+        item = f"I{self.next_id}"
+        self.rows[item] = values
+        return item
+
+    def delete(self, *items):
+        for item in items:
+            del self.rows[item]
+        self.selected = tuple(item for item in self.selected if item in self.rows)
+
+    def get_children(self):
+        return tuple(self.rows)
+
+    def selection_set(self, items):
+        self.selected = tuple(items)
+
+    def selection(self):
+        return self.selected
+
+    def focus(self, item=None):
+        if item is None:
+            return self.focused
+        self.focused = item
+
+    def yview_moveto(self, fraction):
+        pass
+
+    def after_idle(self, function, *args):
+        self.idle.append((function, args))
+
+    def run_idle(self):
+        idle, self.idle = self.idle, []
+        for function, args in idle:
+            function(*args)
+
+
+@pytest.fixture
+def table():
+    data = pd.DataFrame(
+        {
+            "punto": [f"P-{i}" for i in range(ROWS)],
+            "fecha": pd.date_range("2020-01-01", periods=ROWS, freq="D"),
+        },
+        index=np.arange(ROWS) * 10,
+    )
+    table = TableManagement(None, data)
+    table.data_tree = data
+    table.virtual_threshold = 100
+    table.virtual_mode = True
+    table.treeview = FakeTreeview()
+    table.vertical_scroll = SimpleNamespace(set=lambda first, last: None)
+    table.insert_data()
+    return table
+
+
+def click(table, items, state=0):
+    """
+    Select Treeview items as a click would, with the given modifier state.
+    """
+    table.selection_started(SimpleNamespace(state=state))
+    table.treeview.selection_set(items)
+    table.sync_selection(None)
+    table.treeview.run_idle()
+
+
+def test_window_moves_at_the_bottom_edge(table):
+    assert (table.window_start, table.window_end) == (0, HEIGHT + VIRTUAL_TABLE_BUFFER)
+    for _ in range(3):
+        table.treeview_scrolled("0.9", "1.0")
+        table.treeview.run_idle()
+    assert table.window_start > 0
+    assert table.window_end > HEIGHT + VIRTUAL_TABLE_BUFFER
+
+
+def test_window_moves_at_the_top_edge(table):
+    table.scroll_to(500)
+    start = table.window_start
+    table.treeview_scrolled("0.0", "0.1")
+    table.treeview.run_idle()
+    assert table.window_start < start
+
+
+def test_refetch_keeps_focus_on_the_same_row(table):
+    label = table.data_tree.index[HEIGHT + VIRTUAL_TABLE_BUFFER - 1]
+    table.treeview.focus(table.row_map.item_by_label[label])
+    table.treeview_scrolled("0.9", "1.0")
+    table.treeview.run_idle()
+    assert table.row_map.label_by_item[table.treeview.focus()] == label
+
+
+def test_plain_click_replaces_selection_outside_the_window(table, monkeypatch):
+    table.select_positions([5, 900])
+    assert len(table.selected_labels) == 2
+    item = table.row_map.items([table.data_tree.index[1]])
+    table.scroll_to(0)
+    click(table, item)
+    assert table.selected_labels == {table.data_tree.index[1]}
+
+    monkeypatch.setattr(
+        tkinter.messagebox, "askyesno", lambda *args: pytest.fail("no confirmation")
+    )
+    table.remove_selected()
+    assert len(table.data_tree) == ROWS - 1
+    assert 9000 in table.data_tree.index
+
+
+def test_ctrl_click_keeps_selection_outside_the_window(table):
+    table.select_positions([900])
+    table.scroll_to(0)
+    click(table, table.row_map.items([table.data_tree.index[1]]), state=0x0004)
+    assert table.selected_labels == {
+        table.data_tree.index[1],
+        table.data_tree.index[900],
+    }
+
+
+@pytest.mark.parametrize("confirm", [False, True])
+def test_removing_rows_outside_the_window_asks_first(table, monkeypatch, confirm):
+    questions = []
+
+    def askyesno(title, message):
+        questions.append(message)
+        return confirm
+
+    monkeypatch.setattr(tkinter.messagebox, "askyesno", askyesno)
+    table.select_positions([5, 900])
+    table.scroll_to(0)
+    table.remove_selected()
+    assert len(questions) == 1
+    assert "1 filas" in questions[0]
+    assert len(table.data_tree) == (ROWS - 2 if confirm else ROWS)
+
+
+def test_dates_are_formatted_only_for_the_displayed_rows(table, monkeypatch):
+    formatted = []
+    format_dates = table_management.format_dates
+
+    def record(series):
+        formatted.append(len(series))
+        return format_dates(series)
+
+    monkeypatch.setattr(table_management, "format_dates", record)
+    table.data_tree.loc[table.data_tree.index[501], "fecha"] = pd.NaT
+    table.scroll_to(500)
+    window = table.window_end - table.window_start
+    assert formatted == [window]
+    assert window < ROWS
+    assert pd.api.types.is_datetime64_any_dtype(table.data_tree["fecha"])
+    rows = [table.treeview.rows[item] for item in table.treeview.get_children()]
+    assert rows[500 - table.window_start][2] == "15/05/2021"
+    assert rows[501 - table.window_start][2] == "--"
@@ -0,0 +1,115 @@
+"""
+Tests of the single-pass validation of the date and value columns.
+"""
+
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from hydrogeology_app.validation import (
+    FIRST_DATA_ROW,
+    ISSUE_COLUMNS,
+    validate_lab_data,
+)
+
+
+def lab_sheet(dates, values):
+    return pd.DataFrame(
+        {
+            "punto": [f"P-{row}" for row in range(len(dates))],
+            "fecha": dates,
+            "valores": values,
+        }
+    )
+
+
+def test_valid_columns_are_converted_in_place():
+    data = lab_sheet(["01/02/2020", "15/03/2021", None], ["1.5", 2, None])
+    issues = validate_lab_data(data, "fecha", "valores")
+    assert list(issues.columns) == ISSUE_COLUMNS
+    assert len(issues) == 0
+    assert data["fecha"].tolist()[:2] == [
+        pd.Timestamp("2020-02-01"),
+        pd.Timestamp("2021-03-15"),
+    ]
+    assert pd.isna(data["fecha"].iloc[2])
+    assert data["valores"].dtype == float
+    assert data["valores"].tolist()[:2] == [1.5, 2.0]
+
+
+def test_every_invalid_row_is_reported_with_its_sheet_row():
+    data = lab_sheet(
+        ["01/02/2020", "2020-02-01", "01/02/2020", "31/02/2020"],
+        [1.0, 2.0, "<0.5", "n.d."],
+    )
+    issues = validate_lab_data(data, "fecha", "valores")
+    assert issues["Fila"].tolist() == [
+        1 + FIRST_DATA_ROW,
+        3 + FIRST_DATA_ROW,
+        2 + FIRST_DATA_ROW,
+        3 + FIRST_DATA_ROW,
+    ]
+    assert issues["Columna"].tolist() == ["fecha", "fecha", "valores", "valores"]
+    assert issues["Valor"].tolist() == ["2020-02-01", "31/02/2020", "<0.5", "n.d."]
+    assert issues["Motivo"].str.contains("%d/%m/%Y").tolist() == [
+        True,
+        True,
+        False,
+        False,
+    ]
+
+
+def test_columns_with_problems_are_left_untouched():
+    data = lab_sheet(["01/02/2020", "febrero"], ["1.5", "2"])
+    dtype = data["fecha"].dtype
+    issues = validate_lab_data(data, "fecha", "valores")
+    assert issues["Columna"].tolist() == ["fecha"]
+    assert data["fecha"].dtype == dtype
+    assert data["fecha"].tolist() == ["01/02/2020", "febrero"]
+    assert data["valores"].tolist() == [1.5, 2.0]
+
+
+def test_missing_column_is_reported():
+    data = lab_sheet(["01/02/2020"], ["1.5"])
+    issues = validate_lab_data(data, "fecha_muestreo", "valores")
+    assert len(issues) == 1
+    issue = issues.iloc[0]
+    assert pd.isna(issue["Fila"])
+    assert issue["Columna"] == "fecha_muestreo"
+    assert data["valores"].tolist() == [1.5]
+
+
+def test_dates_read_as_dates_and_as_text():
+    data = lab_sheet(
+        [datetime.datetime(2020, 2, 1), "15/03/2021", pd.Timestamp("2022-04-30")],
+        [1.0, 2.0, 3.0],
+    )
+    assert data["fecha"].dtype == object
+    issues = validate_lab_data(data, "fecha", "valores")
+    assert len(issues) == 0
+    assert pd.api.types.is_datetime64_any_dtype(data["fecha"])
+    assert data["fecha"].tolist() == [
+        pd.Timestamp("2020-02-01"),
+        pd.Timestamp("2021-03-15"),
+        pd.Timestamp("2022-04-30"),
+    ]
+
+
+def test_categorical_columns_are_converted_through_their_categories():
+    data = lab_sheet(
+        ["01/02/2020", "15/03/2021", "01/02/2020", None, "13/13/2020"],
+        ["1.5", "2", "1.5", "x", None],
+    ).astype({"fecha": "category", "valores": "category"})
+    issues = validate_lab_data(data, "fecha", "valores")
+    assert issues["Fila"].tolist() == [4 + FIRST_DATA_ROW, 3 + FIRST_DATA_ROW]
+    assert issues["Valor"].tolist() == ["13/13/2020", "x"]
+
+    data = data.iloc[:3].copy()
+    assert len(validate_lab_data(data, "fecha", "valores")) == 0
+    assert data["fecha"].tolist() == [
+        pd.Timestamp("2020-02-01"),
+        pd.Timestamp("2021-03-15"),
+        pd.Timestamp("2020-02-01"),
+    ]
+    np.testing.assert_array_equal(data["valores"], [1.5, 2.0, 1.5])
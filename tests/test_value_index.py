@@ -0,0 +1,37 @@
+"""
+Tests of the distinct values offered by the calculator and the text it inserts into expressions.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from hydrogeology_app.filter_engine import compile_expression
+from hydrogeology_app.value_index import ColumnValues, expression_literal
+
+COLUMNS = {
+    "punto": pd.Series(["PZ-1", 'Pozo "Norte"', None, "PZ-1", "C:\\datos"]),
+    "categoria": pd.Series(["Seca", "Lluvias", None, "Seca", "Seca"], dtype="category"),
+    "valores": pd.Series([1.5, -0.25, np.nan, 1.5, 1e-05]),
+    "enteros": pd.Series([3, 7, 3, 7, 10]),
+}
+
+
+@pytest.mark.parametrize("column", COLUMNS)
+def test_every_inserted_value_selects_its_rows(column):
+    data = pd.DataFrame(COLUMNS)
+    column_values = ColumnValues(data[column])
+    for value, label, count in column_values.page("", 0, len(column_values)):
+        literal = expression_literal(value)
+        if pd.isna(value):
+            assert literal is None
+            continue
+        mask = compile_expression(f'[$"{column}"] == {literal}').mask(data)
+        assert mask.sum() == count, literal
+
+
+def test_missing_and_infinite_values_are_not_inserted():
+    assert expression_literal(np.nan) is None
+    assert expression_literal(None) is None
+    assert expression_literal(pd.NaT) is None
+    assert expression_literal(float("inf")) is None